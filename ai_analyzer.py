@@ -7,17 +7,30 @@ Skill-Zero Analyzer - AI Analyzer
 
 import json
 import os
+import re
 import logging
-from typing import Dict, List, Any, Optional
+import argparse
+from typing import Dict, List, Any, Optional, Iterator, Tuple
 from config import config
-from utils import Logger, FileUtils, ValidationUtils
+from utils import Logger, ProgressLogger, FileUtils, ValidationUtils
+from models import FormData, Participant, ProfileInfo, to_participant
+from participant_snapshot import ParticipantSnapshot
+from participant_store import ParticipantStore
+from prompt_store import PromptStore
+from prompt_bundler import PromptBundler, BundleManager
+from llm_client import LLMExecutor, ResponseCache
+from metrics import metrics, add_metrics_arguments, instrument
+
+
+# 処理済みデータJSONの処理日時（先頭の項目）
+JSON_PROCESSED_AT_PATTERN = re.compile(r'"processed_at"\s*:\s*"([^"]*)"')
 
 
 class ProfileAnalyzer:
     """プロフィール分析クラス"""
 
     @staticmethod
-    def create_profile_summary(name: str, profile_info: Dict[str, Any]) -> str:
+    def create_profile_summary(name: str, profile_info: ProfileInfo) -> str:
         """プロフィール情報のサマリーを作成"""
         if not ValidationUtils.is_valid_profile_data(profile_info):
             return ""
@@ -49,7 +62,7 @@ class ProfileAnalyzer:
 """
 
     @staticmethod
-    def create_form_summary(form_data: Dict[str, Any]) -> str:
+    def create_form_summary(form_data: FormData) -> str:
         """フォーム回答データのサマリーを作成"""
         return f"""
 ## フォーム回答データ
@@ -117,75 +130,71 @@ class PromptGenerator:
             self.logger.error(f"プロンプト読み込みエラー: {e}")
             return ""
 
-    def create_analysis_prompt(self, name: str, profile_info: Dict[str, Any],
-                              form_data: Dict[str, Any]) -> str:
-        """分析用プロンプトを作成"""
+    def create_prompt_parts(self, name: str, profile_info: ProfileInfo,
+                            form_data: FormData) -> Optional[Tuple[str, str, str]]:
+        """分析用プロンプトを (共通の前置き, 参加者ごとの本文, 共通の後書き) に分けて作成"""
         try:
             # 各セクションを作成
             profile_summary = ProfileAnalyzer.create_profile_summary(name, profile_info)
             form_summary = ProfileAnalyzer.create_form_summary(form_data)
             offline_meeting_info = ProfileAnalyzer.create_offline_meeting_info()
 
-            # 完全なプロンプトを組み立て
-            full_prompt = f"""{self.prompts_content}
-
-{profile_summary}
-
-{form_summary}
-
-{offline_meeting_info}"""
-
-            return full_prompt
+            return self.prompts_content, f"{profile_summary}\n\n{form_summary}", offline_meeting_info
 
         except Exception as e:
             self.logger.error(f"プロンプト生成エラー ({name}): {e}")
+            return None
+
+    def create_analysis_prompt(self, name: str, profile_info: ProfileInfo,
+                              form_data: FormData) -> str:
+        """分析用プロンプトを作成"""
+        parts = self.create_prompt_parts(name, profile_info, form_data)
+        if parts is None:
             return ""
 
+        # 完全なプロンプトを組み立て
+        return PromptStore.SEPARATOR.join(parts)
+
 
 class FileManager:
     """ファイル管理クラス"""
 
     @staticmethod
-    def save_analysis_prompt(name: str, prompt: str) -> str:
-        """分析用プロンプトを保存"""
+    def save_analysis_result(name: str, analysis_result: str) -> bool:
+        """分析結果を保存"""
         try:
             # 出力ディレクトリを作成
             os.makedirs(config.OUTPUT_DIR, exist_ok=True)
 
             # ファイル名を生成
-            filename = f"{name}_analysis_prompt.txt"
+            filename = f"{name}さんのAI分析.md"
             filepath = os.path.join(config.OUTPUT_DIR, filename)
 
             # ファイルに保存
             with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(prompt)
+                f.write(analysis_result)
 
-            return filepath
+            return True
 
         except Exception as e:
-            Logger.setup_logger(__name__).error(f"プロンプト保存エラー ({name}): {e}")
-            return ""
+            Logger.setup_logger(__name__).error(f"分析結果保存エラー ({name}): {e}")
+            return False
 
     @staticmethod
-    def save_analysis_result(name: str, analysis_result: str) -> bool:
-        """分析結果を保存"""
+    def save_analysis_result_text(name: str, analysis_result: str) -> str:
+        """LLMの分析結果を generate_analysis_results.py が読み込む形式で保存"""
         try:
-            # 出力ディレクトリを作成
             os.makedirs(config.OUTPUT_DIR, exist_ok=True)
 
-            # ファイル名を生成
-            filename = f"{name}さんのAI分析.md"
-            filepath = os.path.join(config.OUTPUT_DIR, filename)
-
-            # ファイルに保存
+            filepath = config.get_output_path(f"{name}_analysis_result.txt")
             with open(filepath, 'w', encoding='utf-8') as f:
                 f.write(analysis_result)
 
-            return True
+            return filepath
 
         except Exception as e:
             Logger.setup_logger(__name__).error(f"分析結果保存エラー ({name}): {e}")
-            return False
+            return ""
 
 
 class DataLoader:
@@ -209,21 +218,121 @@ class DataLoader:
             Logger.setup_logger(__name__).error(f"データ読み込みエラー: {e}")
             return None
 
+    @staticmethod
+    def read_json_processed_at() -> str:
+        """処理済みデータJSONの処理日時を先頭部分だけ読んで取得（ファイル・記録がない場合は空文字）"""
+        json_file = config.PROCESSED_DATA_FILE
+        if not os.path.exists(json_file):
+            return ''
+
+        # 処理日時はJSONの先頭の項目のため、全体は読み込まない
+        with open(json_file, 'r', encoding='utf-8', errors='replace') as f:
+            match = JSON_PROCESSED_AT_PATTERN.search(f.read(4096))
+        return match.group(1) if match else ''
+
+    @staticmethod
+    def open_participant_store() -> Optional[ParticipantStore]:
+        """参加者ストアを開く（ストアがない、またはJSONの処理日時の方が新しい場合はNone）"""
+        try:
+            store_file = config.PARTICIPANT_STORE_FILE
+            if not os.path.exists(store_file):
+                return None
+
+            store = ParticipantStore(store_file)
+            if DataLoader.read_json_processed_at() > store.get_processed_at():
+                Logger.setup_logger(__name__).info(f"{config.PROCESSED_DATA_FILE} の方が新しいためJSONから読み込みます")
+                store.close()
+                return None
+            return store
+
+        except Exception as e:
+            Logger.setup_logger(__name__).error(f"参加者ストア読み込みエラー: {e}")
+            return None
+
+    @staticmethod
+    def open_participant_snapshot() -> Optional[ParticipantSnapshot]:
+        """スナップショットを開く（スナップショットがない、または参加者ストア・JSONと内容が異なる場合はNone）
+
+        参加者ストアへの書き込みはWALファイルに入り本体の更新日時は変わらないため、ファイルの更新日時ではなく
+        スナップショットに記録したストアの世代番号と、現在のストアの世代番号を比べる。
+        """
+        try:
+            snapshot_file = config.PARTICIPANT_SNAPSHOT_FILE
+            if not os.path.exists(snapshot_file):
+                return None
+
+            store_file = config.PARTICIPANT_STORE_FILE
+            generation = None
+            if os.path.exists(store_file):
+                with ParticipantStore(store_file) as store:
+                    generation = store.get_generation()
+                    processed_at = store.get_processed_at()
+
+            snapshot = ParticipantSnapshot(snapshot_file)
+            if generation is None:
+                processed_at = snapshot.get_processed_at()
+            elif snapshot.get_generation() != generation:
+                Logger.setup_logger(__name__).info(
+                    f"{store_file} が更新されているためスナップショットを使用しません")
+                snapshot.close()
+                return None
+
+            if DataLoader.read_json_processed_at() > processed_at:
+                Logger.setup_logger(__name__).info(
+                    f"{config.PROCESSED_DATA_FILE} の方が新しいためスナップショットを使用しません")
+                snapshot.close()
+                return None
+            return snapshot
+
+        except Exception as e:
+            Logger.setup_logger(__name__).error(f"スナップショット読み込みエラー: {e}")
+            return None
+
 
 class AIAnalyzer:
     """AI分析メインクラス"""
 
-    def __init__(self):
+    def __init__(self, split_static: Optional[bool] = None, use_llm_cache: Optional[bool] = None,
+                 llm_cache_ttl: Optional[float] = None, replay: bool = False):
         self.logger = Logger.setup_logger(__name__)
         self.prompt_generator = PromptGenerator()
+        self.prompt_store = PromptStore(
+            config.PROMPT_STORE_DIR,
+            config.PROMPT_STORE_SPLIT_STATIC if split_static is None else split_static
+        )
         self.data = None
+        self.store = None
+        self.use_llm_cache = config.LLM_CACHE_ENABLED if use_llm_cache is None else use_llm_cache
+        self.llm_cache_ttl = config.LLM_CACHE_TTL if llm_cache_ttl is None else llm_cache_ttl
+        self.replay = replay  # 応答キャッシュだけで結果を再生（LLMには送信しない）
+        self.llm_stats = None
+
+    def set_participants(self, participants: List[Participant]) -> None:
+        """処理済みの参加者データを直接設定（ファイルからは読み込まない）"""
+        self.data = {'participants': [to_participant(participant) for participant in participants]}
 
     def load_data(self) -> bool:
-        """データを読み込み"""
+        """データを読み込み（スナップショットか参加者ストアがあれば参加者データは必要時に読み込む）"""
         try:
+            if self.data is not None:
+                self.logger.info(f"設定済みの参加者データを使用します: {len(self.data['participants'])}件")
+                return True
+
+            self.store = DataLoader.open_participant_snapshot()
+            if self.store is not None:
+                self.logger.info(f"スナップショットを開きました: {self.store.count()}件")
+                return True
+
+            self.store = DataLoader.open_participant_store()
+            if self.store is not None:
+                self.logger.info(f"参加者ストアを開きました: {self.store.count()}件")
+                return True
+
             self.data = DataLoader.load_processed_data()
             if self.data is None:
                 return False
+            self.data['participants'] = [Participant.from_dict(participant)
+                                         for participant in self.data.get('participants', [])]
 
             self.logger.info(f"処理されたデータを読み込みました: {len(self.data.get('participants', []))}件")
             return True
@@ -232,81 +341,268 @@ class AIAnalyzer:
             self.logger.error(f"データ読み込みエラー: {e}")
             return False
 
-    def create_analysis_prompt(self, name: str, participant_data: Dict[str, Any]) -> str:
+    def count_participants(self) -> int:
+        """参加者数を取得"""
+        if self.store is not None:
+            return self.store.count()
+        return len(self.data.get('participants', []))
+
+    def iter_participants(self, nicknames: Optional[List[str]] = None) -> Iterator[Participant]:
+        """参加者データを1件ずつ返す（ニックネーム指定時は該当者のみ）"""
+        if self.store is not None:
+            if nicknames:
+                rows = (row for nickname in nicknames for row in self.store.find_by_nickname(nickname))
+            else:
+                rows = self.store.iter_participants()
+            for row in rows:
+                yield to_participant(row)
+            return
+
+        for participant in self.data.get('participants', []):
+            if not nicknames or participant.get('nickname') in nicknames:
+                yield participant
+
+    def close(self) -> None:
+        """スナップショット・参加者ストアを閉じる"""
+        if self.store is not None:
+            self.store.close()
+            self.store = None
+
+    def create_analysis_prompt(self, name: str, participant_data: Participant) -> str:
         """参加者の分析用プロンプトを作成"""
         try:
-            profile_info = participant_data.get('profile_info', {})
-            form_data = participant_data.get('form_data', {})
-
-            return self.prompt_generator.create_analysis_prompt(name, profile_info, form_data)
+            return self.prompt_generator.create_analysis_prompt(
+                name, participant_data.profile(), participant_data.form()
+            )
 
         except Exception as e:
             self.logger.error(f"プロンプト作成エラー ({name}): {e}")
             return ""
 
-    def analyze_participant(self, name: str, participant_data: Dict[str, Any]) -> bool:
+    def analyze_participant(self, name: str, participant_data: Participant) -> bool:
         """参加者の分析を実行"""
         try:
-            self.logger.info(f"{name}さんのAI分析を開始...")
+            self.logger.debug(f"{name}さんのAI分析を開始...")
 
             # 分析用プロンプトを作成
-            prompt = self.create_analysis_prompt(name, participant_data)
-            if not prompt:
+            with metrics.stage('prompt_build'):
+                parts = self.prompt_generator.create_prompt_parts(
+                    name, participant_data.profile(), participant_data.form()
+                )
+            if parts is None:
                 self.logger.error(f"プロンプト作成に失敗: {name}")
                 return False
 
-            # プロンプトを保存
-            filepath = FileManager.save_analysis_prompt(name, prompt)
-            if filepath:
-                self.logger.info(f"分析用プロンプトを保存しました: {filepath}")
-                self.logger.info(f"{name}さんの分析用プロンプトが準備されました。")
-                self.logger.info("このプロンプトをCursorのAIに投げて分析を実行してください。")
-                return True
+            # プロンプトを保存（内容が変わっていなければ書き込まない）
+            with metrics.stage('file_write'):
+                filepath, written = self.prompt_store.save(name, *parts)
+            if written:
+                self.logger.debug(f"分析用プロンプトを保存しました: {filepath}")
             else:
-                self.logger.error(f"プロンプト保存に失敗: {name}")
-                return False
+                self.logger.debug(f"分析用プロンプトに変更はありません: {filepath}")
+            self.logger.debug(f"{name}さんの分析用プロンプトが準備されました。")
+            return True
 
         except Exception as e:
             self.logger.error(f"分析エラー ({name}): {e}")
             return False
 
-    def run_analysis(self) -> bool:
-        """全参加者の分析を実行"""
+    def run_analysis(self, nicknames: Optional[List[str]] = None, execute: bool = False) -> bool:
+        """全参加者（ニックネーム指定時は該当者のみ）の分析を実行（execute=True でLLMにも送信）"""
         try:
             self.logger.info("AI分析を開始します...")
 
             if not self.load_data():
                 return False
 
-            participants = self.data.get('participants', [])
-            if not participants:
+            if self.count_participants() == 0:
                 self.logger.error("分析対象の参加者が見つかりません")
                 return False
 
             success_count = 0
-            total_count = len(participants)
+            total_count = 0
+            progress = ProgressLogger(self.logger, "プロンプト生成",
+                                      total=None if nicknames else self.count_participants())
 
-            for participant in participants:
-                name = participant.get('nickname', 'Unknown')
+            for participant in self.iter_participants(nicknames):
+                total_count += 1
+                name = participant.name
                 if self.analyze_participant(name, participant):
                     success_count += 1
+                    progress.update()
+                else:
+                    progress.update(failed=1)
+            progress.finish()
+
+            if total_count == 0:
+                self.logger.error(f"指定された参加者が見つかりません: {nicknames}")
+                return False
+
+            # 全員を処理した場合は今回いなかった参加者を削除し、マニフェストと参照されなくなった部品を整理
+            if not nicknames:
+                removed = self.prompt_store.remove_stale_entries()
+                if removed:
+                    self.logger.info(f"対象外になった参加者のプロンプトを削除しました: {removed}件")
+            self.prompt_store.save_manifest()
+            if not nicknames:
+                self.prompt_store.remove_unreferenced_objects()
 
             self.logger.info("AI分析の準備が完了しました。")
             self.logger.info(f"成功: {success_count}/{total_count}人")
+            self.logger.info(f"プロンプト: 更新 {len(self.prompt_store.written)}件 / "
+                             f"変更なし {len(self.prompt_store.unchanged)}件")
             self.logger.info("各参加者の分析用プロンプトがoutputフォルダに保存されました。")
-            self.logger.info("これらのプロンプトをCursorのAIに投げて分析を実行してください。")
 
-            return success_count == total_count
+            if not execute:
+                self.logger.info("これらのプロンプトをCursorのAIに投げて分析を実行してください。")
+                return success_count == total_count
+
+            executed = self.run_llm_execution()
+            return success_count == total_count and executed
 
         except Exception as e:
             self.logger.error(f"AI分析エラー: {e}")
             return False
+        finally:
+            self.close()
+
+    def run_llm_execution(self, names: Optional[List[str]] = None) -> bool:
+        """保存済みのプロンプトをLLMに送信し、分析結果を *_analysis_result.txt に保存"""
+        try:
+            if names is None:
+                # 直前の run_analysis で準備した参加者を対象にする
+                names = self.prompt_store.written + self.prompt_store.unchanged
+            if not names:
+                self.logger.error("LLMに送信するプロンプトがありません")
+                return False
+
+            self.logger.info(f"LLMによる分析を開始します: {len(names)}人 ({config.LLM_MODEL})")
+            cache = None
+            if self.use_llm_cache or self.replay:
+                cache = ResponseCache(config.LLM_CACHE_FILE, config.LLM_CACHE_MAX_BYTES,
+                                      ttl=self.llm_cache_ttl, read_only=self.replay)
+
+            try:
+                stats = LLMExecutor(cache=cache).run(
+                    names, self.prompt_store.load, FileManager.save_analysis_result_text,
+                    self.prompt_store.get_prompt_hash if cache is not None else None
+                )
+            finally:
+                if cache is not None:
+                    cache.close()
+
+            self.llm_stats = stats
+            self.logger.info(f"LLMによる分析が完了しました: 成功 {stats['succeeded']}/{stats['total']}人 "
+                             f"(リトライ {stats['retries']}回, {stats['elapsed']:.1f}秒, "
+                             f"{stats['requests_per_sec']:.2f}件/秒)")
+            if cache is not None:
+                hits = stats['cache_hits']
+                lookups = hits + stats['cache_misses']
+                hit_ratio = hits / lookups * 100 if lookups else 0.0
+                self.logger.info(f"応答キャッシュ: ヒット率 {hit_ratio:.1f}% ({hits}/{lookups}件) / "
+                                 f"節約したリクエスト {hits}件")
+            return stats['failed'] == 0
+
+        except Exception as e:
+            self.logger.error(f"LLM実行エラー: {e}")
+            return False
+
+    def run_bundled_analysis(self, token_budget: Optional[int] = None,
+                             nicknames: Optional[List[str]] = None) -> bool:
+        """複数参加者をトークン上限内でまとめたプロンプトを作成"""
+        try:
+            self.logger.info("AI分析（バンドル）を開始します...")
+
+            if not self.load_data():
+                return False
+
+            # 共通の前置き（プロンプト本文とオフ会情報）は各バンドルに1回だけ含める
+            preamble = PromptStore.SEPARATOR.join((
+                self.prompt_generator.prompts_content, ProfileAnalyzer.create_offline_meeting_info()
+            ))
+            bundler = PromptBundler(preamble, token_budget)
+
+            for participant in self.iter_participants(nicknames):
+                name = str(participant.name)
+                profile_summary = ProfileAnalyzer.create_profile_summary(name, participant.profile())
+                form_summary = ProfileAnalyzer.create_form_summary(participant.form())
+                bundler.add(name, f"{profile_summary}\n\n{form_summary}")
+
+            bundles = bundler.finish()
+            if not bundles:
+                self.logger.error("分析対象の参加者が見つかりません")
+                return False
+
+            for name in bundler.oversized:
+                self.logger.warning(f"トークン上限を超えるため単独でまとめました: {name}")
+
+            manifest = BundleManager().save_bundles(bundles, bundler.token_budget)
+            participant_count = sum(len(bundle['participants']) for bundle in bundles)
+            self.logger.info(f"バンドルを作成しました: {len(bundles)}件 / 参加者 {participant_count}人 "
+                             f"(上限 約{bundler.token_budget}トークン)")
+            for entry in manifest['bundles']:
+                self.logger.info(f"  {entry['prompt_file']}: {len(entry['participants'])}人 "
+                                 f"約{entry['estimated_tokens']}トークン")
+            self.logger.info("分析結果は各バンドルの *_result.txt に保存し、--split-results で参加者ごとに分割してください。")
+            return True
+
+        except Exception as e:
+            self.logger.error(f"バンドル作成エラー: {e}")
+            return False
+        finally:
+            self.close()
 
 
 def main():
     """メイン関数"""
-    analyzer = AIAnalyzer()
-    success = analyzer.run_analysis()
+    parser = argparse.ArgumentParser(description="Skill-Zero Analyzer - AI Analyzer")
+    parser.add_argument('--nickname', action='append',
+                        help="指定した参加者のプロンプトだけを生成（複数指定可）")
+    parser.add_argument('--split-static', action='store_true',
+                        help="共通の前置き・後書きを1回だけ保存し、参加者ごとには本文だけを保存")
+    parser.add_argument('--print-prompt', metavar='NAME',
+                        help="保存済みのプロンプトを組み立てて表示")
+    parser.add_argument('--bundle', action='store_true',
+                        help="複数参加者をトークン上限内で1つのプロンプトにまとめる")
+    parser.add_argument('--token-budget', type=int, default=config.BUNDLE_TOKEN_BUDGET,
+                        help="バンドル1件あたりの入力トークン上限（概算）")
+    parser.add_argument('--split-results', action='store_true',
+                        help="バンドルの分析結果を参加者ごとの *_analysis_result.txt に分割")
+    parser.add_argument('--execute', action='store_true',
+                        help="プロンプト生成後にLLMへ送信し、分析結果を *_analysis_result.txt に保存")
+    parser.add_argument('--no-llm-cache', action='store_true',
+                        help="LLM応答キャッシュを使わない")
+    parser.add_argument('--llm-cache-ttl', type=float, metavar='SECONDS',
+                        help="指定秒数より古いキャッシュ済み応答を使わない")
+    parser.add_argument('--replay', action='store_true',
+                        help="LLMに送信せず、キャッシュ済みの応答だけで分析結果を再生（キャッシュは変更しない）")
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+
+    if args.split_results:
+        stats = BundleManager().split_results()
+        print(f"分割完了: バンドル {stats['bundles']}件 / 参加者 {stats['participants']}人 "
+              f"(区切りが見つからない参加者 {stats['missing']}人)")
+        return
+
+    analyzer = AIAnalyzer(split_static=args.split_static or None, use_llm_cache=not args.no_llm_cache,
+                          llm_cache_ttl=args.llm_cache_ttl, replay=args.replay)
+
+    if args.print_prompt:
+        prompt = analyzer.prompt_store.load(args.print_prompt)
+        if prompt is None:
+            print(f"プロンプトが見つかりません: {args.print_prompt}")
+        else:
+            print(prompt, end='')
+        return
+
+    with instrument('ai_analyzer', args.metrics, args.profile):
+        if args.bundle:
+            success = analyzer.run_bundled_analysis(args.token_budget, args.nickname)
+        else:
+            success = analyzer.run_analysis(args.nickname, execute=args.execute or args.replay)
+            if success and (args.execute or args.replay):
+                print("LLMによる分析が正常に完了しました。")
 
     if success:
         print("AI分析の準備が正常に完了しました。")
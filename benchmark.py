@@ -0,0 +1,880 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Skill-Zero Analyzer - Benchmark
+処理性能を計測するベンチマークスクリプト
+"""
+
+import argparse
+import contextlib
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, List, Any, Optional
+
+import pandas as pd
+
+from config import Config, config
+from data_processor import DataProcessor, DataMerger, ProfileTextExtractor
+from ai_analyzer import AIAnalyzer
+from generate_analysis_results import build_reports, compile_template, convert_markdown_to_html, read_template
+from llm_client import LLMClient, LLMExecutor
+from metrics import metrics
+from models import Participant
+from participant_snapshot import ParticipantSnapshot, write_snapshot
+from search_index import SEARCH_FIELDS, ParticipantIndex, field_text, parse_query
+from synthetic_data import SyntheticDataGenerator
+from table_reader import read_table
+from taxonomy import normalize
+from utils import FileUtils
+from watcher import CsvWatcher
+
+
+def create_sample_profile(index: int) -> str:
+    """計測用のプロフィールテキストを作成"""
+    sections = [f"参加者{index}さんのプロフィール"]
+    for header in config.PROFILE_SECTIONS.values():
+        sections.append(header)
+        sections.append(f"{header}の内容です。以前は事務として勤務していました。\n趣味は読書と散歩です。")
+    sections.append("ポートフォリオ")
+    return '\n'.join(sections)
+
+
+def create_sample_dataframe(rows: int) -> pd.DataFrame:
+    """計測用のフォーム回答データを作成"""
+    records = []
+    for i in range(rows):
+        records.append({
+            config.get_csv_column('timestamp'): f"2025/07/23 17:{i % 60:02d}:00",
+            config.get_csv_column('email'): f"user{i}@example.com",
+            config.get_csv_column('nickname'): f"参加者{i}",
+            config.get_csv_column('profile_url'): f"https://libecity.com/user_profile/{i}",
+            config.get_csv_column('profile_data'): create_sample_profile(i) if i % 2 == 0 else float('nan'),
+            config.get_csv_column('experience'): "【仕事】システム提案〜カスタマーサポート",
+            config.get_csv_column('strengths'): "業務の細分化・標準化",
+            config.get_csv_column('appreciation'): "説明が丁寧",
+            config.get_csv_column('not_bad_at'): "相談を受けること",
+            config.get_csv_column('weaknesses'): "口頭での説明"
+        })
+    return pd.DataFrame(records)
+
+
+def create_sample_sections(index: int) -> Dict[str, str]:
+    """計測用の分析結果（セクションごとの内容）を作成"""
+    proposals = []
+    for number in range(1, 4):
+        actions = '\n'.join(f"・行動{k}（期間：{k}か月、期待効果：**効果{k}**）" for k in range(1, 6))
+        proposals.append(f"【提案{number}】方向性{number}\n参加者{index}さんの経験を活かした提案です。\n"
+                         f"**収益目標**: 月額3万円〜年額50万円\n具体的なアクション:\n{actions}")
+    return {
+        'analysis_summary': f"参加者{index}さんは**業務の標準化**が得意です。\n\n説明の丁寧さも強みです。",
+        'proposal_content': '\n\n'.join(proposals),
+        'tips_content': "・自己紹介で実績を伝える\n・**相談を受けた経験**を話す",
+        'risk_content': "無理のない範囲で進めましょう。"
+    }
+
+
+def measure(func: Callable[[], Any], repeat: int) -> float:
+    """最速の実行時間（秒）を計測"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def benchmark_rows(rows: int, repeat: int, workers: int = 1) -> List[Dict[str, Any]]:
+    """行単位処理（iterrows）と列単位処理のスループットを比較"""
+    processor = DataProcessor(workers=1, use_cache=False)
+    df = create_sample_dataframe(rows)
+
+    def iterrows_path():
+        return [processor.process_participant_data(row) for _, row in df.iterrows()]
+
+    def columnar_path():
+        return processor.build_participants(df)
+
+    paths = [('iterrows', iterrows_path), ('columnar', columnar_path)]
+
+    parallel_processor = None
+    if workers > 1:
+        parallel_processor = DataProcessor(workers=workers, use_cache=False)
+        paths.append((f'columnar/{workers}w', lambda: parallel_processor.build_participants(df)))
+
+    results = []
+    try:
+        for name, func in paths:
+            elapsed = measure(func, repeat)
+            results.append({'name': name, 'rows': rows, 'seconds': elapsed, 'rows_per_sec': rows / elapsed})
+    finally:
+        if parallel_processor is not None:
+            parallel_processor.close()
+    return results
+
+
+class StubLLMHandler(BaseHTTPRequestHandler):
+    """OpenAI互換APIの代わりに固定の分析結果を返すスタブ
+
+    受け取ったリクエストの数と、プロンプトごとの受信時刻を記録する。retry_after を指定すると
+    各プロンプトの1回目のリクエストに Retry-After 付きの429を返す。
+    """
+
+    latency = 0.05
+    failure_rate = 0.0
+    retry_after = None
+    lock = threading.Lock()
+    arrivals = {}  # プロンプト → 受信時刻の一覧
+
+    @classmethod
+    def reset(cls, latency: float, failure_rate: float, retry_after: Optional[str] = None) -> None:
+        """応答の設定と記録を初期化"""
+        cls.latency = latency
+        cls.failure_rate = failure_rate
+        cls.retry_after = retry_after
+        cls.arrivals = {}
+
+    @classmethod
+    def request_count(cls) -> int:
+        """受け取ったリクエストの数"""
+        return sum(len(times) for times in cls.arrivals.values())
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        request = json.loads(self.rfile.read(length))
+        prompt = request['messages'][0]['content']
+        with self.lock:
+            times = self.arrivals.setdefault(prompt, [])
+            times.append(time.monotonic())
+            first = len(times) == 1
+        time.sleep(self.latency)
+
+        headers = {}
+        if self.retry_after is not None and first:
+            body = json.dumps({'error': {'message': 'stub rate limited'}}).encode('utf-8')
+            headers['Retry-After'] = self.retry_after
+            self.send_response(429)
+        elif random.random() < self.failure_rate:
+            body = json.dumps({'error': {'message': 'stub overloaded'}}).encode('utf-8')
+            self.send_response(503)
+        else:
+            content = f"## 分析サマリー\n{len(prompt)}文字のプロンプトを受け取りました。"
+            body = json.dumps({'choices': [{'message': {'role': 'assistant', 'content': content}}]},
+                              ensure_ascii=False).encode('utf-8')
+            self.send_response(200)
+
+        headers['Content-Type'] = 'application/json'
+        headers['Content-Length'] = str(len(body))
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def check_llm_stats(label: str, stats: Dict[str, Any], requests: int, burst: int, rate: float) -> None:
+    """LLM実行の結果がスタブの受信記録と合っているかを確認
+
+    リトライ1回ごとにリクエストが1件増えること、送信数（リトライを含む）が
+    トークンバケットの上限（最初のまとめて送信できる数＋経過時間×1秒あたりの送信数）を超えないことを確かめる。
+    """
+    received = StubLLMHandler.request_count()
+    if stats['succeeded'] + stats['failed'] != requests:
+        raise ValueError(f"{label}: 成功と失敗の合計が送信数と異なります: {stats['succeeded'] + stats['failed']}件")
+    if received != requests + stats['retries']:
+        raise ValueError(f"{label}: スタブの受信数が送信数＋リトライ回数と異なります: "
+                         f"{received}件 / {requests}件＋{stats['retries']}回")
+    times = sorted(t for arrivals in StubLLMHandler.arrivals.values() for t in arrivals)
+    # 受信時刻は送信後の通信を含むため、最初の受信から最後の受信までで判定し、少しの誤差を許す
+    allowed = burst + (times[-1] - times[0]) * rate * 1.05 + 1
+    if received > allowed:
+        raise ValueError(f"{label}: 送信ペースが上限を超えています: {received}件 / 上限 {allowed:.1f}件")
+
+
+def benchmark_llm(requests: int, concurrency: int, latency: float, failure_rate: float,
+                  rate: float) -> List[Dict[str, Any]]:
+    """ローカルのスタブサーバーに対してLLM実行ステージのスループットを計測
+
+    計測のたびに、成功・失敗・リトライの件数とスタブの受信数、送信ペースが合っているかを確認する。
+    最後に各プロンプトの1回目に429（小数の Retry-After 付き）を返すスタブで、リトライが
+    Retry-After の秒数だけ待ち、送信ペースの制限を受けることを確認する。
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubLLMHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    api_base = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    names = [f"参加者{i}" for i in range(requests)]
+    prompt = create_sample_profile(0)
+
+    # リトライ待ちで計測が長引かないよう間隔を短くする
+    config.LLM_RETRY_BACKOFF_BASE = 0.01
+
+    results = []
+    try:
+        for level in sorted({1, concurrency}):
+            StubLLMHandler.reset(latency, failure_rate)
+            client = LLMClient(api_base=api_base, api_key='')
+            executor = LLMExecutor(client, concurrency=level, rate_per_sec=rate, burst=level)
+            stats = executor.run(names, lambda name: f"{name}\n{prompt}", lambda name, text: None)
+            check_llm_stats(f'llm/{level}c', stats, requests, level, rate)
+            if failure_rate == 0 and (stats['retries'] or stats['failed']):
+                raise ValueError(f"llm/{level}c: 失敗しないスタブでリトライ・失敗が発生しました")
+            results.append({
+                'name': f'llm/{level}c',
+                'rows': requests,
+                'seconds': stats['elapsed'],
+                'rows_per_sec': stats['requests_per_sec'],
+                'retries': stats['retries'],
+                'failed': stats['failed']
+            })
+
+        # 429の後のリトライ: 送信ごとにトークンを取得し、小数の Retry-After だけ待つ
+        retry_after = 0.2
+        retry_rate = 20.0
+        retry_names = names[:10]
+        StubLLMHandler.reset(0.0, 0.0, str(retry_after))
+        client = LLMClient(api_base=api_base, api_key='')
+        # 1回目はまとめて送信し、リトライだけがトークンの補充を待つようにする
+        executor = LLMExecutor(client, concurrency=len(retry_names), rate_per_sec=retry_rate, burst=len(retry_names))
+        stats = executor.run(retry_names, lambda name: f"{name}\n{prompt}", lambda name, text: None)
+        check_llm_stats('llm/retry', stats, len(retry_names), len(retry_names), retry_rate)
+        if stats['retries'] != len(retry_names) or stats['failed']:
+            raise ValueError(f"llm/retry: 429の後のリトライ回数が想定と異なります: {stats['retries']}回")
+        waits = [arrivals[1] - arrivals[0] for arrivals in StubLLMHandler.arrivals.values()]
+        if min(waits) < retry_after * 0.95:
+            raise ValueError(f"llm/retry: Retry-After（{retry_after}秒）より早くリトライしました: {min(waits):.3f}秒")
+        results.append({
+            'name': 'llm/retry',
+            'rows': len(retry_names),
+            'seconds': stats['elapsed'],
+            'rows_per_sec': stats['requests_per_sec'],
+            'retries': stats['retries'],
+            'failed': stats['failed']
+        })
+    finally:
+        server.shutdown()
+        server.server_close()
+    return results
+
+
+def benchmark_html(reports: int, repeat: int) -> List[Dict[str, Any]]:
+    """HTMLレポートへの埋め込み（プレースホルダーごとの置換と解析済みテンプレート）を比較
+
+    Markdownの変換は両方で同じため事前に済ませ、テンプレートへの埋め込みだけを計測する。
+    """
+    template = read_template(config.get_output_path('analysis_result_template.html'))
+    compiled = compile_template(template)
+    samples = []
+    for i in range(reports):
+        sections = create_sample_sections(i)
+        values = {'NAME': f"参加者{i}"}
+        for slot, key in (('ANALYSIS_SUMMARY', 'analysis_summary'), ('PROPOSAL_CONTENT', 'proposal_content'),
+                          ('TIPS_CONTENT', 'tips_content'), ('RISK_CONTENT', 'risk_content')):
+            values[slot] = convert_markdown_to_html(sections[key])
+        samples.append(values)
+
+    def replace_path():
+        # 以前の実装と同じく、プレースホルダーごとにテンプレート全体を置換
+        results = []
+        for values in samples:
+            html = template
+            for slot, value in values.items():
+                html = html.replace('{{' + slot + '}}', value)
+            results.append(html)
+        return results
+
+    def compiled_path():
+        return [compiled.fill(values) for values in samples]
+
+    results = []
+    for name, func in (('replace', replace_path), ('compiled', compiled_path)):
+        elapsed = measure(func, repeat)
+        results.append({'name': name, 'rows': reports, 'seconds': elapsed, 'rows_per_sec': reports / elapsed})
+    return results
+
+
+# 線形性の確認に使う最悪ケースに近い入力（先頭の文字列, 繰り返す文字列）
+ADVERSARIAL_MARKDOWN = {
+    'proposals': ('【提案1】**見出し**\n', '【提案'),
+    'actions': ('', '具体的なアクション:\n・行動 '),
+    'bullets': ('', '・**項目** & 説明\n'),
+    'bold': ('**', 'あ*'),
+    'one_line': ('', '**強調**【提案2】具体的なアクション: '),
+}
+
+
+def create_adversarial_markdown(name: str, size: int) -> str:
+    """size 文字程度の計測用Markdownを作成"""
+    prefix, unit = ADVERSARIAL_MARKDOWN[name]
+    return prefix + unit * ((size - len(prefix)) // len(unit))
+
+
+def benchmark_markdown(size: int, repeat: int) -> List[Dict[str, Any]]:
+    """Markdown変換の処理時間が入力の長さに比例することを確認（size/4 と size の時間を比較）"""
+    results = []
+    for name in ADVERSARIAL_MARKDOWN:
+        small_text = create_adversarial_markdown(name, size // 4)
+        large_text = create_adversarial_markdown(name, size)
+        small = measure(lambda: convert_markdown_to_html(small_text), repeat)
+        large = measure(lambda: convert_markdown_to_html(large_text), repeat)
+        results.append({'name': name, 'chars': len(large_text), 'seconds': large, 'ratio': large / small})
+    return results
+
+
+# 入力を4倍にしたときの時間比がこれ以上なら線形ではないと判定
+MARKDOWN_MAX_RATIO = 8
+
+
+def print_markdown_results(results: List[Dict[str, Any]]) -> None:
+    """Markdown変換の計測結果を表示（入力4倍で時間が8倍以上なら線形ではないと判定）"""
+    for result in results:
+        judgement = 'OK' if result['ratio'] < MARKDOWN_MAX_RATIO else 'NG'
+        print(f"{result['name']:<12} {result['chars']:>9}文字  {result['seconds']:.3f}秒  "
+              f"入力1/4との時間比 {result['ratio']:.1f}倍  {judgement}")
+
+
+def benchmark_startup(repeat: int) -> List[Dict[str, Any]]:
+    """フォーム回答1件だけのデータ処理を、起動（import）を含めてCSVの読み込み方法ごとに計測"""
+    script = str(Path(__file__).resolve().with_name('data_processor.py'))
+    commands = [
+        ('python', [sys.executable, '-c', 'pass']),
+        ('import pandas', [sys.executable, '-c', 'import pandas']),
+        ('csv', [sys.executable, script, '--csv-backend', 'csv']),
+        ('pandas', [sys.executable, script, '--csv-backend', 'pandas'])
+    ]
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        SyntheticDataGenerator().write_csv(os.path.join(directory, config.CSV_FILE_PATH), 1)
+        for name, command in commands:
+            elapsed = measure(lambda: subprocess.run(command, cwd=directory, check=True, capture_output=True), repeat)
+            results.append({'name': name, 'seconds': elapsed})
+    return results
+
+
+def print_startup_results(results: List[Dict[str, Any]]) -> None:
+    """起動時間の計測結果を表示"""
+    for result in results:
+        print(f"{result['name']:<14} {result['seconds'] * 1000:>8.0f}ms")
+
+
+def benchmark_memory(rows: int) -> List[Dict[str, Any]]:
+    """処理済みデータ（JSON）を辞書とレコードで保持したときのメモリ使用量を比較"""
+    processor = DataProcessor(workers=1, use_cache=False)
+    lines = [json.dumps(participant.to_dict(), ensure_ascii=False)
+             for participant in processor.build_participants(create_sample_dataframe(rows))]
+
+    # レコードから辞書に戻したJSONが元のJSONと一致するか（項目の順序を含む）
+    for line in lines:
+        if json.dumps(Participant.from_dict(json.loads(line)).to_dict(), ensure_ascii=False) != line:
+            raise ValueError(f"レコードとJSONの相互変換で内容が変わりました: {line[:80]}")
+
+    loaders = [
+        ('dict', lambda: [json.loads(line) for line in lines]),
+        ('record', lambda: [Participant.from_dict(json.loads(line)) for line in lines])
+    ]
+
+    results = []
+    for name, loader in loaders:
+        tracemalloc.start()
+        start = time.perf_counter()
+        participants = loader()
+        elapsed = time.perf_counter() - start
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del participants
+        results.append({'name': name, 'rows': rows, 'seconds': elapsed, 'bytes': current})
+    return results
+
+
+def benchmark_snapshot(rows: int, repeat: int) -> List[Dict[str, Any]]:
+    """処理済みJSONの読み込みとスナップショットを開く時間、ランダムな参加者の参照時間を比較"""
+    processor = DataProcessor(workers=1, use_cache=False)
+    participants = processor.build_participants(create_sample_dataframe(rows))
+    picks = random.Random(0).sample(range(rows), min(rows, 100))
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        json_file = os.path.join(directory, 'processed_data.json')
+        snapshot_file = os.path.join(directory, 'participants.snapshot')
+        FileUtils.safe_write_json(json_file, {'participants': [participant.to_dict() for participant in participants]})
+        write_snapshot(snapshot_file, participants)
+
+        # スナップショットから読み込んだ参加者が元の参加者と一致するか
+        with ParticipantSnapshot(snapshot_file) as snapshot:
+            for index in picks:
+                if snapshot.participant(index) != participants[index]:
+                    raise ValueError(f"スナップショットの内容が元の参加者と異なります: {index}")
+
+        def json_open():
+            return FileUtils.safe_read_json(json_file)
+
+        def json_lookup():
+            data = FileUtils.safe_read_json(json_file)
+            return [data['participants'][index]['profile_info'].get('bio') for index in picks]
+
+        def snapshot_open():
+            ParticipantSnapshot(snapshot_file).close()
+
+        def snapshot_lookup():
+            with ParticipantSnapshot(snapshot_file) as snapshot:
+                return [snapshot.value(index, 'profile_info.bio') for index in picks]
+
+        for name, func in [('json/open', json_open), ('snapshot/open', snapshot_open),
+                           (f'json/{len(picks)}件', json_lookup), (f'snapshot/{len(picks)}件', snapshot_lookup)]:
+            elapsed = measure(func, repeat)
+            results.append({'name': name, 'seconds': elapsed})
+
+        for path in (json_file, snapshot_file):
+            results.append({'name': os.path.basename(path), 'bytes': os.path.getsize(path)})
+    return results
+
+
+def print_snapshot_results(results: List[Dict[str, Any]]) -> None:
+    """スナップショットの計測結果を表示"""
+    for result in results:
+        if 'seconds' in result:
+            print(f"{result['name']:<24} {result['seconds'] * 1000:>10.2f}ms")
+        else:
+            print(f"{result['name']:<24} {result['bytes'] / 1024 / 1024:>10.1f}MB")
+
+
+# 検索の計測に使う検索式（合成データの語彙から、件数の多い語・少ない語・1文字・OR・空白を含む語）
+SEARCH_QUERIES = ['営業', 'システムエンジニア', '簿記２級', 'excel 集計', '看護師 OR 保育士', '"toeic 600点"',
+                  '函館 キャンプ', '猫', '参加者000123', '存在しない語句']
+
+
+def benchmark_search(rows: int, repeat: int) -> List[Dict[str, Any]]:
+    """転置インデックスの作成時間と、全件を走査する検索との検索時間を比較"""
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = os.path.join(directory, 'responses.csv')
+        SyntheticDataGenerator().write_csv(csv_path, rows)
+        processor = DataProcessor(workers=1, use_cache=False, csv_backend='csv')
+        try:
+            participants = DataMerger.merge_duplicate_participants(
+                processor.build_participants(read_table(csv_path, 'csv')))
+        finally:
+            processor.close()
+
+    # 名前の重複（統合キーがニックネーム以外の場合）でも別の参加者として検索できるよう、
+    # 先頭の参加者と同じ名前で内容の異なる参加者を加える
+    duplicate = participants[1].copy()
+    duplicate.nickname = participants[0].nickname
+    participants.append(duplicate)
+    texts = [[field_text(participant, field) for field in SEARCH_FIELDS] for participant in participants]
+
+    def scan(query: str) -> set:
+        groups = parse_query(query)
+        return {position for position, fields in enumerate(texts)
+                if any(all(any(text and term in text for text in fields) for term in group) for group in groups)}
+
+    index = ParticipantIndex()
+    start = time.perf_counter()
+    index.add_all(participants)
+    results = [{'name': 'index/build', 'participants': len(index), 'seconds': time.perf_counter() - start}]
+    if len(index) != len(participants):
+        raise ValueError(f"インデックスの件数が参加者数と異なります: {len(index)}件 / {len(participants)}人")
+
+    for query in SEARCH_QUERIES:
+        # 転置インデックスの検索結果が全件走査の結果と一致するか
+        expected = scan(query)
+        found = {result['key'] for result in index.search(query, limit=0)}
+        if found != expected:
+            raise ValueError(f"検索結果が全件走査と異なります: {query}（{len(found)}件 / {len(expected)}件）")
+        results.append({'name': f'scan/{query}', 'hits': len(expected),
+                        'seconds': measure(lambda: scan(query), repeat)})
+        results.append({'name': f'index/{query}', 'hits': len(found),
+                        'seconds': measure(lambda: index.search(query), repeat)})
+    return results
+
+
+def print_search_results(results: List[Dict[str, Any]]) -> None:
+    """検索の計測結果を表示"""
+    for result in results:
+        count = f"{result['participants']}人" if 'participants' in result else f"{result['hits']}件"
+        print(f"{result['name']:<32} {count:>10} {result['seconds'] * 1000:>10.2f}ms")
+
+
+def benchmark_taxonomy(rows: int, repeat: int) -> List[Dict[str, Any]]:
+    """キーワードごとの部分文字列検索（any）と Aho-Corasick 法の照合器の時間を比較
+
+    経歴の語（自己紹介の行ごと）と分類語彙のすべての語（分類の対象セクションごと）で計測する。
+    """
+    generator = SyntheticDataGenerator()
+    extractor = ProfileTextExtractor()
+    taxonomy = extractor.taxonomy
+    profiles = [extractor.parse_profile(generator.profile_text(generator.nickname(i))) for i in range(rows)]
+    lines = [line.strip() for profile in profiles for line in profile['bio'].split('\n')]
+    texts = [normalize('\n'.join(profile[section] for section in taxonomy.sections)) for profile in profiles]
+    terms = taxonomy.category_matcher.keywords
+
+    cases = [
+        ('work', len(taxonomy.work_terms), lines,
+         lambda line: any(term in line for term in taxonomy.work_terms), taxonomy.work_matcher.search),
+        ('categories', len(terms), texts,
+         lambda text: {number for number, term in enumerate(terms) if term in text}, taxonomy.category_matcher.find)
+    ]
+
+    results = []
+    for name, keyword_count, inputs, scan, matcher in cases:
+        # 照合器の結果がキーワードごとの検索と一致するか
+        for value in inputs:
+            if scan(value) != matcher(value):
+                raise ValueError(f"照合器の結果がキーワードごとの検索と異なります: {value[:40]}")
+        for method, func in (('any', scan), ('matcher', matcher)):
+            elapsed = measure(lambda: [func(value) for value in inputs], repeat)
+            results.append({'name': f"{name}/{method}", 'keywords': keyword_count, 'inputs': len(inputs),
+                            'seconds': elapsed})
+    return results
+
+
+def print_taxonomy_results(results: List[Dict[str, Any]]) -> None:
+    """照合の計測結果を表示"""
+    for result in results:
+        print(f"{result['name']:<20} {result['keywords']:>5}語 {result['inputs']:>8}件  "
+              f"{result['seconds'] * 1000:>10.2f}ms  {result['seconds'] / result['inputs'] * 1e6:>8.2f}µs/件")
+
+
+def run_watch_check(work_dir: str, rows: int, polls: int) -> List[Dict[str, Any]]:
+    """監視モードで追記を少しずつ処理した結果が、同じ内容を全件処理した結果と一致するかを確認
+
+    作業ディレクトリに切り替えるため、新しいプロセスで呼ぶ。合成CSVを任意のバイト位置で区切って追記し、
+    引用符で囲まれたプロフィールの途中で終わる追記を必ず含める。途中で監視を開き直して続きから再開し、
+    最後にCSVを切り詰めて全件を処理し直してから、残りを追記する。処理するたびに、参加者ストアの内容と
+    読み込み済みの位置までのCSVを全件処理した結果、AIAnalyzer が読み込む参加者数を比べる。
+    """
+    logging.disable(logging.INFO)
+    use_work_directory(work_dir)
+    source = os.path.join(work_dir, 'source.csv')
+    SyntheticDataGenerator().write_csv(source, rows)
+    with open(source, 'rb') as f:
+        data = f.read()
+
+    # 列名にも改行を含むため、ヘッダーの終わりはCSVの行末（\r\n）で探す
+    header_end = data.index(b'\r\n') + 2
+    # プロフィールの1行目（見出し）の直後は、引用符で囲まれた値の途中
+    quoted = data.index('さんのプロフィール\n'.encode('utf-8'), len(data) // 2) + len('さんのプロフィール\n'.encode('utf-8'))
+    cuts = sorted({header_end, quoted, *random.Random(0).sample(range(header_end, len(data)), polls)} | {len(data)})
+    restart = cuts[len(cuts) // 2]
+    truncate = cuts[len(cuts) // 4]
+
+    processor = DataProcessor(workers=1, use_cache=False, csv_backend='csv')
+    prefix_file = os.path.join(work_dir, 'prefix.csv')
+    checks = 0
+
+    def comparable(participant: Dict[str, Any]) -> str:
+        # 抽出した日時は処理した時刻のため比べない
+        profile_info = participant.get('profile_info')
+        if isinstance(profile_info, dict):
+            participant = dict(participant, profile_info={key: value for key, value in profile_info.items()
+                                                          if key != 'extracted_at'})
+        return json.dumps(participant, ensure_ascii=False, sort_keys=True)
+
+    def check(watcher: 'CsvWatcher', label: str) -> None:
+        # 読み込み済みの位置（完全な行の終わり）までを全件処理した結果と比べる
+        nonlocal checks
+        with open(prefix_file, 'wb') as f:
+            f.write(data[:watcher.tail.offset])
+        expected = [comparable(participant.to_dict()) for participant in DataMerger.merge_duplicate_participants(
+            processor.build_participants(read_table(prefix_file, 'csv')))]
+        actual = [comparable(participant) for participant in watcher.store.iter_participants()]
+        if actual != expected:
+            raise ValueError(f"監視モードの結果が全件処理の結果と異なります（{label}）: {len(actual)}人 / {len(expected)}人")
+
+        # JSON・スナップショットの書き出し前でも、読み込み側は参加者ストアの最新の内容を使う
+        analyzer = AIAnalyzer()
+        try:
+            if not analyzer.load_data() or analyzer.count_participants() != len(expected):
+                raise ValueError(f"書き出し前の参加者数が参加者ストアと異なります（{label}）")
+        finally:
+            analyzer.close()
+        checks += 1
+
+    def open_watcher() -> 'CsvWatcher':
+        watcher = CsvWatcher(workers=1, use_cache=False, generate_prompts=False)
+        if not watcher.start():
+            raise ValueError("監視モードを開始できません")
+        return watcher
+
+    poll_seconds = 0.0
+    poll_rows = 0
+    try:
+        with open(config.CSV_FILE_PATH, 'wb') as f:
+            f.write(data[:cuts[0]])
+        watcher = open_watcher()
+        check(watcher, '開始')
+        for start, end in zip(cuts, cuts[1:]):
+            with open(config.CSV_FILE_PATH, 'ab') as f:
+                f.write(data[start:end])
+            started = time.perf_counter()
+            poll_rows += watcher.poll()
+            poll_seconds += time.perf_counter() - started
+            if start < quoted <= end and watcher.tail.offset > quoted:
+                raise ValueError("引用符で囲まれた値の途中までの行を読み込みました")
+            check(watcher, f"{end}バイト")
+            if end == restart:
+                watcher.close()
+                watcher = open_watcher()
+                check(watcher, '再開')
+
+        # 切り詰めたCSVは全件を処理し直し、その後の追記は続きから処理する
+        with open(config.CSV_FILE_PATH, 'wb') as f:
+            f.write(data[:truncate])
+        watcher.poll()
+        check(watcher, '切り詰め')
+        with open(config.CSV_FILE_PATH, 'ab') as f:
+            f.write(data[truncate:])
+        watcher.poll()
+        check(watcher, '切り詰め後の追記')
+        watcher.close()
+
+        started = time.perf_counter()
+        DataMerger.merge_duplicate_participants(processor.build_participants(read_table(source, 'csv')))
+        batch_seconds = time.perf_counter() - started
+    finally:
+        processor.close()
+
+    return [
+        {'name': 'batch', 'rows': rows, 'seconds': batch_seconds, 'checks': 0},
+        {'name': f'watch/{len(cuts) - 1}回', 'rows': poll_rows, 'seconds': poll_seconds, 'checks': checks}
+    ]
+
+
+def benchmark_watch(rows: int, polls: int, work_dir: Optional[str] = None) -> List[Dict[str, Any]]:
+    """監視モードの追記処理が全件処理と一致するかを確認し、処理時間を比較"""
+    context = multiprocessing.get_context('spawn')
+    with tempfile.TemporaryDirectory(dir=work_dir) as directory:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            return executor.submit(run_watch_check, directory, rows, polls).result()
+
+
+def print_watch_results(results: List[Dict[str, Any]]) -> None:
+    """監視モードの確認結果を表示"""
+    for result in results:
+        checks = f"  {result['checks']}回の確認で全件処理と一致" if result['checks'] else ''
+        print(f"{result['name']:<12} {result['rows']:>8}行  {result['seconds']:.3f}秒{checks}")
+
+
+def print_memory_results(results: List[Dict[str, Any]]) -> None:
+    """メモリ使用量の計測結果を表示"""
+    base = results[0]['bytes']
+    for result in results:
+        print(f"{result['name']:<8} {result['rows']:>8}人  {result['bytes'] / 1024 / 1024:>8.1f}MB  "
+              f"{result['bytes'] / result['rows']:>7,.0f} bytes/人  {result['seconds']:.3f}秒  "
+              f"辞書との比 {result['bytes'] / base:.2f}")
+
+
+# 規模別ベンチマークで計測する段階（実行順）
+SUITE_STAGES = ('generate', 'process', 'prompts', 'reports')
+
+# 計測のばらつきとみなす差（これ以下の悪化は基準値の許容範囲を超えても退行としない）
+REGRESSION_MIN_DELTA = {'seconds': 0.05, 'peak_mb': 5.0}
+
+
+def use_work_directory(work_dir: str) -> None:
+    """入力CSVと output/ 以下の出力先をすべて作業ディレクトリに切り替える"""
+    output_dir = os.path.join(work_dir, 'output')
+    prefix = Config.OUTPUT_DIR + '/'
+    for key, value in list(vars(Config).items()):
+        if key.isupper() and isinstance(value, str) and value.startswith(prefix):
+            setattr(Config, key, os.path.join(output_dir, value[len(prefix):]))
+    Config.OUTPUT_DIR = output_dir
+    Config.CSV_FILE_PATH = os.path.join(work_dir, 'form_answer.csv')
+
+
+def run_suite_stage(stage: str, work_dir: str, participants: int, workers: int,
+                    template_text: str) -> Dict[str, Any]:
+    """規模別ベンチマークの1段階を実行（ピークメモリを段階ごとに計るため、段階ごとに新しいプロセスで呼ぶ）"""
+    logging.disable(logging.INFO)
+    use_work_directory(work_dir)
+    metrics.reset()
+    started = time.perf_counter()
+
+    if stage == 'generate':
+        generator = SyntheticDataGenerator()
+        generator.write_csv(config.CSV_FILE_PATH, participants)
+        generator.write_analysis_results(config.OUTPUT_DIR, participants)
+        success = True
+    elif stage == 'process':
+        success = DataProcessor(workers=workers, use_cache=False).run() is not None
+    elif stage == 'prompts':
+        success = AIAnalyzer().run_analysis()
+    else:
+        # ファイルごとの生成完了メッセージは表示しない
+        result_files = sorted(Path(config.OUTPUT_DIR).glob('*_analysis_result.txt'))
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            stats = build_reports(result_files, template_text, workers, force=True)
+        success = stats['failed'] == 0
+
+    seconds = time.perf_counter() - started
+    # ru_maxrss はLinuxではKB単位。並列実行時はワーカープロセスの最大値も含める
+    peak_kb = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                  resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return {
+        'participants': participants,
+        'stage': stage,
+        'success': success,
+        'seconds': round(seconds, 3),
+        'peak_mb': round(peak_kb / 1024, 1),
+        'breakdown': {name: values['wall_seconds'] for name, values in metrics.snapshot(stage)['stages'].items()}
+    }
+
+
+def benchmark_suite(sizes: List[int], workers: int, work_dir: Optional[str] = None) -> List[Dict[str, Any]]:
+    """合成データで各段階の実行時間とピークメモリを参加者数ごとに計測"""
+    template_text = read_template(config.get_output_path('analysis_result_template.html'))
+    context = multiprocessing.get_context('spawn')
+
+    results = []
+    for size in sizes:
+        with tempfile.TemporaryDirectory(dir=work_dir) as directory:
+            for stage in SUITE_STAGES:
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                    result = executor.submit(run_suite_stage, stage, directory, size, workers, template_text).result()
+                results.append(result)
+                print_suite_result(result)
+    return results
+
+
+def print_suite_result(result: Dict[str, Any]) -> None:
+    """規模別ベンチマークの1段階分の結果を表示"""
+    status = '' if result['success'] else '  失敗'
+    breakdown = ', '.join(f"{name} {seconds:.2f}秒" for name, seconds in result['breakdown'].items())
+    print(f"{result['participants']:>8}人  {result['stage']:<9} {result['seconds']:>8.2f}秒  "
+          f"{result['participants'] / result['seconds']:>10,.0f}人/秒  ピーク {result['peak_mb']:>7.1f}MB{status}"
+          + (f"  ({breakdown})" if breakdown else ''))
+
+
+def save_baseline(results: List[Dict[str, Any]], path: str) -> None:
+    """計測結果を基準値として保存"""
+    FileUtils.safe_write_json(path, {
+        'created_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'results': [{key: result[key] for key in ('participants', 'stage', 'seconds', 'peak_mb')}
+                    for result in results]
+    })
+
+
+def compare_with_baseline(results: List[Dict[str, Any]], baseline: Dict[str, Any],
+                          tolerance: float) -> List[str]:
+    """基準値より tolerance の割合を超えて悪化した段階を返す"""
+    entries = {(entry['participants'], entry['stage']): entry for entry in baseline.get('results', [])}
+    regressions = []
+    for result in results:
+        entry = entries.get((result['participants'], result['stage']))
+        # データ生成は計測の準備のため判定しない
+        if entry is None or result['stage'] == 'generate':
+            continue
+        for key, label, unit in (('seconds', '実行時間', '秒'), ('peak_mb', 'ピークメモリ', 'MB')):
+            if (result[key] > entry[key] * (1 + tolerance)
+                    and result[key] - entry[key] > REGRESSION_MIN_DELTA[key]):
+                regressions.append(f"{result['participants']}人 {result['stage']}: {label} "
+                                   f"{entry[key]}{unit} → {result[key]}{unit}")
+    return regressions
+
+
+def print_results(results: List[Dict[str, Any]]) -> None:
+    """計測結果を表示"""
+    for result in results:
+        print(f"{result['name']:<12} {result['rows']:>8}行  {result['seconds']:.3f}秒  "
+              f"{result['rows_per_sec']:,.0f} rows/sec")
+        if 'retries' in result:
+            print(f"{'':<12} リトライ {result['retries']}回  失敗 {result['failed']}件")
+
+
+def main():
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description="Skill-Zero Analyzer ベンチマーク")
+    parser.add_argument('target', help="計測対象",
+                        choices=['rows', 'llm', 'html', 'markdown', 'suite', 'startup', 'memory', 'snapshot', 'search',
+                                 'taxonomy', 'watch'])
+    parser.add_argument('--rows', type=int, default=10000, help="計測する行数（memory・snapshot・search・taxonomy では参加者数）")
+    parser.add_argument('--repeat', type=int, default=3, help="繰り返し回数（最速値を採用）")
+    parser.add_argument('--polls', type=int, default=8, help="監視モードの確認で追記する回数")
+    parser.add_argument('--workers', type=int, default=1, help="並列抽出のプロセス数（2以上で比較に追加）")
+    parser.add_argument('--size', type=int, default=1024 * 1024, help="Markdown変換に渡す文字数")
+    parser.add_argument('--reports', type=int, default=5000, help="描画するHTMLレポート数")
+    parser.add_argument('--requests', type=int, default=100, help="LLMスタブへのリクエスト数")
+    parser.add_argument('--concurrency', type=int, default=config.LLM_MAX_CONCURRENCY, help="LLMへの同時リクエスト数")
+    parser.add_argument('--latency', type=float, default=0.05, help="LLMスタブの応答時間（秒）")
+    parser.add_argument('--failure-rate', type=float, default=0.0, help="LLMスタブが503を返す割合")
+    parser.add_argument('--rate', type=float, default=1000.0, help="1秒あたりの送信数の上限")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000],
+                        help="規模別ベンチマークの参加者数")
+    parser.add_argument('--work-dir', help="規模別ベンチマークの一時ファイルを作成するディレクトリ")
+    parser.add_argument('--baseline', default=config.BENCHMARK_BASELINE_FILE, help="規模別ベンチマークの基準値ファイル")
+    parser.add_argument('--save-baseline', action='store_true', help="計測結果を基準値として保存")
+    parser.add_argument('--tolerance', type=float, default=0.3,
+                        help="基準値からの悪化の許容割合（超えた場合は終了コード1）")
+    args = parser.parse_args()
+
+    # ログ出力の時間を計測に含めない
+    logging.disable(logging.INFO)
+
+    if args.target == 'rows':
+        print_results(benchmark_rows(args.rows, args.repeat, args.workers))
+    elif args.target == 'llm':
+        print_results(benchmark_llm(args.requests, args.concurrency, args.latency, args.failure_rate, args.rate))
+    elif args.target == 'html':
+        print_results(benchmark_html(args.reports, args.repeat))
+    elif args.target == 'markdown':
+        results = benchmark_markdown(args.size, args.repeat)
+        print_markdown_results(results)
+        failed = [result['name'] for result in results if result['ratio'] >= MARKDOWN_MAX_RATIO]
+        if failed:
+            print(f"入力の長さに比例しない変換があります: {failed}")
+            raise SystemExit(1)
+    elif args.target == 'startup':
+        print_startup_results(benchmark_startup(args.repeat))
+    elif args.target == 'memory':
+        print_memory_results(benchmark_memory(args.rows))
+    elif args.target == 'snapshot':
+        print_snapshot_results(benchmark_snapshot(args.rows, args.repeat))
+    elif args.target == 'search':
+        print_search_results(benchmark_search(args.rows, args.repeat))
+    elif args.target == 'taxonomy':
+        print_taxonomy_results(benchmark_taxonomy(args.rows, args.repeat))
+    elif args.target == 'watch':
+        print_watch_results(benchmark_watch(args.rows, args.polls, args.work_dir))
+    elif args.target == 'suite':
+        results = benchmark_suite(args.sizes, args.workers, args.work_dir)
+        failed = [f"{result['participants']}人 {result['stage']}" for result in results if not result['success']]
+        if failed:
+            print(f"処理に失敗した段階があります: {failed}")
+            raise SystemExit(1)
+
+        if args.save_baseline:
+            save_baseline(results, args.baseline)
+            print(f"基準値を保存しました: {args.baseline}")
+        elif os.path.exists(args.baseline):
+            regressions = compare_with_baseline(results, FileUtils.safe_read_json(args.baseline), args.tolerance)
+            if regressions:
+                print(f"基準値から{args.tolerance:.0%}を超えて悪化した段階があります:")
+                for regression in regressions:
+                    print(f"  {regression}")
+                raise SystemExit(1)
+            print(f"基準値（{args.baseline}）からの悪化はありません")
+        else:
+            print(f"基準値ファイルがありません: {args.baseline}（--save-baseline で作成）")
+
+
+if __name__ == "__main__":
+    main()
@@ -15,18 +15,121 @@ class Config:
     # ファイルパス設定
     CSV_FILE_PATH = "spreadsheet_data - form_answer.csv"
     PROCESSED_DATA_FILE = "output/processed_data.json"
+    PROCESSED_DATA_JSONL_FILE = "output/processed_data.jsonl"
+    PARTICIPANT_STORE_FILE = "output/participants.sqlite3"
+    EXPORT_PROCESSED_JSON = True
+    # 処理済みデータのバイナリスナップショット（mmapで読み込み、全件を変換せずに参照できる）
+    PARTICIPANT_SNAPSHOT_FILE = "output/participants.snapshot"
+    WRITE_PARTICIPANT_SNAPSHOT = True
+    PROMPT_STORE_DIR = "output/prompts"
+    # Trueの場合、共通の前置き・後書きを1回だけ保存し参加者ごとには本文だけを保存
+    PROMPT_STORE_SPLIT_STATIC = False
+
+    # 複数参加者をまとめたプロンプト（バンドル）の設定
+    BUNDLE_DIR = "output/bundles"
+    BUNDLE_TOKEN_BUDGET = 16000
+    BUNDLE_MAX_PARTICIPANTS = 20
+
+    # トークン数の概算設定
+    TOKEN_ESTIMATE_ASCII_CHARS_PER_TOKEN = 4
+    TOKEN_ESTIMATE_NON_ASCII_TOKENS = 1.0
     OUTPUT_DIR = "output"
     DATA_DIR = "data"
 
     # ログ設定
     LOG_LEVEL = "INFO"
     LOG_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+    # Trueの場合、ログの書式化と出力を別スレッドで行う
+    LOG_ASYNC = True
+    # Trueの場合、1行1件のJSON形式で出力（環境変数 LOG_JSON=1 でも有効）
+    LOG_JSON = os.getenv('LOG_JSON', '0') == '1'
+    # 進捗ログの出力間隔（件数・秒数のどちらかに達したら出力。1件ごとのログはDEBUGで出力）
+    LOG_PROGRESS_EVERY = 1000
+    LOG_PROGRESS_INTERVAL = 5.0
 
     # データ処理設定
     MIN_PROFILE_SIZE = 1000
+    # スキル・職種・経歴の分類語彙（経歴の行の抽出と参加者の分類に使う）
+    TAXONOMY_FILE = "data/taxonomy.json"
+    CSV_CHUNK_SIZE = 5000
+    # CSVの読み込み方法（'csv': 標準ライブラリ / 'pandas': pandas.read_csv、pandas はこの場合だけ読み込む）
+    CSV_BACKEND = os.getenv('CSV_BACKEND', 'csv')
     MAX_RETRY_COUNT = 3
     REQUEST_TIMEOUT = 30
 
+    # プロフィール抽出の並列処理・キャッシュ設定（ワーカー数1は並列化しない、抽出ルールを変更したらバージョンを上げる）
+    EXTRACTION_WORKERS = 1
+    EXTRACTION_BATCH_SIZE = 200
+    EXTRACTION_CACHE_ENABLED = True
+    EXTRACTION_CACHE_FILE = "output/extraction_cache.sqlite3"
+    EXTRACTION_CACHE_MAX_BYTES = 256 * 1024 * 1024
+    EXTRACTION_RULES_VERSION = 2
+
+    # LLM実行設定（OpenAI互換のチャット補完API）
+    LLM_API_BASE = os.getenv('LLM_API_BASE', 'https://api.openai.com/v1')
+    LLM_API_KEY_ENV = 'LLM_API_KEY'
+    LLM_MODEL = os.getenv('LLM_MODEL', 'gpt-4o-mini')
+    LLM_TEMPERATURE = 0.7
+    LLM_MAX_TOKENS = 4000
+    LLM_MAX_CONCURRENCY = 4
+    # 1秒あたりの送信数とまとめて送信できる数（トークンバケット）
+    LLM_RATE_LIMIT_PER_SEC = 1.0
+    LLM_RATE_LIMIT_BURST = 4
+    # リトライ間隔（秒、指数バックオフの初期値と上限）
+    LLM_RETRY_BACKOFF_BASE = 1.0
+    LLM_RETRY_BACKOFF_MAX = 30.0
+
+    # LLM応答キャッシュ設定（TTLはNoneで無期限、秒で指定）
+    LLM_CACHE_ENABLED = True
+    LLM_CACHE_FILE = "output/llm_cache.sqlite3"
+    LLM_CACHE_MAX_BYTES = 64 * 1024 * 1024
+    LLM_CACHE_TTL = None
+
+    # パイプラインの段階ごとの完了状態
+    PIPELINE_CHECKPOINT_FILE = "output/pipeline_checkpoint.json"
+
+    # プロンプト・HTMLレポートを返すローカルHTTPサーバーの設定
+    SERVER_HOST = "127.0.0.1"
+    SERVER_PORT = 8765
+    SERVER_CACHE_SIZE = 256
+    SERVER_CACHE_MAX_BYTES = 64 * 1024 * 1024
+    SERVER_KEEPALIVE_TIMEOUT = 15.0
+    # パーセンタイルの計算に使う直近の処理時間の件数（エンドポイントごと）
+    SERVER_LATENCY_WINDOW = 1000
+
+    # 監視モード（追記されたフォーム回答だけを処理）の設定
+    WATCH_POLL_INTERVAL = 2.0
+    # JSON・スナップショットを書き出し直す最短間隔（秒、終了時には必ず書き出す。それまでの読み込みは参加者ストアから）
+    WATCH_EXPORT_INTERVAL = 300.0
+
+    # 参加者検索の設定（項目ごとの重みは検索語の出現回数に掛ける、指定のない項目は1.0）
+    SEARCH_RESULT_LIMIT = 20
+    SEARCH_FIELD_WEIGHTS = {
+        'nickname': 2.0,
+        'profile_info.job': 1.5,
+        'profile_info.skills': 1.5,
+        'profile_info.work_history': 1.5,
+    }
+
+    # HTMLレポート生成設定（変換処理を変更したらバージョンを上げる）
+    REPORT_BUILD_MANIFEST_FILE = "output/report_manifest.json"
+    REPORT_BUILD_WORKERS = os.cpu_count() or 1
+    REPORT_RENDERER_VERSION = 2
+
+    # 計測設定（--metrics / --profile 指定時に出力）
+    METRICS_DIR = "output/metrics"
+    PROFILE_DIR = "output/profile"
+    # 1回あたりの処理時間のヒストグラムの区切り（秒）
+    METRICS_LATENCY_BUCKETS = [0.0001, 0.001, 0.01, 0.1, 1.0, 10.0]
+    # tracemalloc で記録するスタックの深さと、結果に出力する上位件数
+    PROFILE_TRACEMALLOC_FRAMES = 5
+    PROFILE_TOP_N = 30
+    # 規模別ベンチマーク（benchmark.py suite）の基準値ファイル（マシンごとに異なるためリポジトリに含めない）
+    BENCHMARK_BASELINE_FILE = "output/benchmark_baseline.json"
+
+    # 重複参加者の統合キー（'nickname' / 'profile_url' / 'email'）
+    MERGE_KEY = 'nickname'
+
     # プロフィール抽出設定
     PROFILE_SECTIONS = {
         'bio': '自己紹介',
@@ -40,6 +143,28 @@ class Config:
         'skills': '経歴・スキル'
     }
 
+    # プロフィールページの見出し（表示順）
+    # セクションの本文は、これより後ろの見出しで始まる行の直前までとなる
+    PROFILE_SECTION_MARKERS = [
+        '自己紹介',
+        '出身地',
+        '職種・職業',
+        '家族構成',
+        'リベ大との出会い',
+        '挑戦',
+        '趣味・特技',
+        '好きな〇〇',
+        'イチオシ',
+        '価値観マップ',
+        'アルバム',
+        'その他',
+        '各種SNS',
+        'スキル・ポートフォリオ',
+        '経歴・スキル',
+        'ポートフォリオ',
+        '掲載中の関連サービス'
+    ]
+
     # CSV列名マッピング
     CSV_COLUMNS = {
         'timestamp': 'タイムスタンプ',
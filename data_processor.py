@@ -5,21 +5,82 @@ Skill-Zero Analyzer - Data Processor
 スプレッドシートデータとプロフィールテキストから参加者データを統合するスクリプト
 """
 
-import pandas as pd
+import bisect
+import hashlib
 import json
 import time
 import re
 import os
-from typing import Dict, List, Optional, Any
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Dict, List, Optional, Any, Iterator, Tuple
 from config import config
-from utils import Logger, FileUtils, DataUtils, ValidationUtils
+from utils import Logger, ProgressLogger, FileUtils, DataUtils, ValidationUtils
+from disk_cache import DiskCache
+from participant_store import ParticipantStore
+from metrics import Stopwatch, metrics, add_metrics_arguments, instrument
+from table_reader import CSV_BACKENDS, Table, column_values, iter_tables, read_table
+from models import FormData, Participant, ProfileInfo
+from participant_snapshot import SnapshotWriter, write_snapshot
+from taxonomy import Taxonomy
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+class ProfileSectionParser:
+    """プロフィールテキストを見出し単位で分割するクラス
+
+    区切り行（見出しで始まる行）をコンパイル済み正規表現の1回の走査で列挙し、
+    各見出しの位置から次の区切り行までをスライスしてセクションを切り出す。
+    セクションの本文は、見出し順で後ろにある見出しから始まる行の直前までとなる。
+    """
+
+    def __init__(self, sections: Dict[str, str], markers: List[str]):
+        self.boundary_pattern = re.compile(r'\n(' + '|'.join(re.escape(marker) for marker in markers) + ')')
+        self.marker_ranks = {marker: rank for rank, marker in enumerate(markers)}
+        self.header_sections = {}
+
+        for key, header in sections.items():
+            rank = next((i for i, marker in enumerate(markers) if header.startswith(marker)), None)
+            if rank is None:
+                raise ValueError(f"見出し順に含まれないセクションです: {header}")
+            self.header_sections.setdefault(header + '\n', []).append((key, rank))
+
+    def parse(self, text: str) -> Dict[str, str]:
+        """テキストからセクションごとの本文を抽出"""
+        boundaries = [(match.start(), self.marker_ranks[match.group(1)])
+                      for match in self.boundary_pattern.finditer(text)]
+        newlines = [newline for newline, _ in boundaries]
+        results = {}
+
+        for header_line, targets in self.header_sections.items():
+            # 各見出しは最初の出現のみ有効
+            header_start = text.find(header_line)
+            if header_start < 0:
+                continue
+            content_start = header_start + len(header_line)
+
+            # 本文は1文字以上必要なため、本文開始位置より後ろの区切り行から探す
+            first = bisect.bisect_right(newlines, content_start)
+            for key, rank in targets:
+                for newline, boundary_rank in boundaries[first:]:
+                    if boundary_rank > rank:
+                        results[key] = text[content_start:newline].strip()
+                        break
+
+        return results
 
 
 class ProfileTextExtractor:
     """プロフィールテキストデータから情報を抽出するクラス"""
 
+    USERNAME_PATTERN = re.compile(r'(.+?)さんのプロフィール')
+
     def __init__(self):
         self.logger = Logger.setup_logger(__name__)
+        self.section_parser = ProfileSectionParser(config.PROFILE_SECTIONS, config.PROFILE_SECTION_MARKERS)
+        self.taxonomy = Taxonomy.load()
 
     def extract_from_text(self, profile_text: str) -> Optional[Dict[str, Any]]:
         """プロフィールテキストから情報を抽出"""
@@ -27,73 +88,65 @@ class ProfileTextExtractor:
             return None
 
         try:
-            profile_info = {
-                'username': '',
-                'bio': '',
-                'location': '',
-                'job': '',
-                'family': '',
-                'libecity_meeting': '',
-                'challenges': '',
-                'hobbies': '',
-                'likes': '',
-                'skills': '',
-                'duration': '',
-                'register_date': '',
-                'work_history': [],
-                'strengths': [],
-                'likes_list': []
-            }
-
-            # ユーザー名を抽出
-            username_match = re.search(r'(.+?)さんのプロフィール', profile_text)
-            if username_match:
-                profile_info['username'] = username_match.group(1)
-
-            # 各セクションを抽出
-            sections = {
-                'bio': r'自己紹介\n(.+?)(?=\n出身地|\n職種・職業|\n家族構成|\nリベ大との出会い|\n挑戦|\n趣味・特技|\n好きな〇〇|\nイチオシ|\n価値観マップ|\nアルバム|\nその他|\n各種SNS|\nスキル・ポートフォリオ|\n経歴・スキル|\nポートフォリオ|\n掲載中の関連サービス)',
-                'location': r'出身地\n(.+?)(?=\n職種・職業|\n家族構成|\nリベ大との出会い|\n挑戦|\n趣味・特技|\n好きな〇〇|\nイチオシ|\n価値観マップ|\nアルバム|\nその他|\n各種SNS|\nスキル・ポートフォリオ|\n経歴・スキル|\nポートフォリオ|\n掲載中の関連サービス)',
-                'job': r'職種・職業\n(.+?)(?=\n家族構成|\nリベ大との出会い|\n挑戦|\n趣味・特技|\n好きな〇〇|\nイチオシ|\n価値観マップ|\nアルバム|\nその他|\n各種SNS|\nスキル・ポートフォリオ|\n経歴・スキル|\nポートフォリオ|\n掲載中の関連サービス)',
-                'family': r'家族構成\n(.+?)(?=\nリベ大との出会い|\n挑戦|\n趣味・特技|\n好きな〇〇|\nイチオシ|\n価値観マップ|\nアルバム|\nその他|\n各種SNS|\nスキル・ポートフォリオ|\n経歴・スキル|\nポートフォリオ|\n掲載中の関連サービス)',
-                'libecity_meeting': r'リベ大との出会い\n(.+?)(?=\n挑戦|\n趣味・特技|\n好きな〇〇|\nイチオシ|\n価値観マップ|\nアルバム|\nその他|\n各種SNS|\nスキル・ポートフォリオ|\n経歴・スキル|\nポートフォリオ|\n掲載中の関連サービス)',
-                'challenges': r'挑戦、実践していること、これからやりたいことなど\n(.+?)(?=\n趣味・特技|\n好きな〇〇|\nイチオシ|\n価値観マップ|\nアルバム|\nその他|\n各種SNS|\nスキル・ポートフォリオ|\n経歴・スキル|\nポートフォリオ|\n掲載中の関連サービス)',
-                'hobbies': r'趣味・特技\n(.+?)(?=\n好きな〇〇|\nイチオシ|\n価値観マップ|\nアルバム|\nその他|\n各種SNS|\nスキル・ポートフォリオ|\n経歴・スキル|\nポートフォリオ|\n掲載中の関連サービス)',
-                'likes': r'好きな〇〇\n(.+?)(?=\nイチオシ|\n価値観マップ|\nアルバム|\nその他|\n各種SNS|\nスキル・ポートフォリオ|\n経歴・スキル|\nポートフォリオ|\n掲載中の関連サービス)',
-                'skills': r'経歴・スキル\n(.+?)(?=\nポートフォリオ|\n掲載中の関連サービス)'
-            }
-
-            # 各セクションを抽出
-            for key, pattern in sections.items():
-                match = re.search(pattern, profile_text, re.DOTALL)
-                if match:
-                    profile_info[key] = match.group(1).strip()
-
-            # 自己紹介から経歴を抽出
-            if profile_info['bio']:
-                self._extract_work_history_from_bio(profile_info['bio'], profile_info)
-
-            # 好きなことリストを作成
-            if profile_info['likes']:
-                profile_info['likes_list'] = [profile_info['likes']]
-
-            self.logger.info(f"プロフィールテキストから情報を抽出しました: {profile_info['username']}")
+            profile_info = self.parse_profile(profile_text)
+            self.logger.debug(f"プロフィールテキストから情報を抽出しました: {profile_info['username']}")
             return profile_info
 
         except Exception as e:
             self.logger.error(f"プロフィールテキスト抽出エラー: {e}")
             return None
 
+    def parse_profile(self, profile_text: str) -> Dict[str, Any]:
+        """プロフィールテキストを解析（例外は呼び出し元に送出）"""
+        profile_info = {
+            'username': '',
+            'bio': '',
+            'location': '',
+            'job': '',
+            'family': '',
+            'libecity_meeting': '',
+            'challenges': '',
+            'hobbies': '',
+            'likes': '',
+            'skills': '',
+            'duration': '',
+            'register_date': '',
+            'work_history': [],
+            'strengths': [],
+            'likes_list': [],
+            'categories': []
+        }
+
+        # ユーザー名を抽出
+        username_match = self.USERNAME_PATTERN.search(profile_text)
+        if username_match:
+            profile_info['username'] = username_match.group(1)
+
+        # 各セクションを抽出
+        profile_info.update(self.section_parser.parse(profile_text))
+
+        # 自己紹介から経歴を抽出
+        if profile_info['bio']:
+            self._extract_work_history_from_bio(profile_info['bio'], profile_info)
+
+        # 好きなことリストを作成
+        if profile_info['likes']:
+            profile_info['likes_list'] = [profile_info['likes']]
+
+        # 自己紹介・職業・スキルなどの語から分類（スキル・職種）を付与
+        profile_info['categories'] = self.taxonomy.tag_profile(profile_info)
+
+        return profile_info
+
     def _extract_work_history_from_bio(self, bio_text: str, profile_info: Dict[str, Any]) -> None:
         """自己紹介から経歴を抽出"""
         try:
-            work_keywords = ['勤務', '転職', '就職', '仕事', '職歴', '経験', '働い', '務め', '在籍']
             work_history = []
 
             lines = bio_text.split('\n')
             for line in lines:
                 line = line.strip()
-                if any(keyword in line for keyword in work_keywords):
+                if self.taxonomy.is_work_line(line):
                     work_history.append(line)
 
             if work_history:
@@ -102,17 +155,84 @@ class ProfileTextExtractor:
             self.logger.error(f"経歴抽出エラー: {e}")
 
 
+def extract_profile_batch(extractor: ProfileTextExtractor,
+                          batch: List[Tuple[int, str]]) -> Tuple[List[Tuple[int, Dict[str, Any]]], List[Tuple[int, str]]]:
+    """(行番号, プロフィールテキスト)のバッチを抽出し、結果とエラーを行番号付きで返す"""
+    results = []
+    errors = []
+    for index, profile_text in batch:
+        try:
+            results.append((index, extractor.parse_profile(profile_text)))
+        except Exception as e:
+            errors.append((index, f"{type(e).__name__}: {e}"))
+    return results, errors
+
+
+# ワーカープロセスごとの抽出器（プロセス起動時に1回だけ生成）
+_worker_extractor: Optional[ProfileTextExtractor] = None
+
+
+def _init_extraction_worker() -> None:
+    """ワーカープロセスを初期化"""
+    global _worker_extractor
+    _worker_extractor = ProfileTextExtractor()
+
+
+def _extract_batch_in_worker(batch: List[Tuple[int, str]]) -> Tuple[List[Tuple[int, Dict[str, Any]]], List[Tuple[int, str]]]:
+    """ワーカープロセスでバッチを抽出"""
+    return extract_profile_batch(_worker_extractor, batch)
+
+
+class ExtractionCache:
+    """プロフィール抽出結果の永続キャッシュクラス
+
+    キーはプロフィールテキストと抽出ルールのバージョンのハッシュ値。
+    抽出ルール（見出し設定・分類語彙を含む）が変わると、以前の結果は参照されなくなる。
+    """
+
+    def __init__(self, path: str, max_bytes: int):
+        self.cache = DiskCache(path, max_bytes)
+        rules = json.dumps([config.EXTRACTION_RULES_VERSION, config.PROFILE_SECTIONS,
+                            config.PROFILE_SECTION_MARKERS, Taxonomy.load().fingerprint], ensure_ascii=False)
+        self.rules_version = hashlib.sha256(rules.encode('utf-8')).hexdigest()[:16]
+
+    def make_key(self, profile_text: str) -> str:
+        """キャッシュキーを生成"""
+        return hashlib.sha256(f"{self.rules_version}\0{profile_text}".encode('utf-8')).hexdigest()
+
+    def get_many(self, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        """キャッシュ済みの抽出結果を取得"""
+        return {key: json.loads(value) for key, value in self.cache.get_many(keys).items()}
+
+    def set_many(self, items: List[Tuple[str, Dict[str, Any]]]) -> None:
+        """抽出結果を保存"""
+        self.cache.set_many((key, json.dumps(profile_info, ensure_ascii=False)) for key, profile_info in items)
+
+    def stats(self) -> Dict[str, int]:
+        """ヒット・ミス・削除件数を取得"""
+        return self.cache.stats()
+
+    def close(self) -> None:
+        """キャッシュを閉じる"""
+        self.cache.close()
+
+
 class DataMerger:
     """データ統合クラス"""
 
+    MERGE_KEYS = ('nickname', 'profile_url', 'email')
+
     @staticmethod
-    def merge_duplicate_participants(participants: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def merge_duplicate_participants(participants: List[Participant],
+                                     merge_key: Optional[str] = None) -> List[Participant]:
         """重複する参加者データを統合"""
+        merge_key = merge_key or config.MERGE_KEY
         unique_participants = []
+        index = {}  # 統合キー → unique_participants内の位置
 
         for participant in participants:
-            nickname = participant.get('nickname', '')
-            existing_index = DataMerger._find_existing_participant(unique_participants, nickname)
+            key = DataMerger.get_merge_key(participant, merge_key)
+            existing_index = index.get(key) if key is not None else None
 
             if existing_index is not None:
                 # 既存のデータと統合
@@ -121,44 +241,104 @@ class DataMerger:
                 )
             else:
                 # 新しい参加者として追加
+                if key is not None:
+                    index[key] = len(unique_participants)
                 unique_participants.append(participant)
 
         return unique_participants
 
     @staticmethod
-    def _find_existing_participant(participants: List[Dict[str, Any]], nickname: str) -> Optional[int]:
-        """既存の参加者を検索"""
-        for i, participant in enumerate(participants):
-            if participant.get('nickname', '') == nickname:
-                return i
-        return None
+    def get_merge_key(participant: Participant, merge_key: str) -> Optional[Any]:
+        """参加者の統合キーを取得（Noneの場合は統合しない）"""
+        if merge_key == 'nickname':
+            nickname = participant.get('nickname', '')
+            # NaN同士は一致しないため統合しない
+            return nickname if nickname == nickname else None
+        if merge_key == 'profile_url':
+            return DataUtils.normalize_profile_url(participant.get('profile_url'))
+        if merge_key == 'email':
+            return DataUtils.normalize_email(participant.get('email'))
+
+        raise ValueError(f"不明な統合キーです: {merge_key} (指定可能: {', '.join(DataMerger.MERGE_KEYS)})")
 
     @staticmethod
-    def _merge_participant_data(existing: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    def _merge_participant_data(existing: Participant, new: Participant) -> Participant:
         """参加者データを統合"""
         merged = existing.copy()
 
         # プロフィール情報を統合（新しいデータを優先）
-        if new.get('profile_info'):
-            merged['profile_info'] = new['profile_info']
+        if new.profile_info:
+            merged.profile_info = new.profile_info
 
-        # フォームデータを統合
-        if new.get('form_data'):
-            if 'form_data' not in merged:
-                merged['form_data'] = {}
-            merged['form_data'].update(new['form_data'])
+        # フォームデータを統合（新しいデータの回答がある項目を優先）
+        if new.form_data:
+            merged.form_data = merged.form().merged(new.form_data)
 
         return merged
 
 
+class StreamingMerger:
+    """チャンクをまたいで重複参加者を統合するクラス
+
+    参加者データは一時ファイル（JSON Lines）に退避し、メモリには統合キーごとの
+    ファイル位置だけを保持する。統合結果は初出順に1件ずつ組み立てて返す。
+    """
+
+    def __init__(self, spool_path: str, merge_key: Optional[str] = None):
+        self.spool_path = spool_path
+        self.merge_key = merge_key or config.MERGE_KEY
+        self.spool = open(spool_path, 'w+b')
+        self.offsets = {}  # 統合キー → 一時ファイル内の位置（初出順）
+        self.total_count = 0
+
+    def add(self, participants: List[Participant]) -> None:
+        """参加者データを一時ファイルに追記"""
+        for participant in participants:
+            key = DataMerger.get_merge_key(participant, self.merge_key)
+            if key is None:
+                # 統合しない参加者は行番号で区別する
+                key = (None, self.total_count)
+
+            self.offsets.setdefault(key, []).append(self.spool.tell())
+            self.spool.write(json.dumps(participant.to_dict(), ensure_ascii=False).encode('utf-8') + b'\n')
+            self.total_count += 1
+
+    def merged_participants(self) -> Iterator[Participant]:
+        """統合済みの参加者データを初出順に返す"""
+        self.spool.flush()
+        for offsets in self.offsets.values():
+            merged = None
+            for offset in offsets:
+                self.spool.seek(offset)
+                participant = Participant.from_dict(json.loads(self.spool.readline()))
+                merged = participant if merged is None else DataMerger._merge_participant_data(merged, participant)
+            yield merged
+
+    def close(self) -> None:
+        """一時ファイルを削除"""
+        self.spool.close()
+        if os.path.exists(self.spool_path):
+            os.remove(self.spool_path)
+
+
 class DataProcessor:
     """データ処理メインクラス"""
 
-    def __init__(self):
+    FORM_FIELDS = ('experience', 'strengths', 'appreciation', 'not_bad_at', 'weaknesses')
+    RECORD_FIELDS = ('timestamp', 'email', 'nickname', 'profile_url') + FORM_FIELDS
+
+    def __init__(self, workers: Optional[int] = None, use_cache: Optional[bool] = None,
+                 csv_backend: Optional[str] = None):
         self.logger = Logger.setup_logger(__name__)
+        self.csv_backend = csv_backend or config.CSV_BACKEND
         self.text_extractor = ProfileTextExtractor()
+        self.workers = workers or config.EXTRACTION_WORKERS
+        self.use_cache = config.EXTRACTION_CACHE_ENABLED if use_cache is None else use_cache
+        self.extraction_errors = []  # (行番号, エラー内容)
+        self._executor = None
+        self._cache = None
 
-    def load_csv_data(self) -> Optional[pd.DataFrame]:
+    def load_csv_data(self) -> Optional[Table]:
         """CSVデータを読み込み"""
         try:
             csv_file = config.CSV_FILE_PATH
@@ -166,7 +346,8 @@ class DataProcessor:
                 self.logger.error(f"CSVファイルが見つかりません: {csv_file}")
                 return None
 
-            df = pd.read_csv(csv_file)
+            with metrics.stage('csv_load'):
+                df = read_table(csv_file, self.csv_backend)
             self.logger.info(f"CSVファイルを読み込みました: {len(df)}件のデータ")
             return df
 
@@ -174,66 +355,270 @@ class DataProcessor:
             self.logger.error(f"CSVファイル読み込みエラー: {e}")
             return None
 
-    def process_participant_data(self, row: pd.Series) -> Dict[str, Any]:
+    def load_csv_chunks(self, chunk_size: int) -> Optional[Iterator[Table]]:
+        """CSVデータをチャンク単位で読み込み"""
+        try:
+            csv_file = config.CSV_FILE_PATH
+            if not os.path.exists(csv_file):
+                self.logger.error(f"CSVファイルが見つかりません: {csv_file}")
+                return None
+
+            return iter_tables(csv_file, chunk_size, self.csv_backend)
+
+        except Exception as e:
+            self.logger.error(f"CSVファイル読み込みエラー: {e}")
+            return None
+
+    def process_participant_data(self, row: 'pd.Series') -> Participant:
         """参加者データを処理"""
         try:
             # 基本情報を抽出
-            participant_data = {
-                'timestamp': row.get('タイムスタンプ', ''),
-                'email': row.get('メールアドレス', ''),
-                'nickname': row.get('ニックネーム\nリベシティで使用している名前）', ''),
-                'profile_url': row.get('リベシティの\nプロフィールURL', ''),
-                'form_data': {
-                    'experience': row.get('今までやってきたこと （仕事／プライベート）', ''),
-                    'strengths': row.get('得意と言われたこと／好きなこと', ''),
-                    'appreciation': row.get('人に感謝されたこと／頼まれたこと', ''),
-                    'not_bad_at': row.get('苦手じゃないこと／つい引き受けてしまうこと', ''),
-                    'weaknesses': row.get('「これは苦手...」と思うこと', '')
-                },
-                'submitted': True,
-                'profile_info': {
-                    'url': row.get('リベシティの\nプロフィールURL', ''),
-                    'extracted_at': time.strftime('%Y-%m-%d %H:%M:%S')
-                }
-            }
+            participant_data = Participant(
+                timestamp=row.get('タイムスタンプ', ''),
+                email=row.get('メールアドレス', ''),
+                nickname=row.get('ニックネーム\nリベシティで使用している名前）', ''),
+                profile_url=row.get('リベシティの\nプロフィールURL', ''),
+                form_data=FormData(
+                    experience=row.get('今までやってきたこと （仕事／プライベート）', ''),
+                    strengths=row.get('得意と言われたこと／好きなこと', ''),
+                    appreciation=row.get('人に感謝されたこと／頼まれたこと', ''),
+                    not_bad_at=row.get('苦手じゃないこと／つい引き受けてしまうこと', ''),
+                    weaknesses=row.get('「これは苦手...」と思うこと', '')
+                ),
+                submitted=True,
+                profile_info=ProfileInfo(
+                    url=row.get('リベシティの\nプロフィールURL', ''),
+                    extracted_at=time.strftime('%Y-%m-%d %H:%M:%S')
+                )
+            )
 
             # J列のプロフィールデータがある場合は情報を取得
-            if row.get('プロフィールデータ'):
+            if self._has_profile_text(row.get('プロフィールデータ')):
                 profile_info_from_text = self.text_extractor.extract_from_text(row['プロフィールデータ'])
                 if profile_info_from_text:
-                    participant_data['profile_info'] = profile_info_from_text
+                    participant_data.profile_info = ProfileInfo.from_dict(profile_info_from_text)
 
-            self.logger.info(f"参加者データを処理しました: {participant_data['nickname']}")
+            self.logger.debug(f"参加者データを処理しました: {participant_data.nickname}")
             return participant_data
 
         except Exception as e:
             self.logger.error(f"参加者データ処理エラー: {e}")
-            return {}
+            return Participant()
+
+    def build_participants(self, df: Table) -> List[Participant]:
+        """参加者データを列単位で一括生成"""
+        columns = [self._column_values(df, key) for key in self.RECORD_FIELDS]
+        profile_infos = self.extract_profiles(self._column_values(df, 'profile_data'), list(df.index))
+        extracted_at = time.strftime('%Y-%m-%d %H:%M:%S')
+
+        participants = []
+        for index, (timestamp, email, nickname, profile_url, *answers) in enumerate(zip(*columns)):
+            profile_info = profile_infos.get(index)
+            participants.append(Participant(
+                timestamp=timestamp,
+                email=email,
+                nickname=nickname,
+                profile_url=profile_url,
+                form_data=FormData(**dict(zip(self.FORM_FIELDS, answers))),
+                submitted=True,
+                profile_info=ProfileInfo.from_dict(profile_info) if profile_info else ProfileInfo(
+                    url=profile_url,
+                    extracted_at=extracted_at
+                )
+            ))
+
+        self.logger.info(f"参加者データを処理しました: {len(participants)}件")
+        return participants
+
+    def extract_profiles(self, profile_texts: List[Any],
+                         row_numbers: Optional[List[Any]] = None) -> Dict[int, Dict[str, Any]]:
+        """プロフィールデータのあるセルだけ情報を抽出（位置 → プロフィール情報）"""
+        targets = [(index, profile_text) for index, profile_text in enumerate(profile_texts)
+                   if self._has_profile_text(profile_text)]
+
+        # キャッシュ済みの行は抽出しない
+        profile_infos = {}
+        cache = self._get_cache()
+        if cache is not None:
+            keys = {index: cache.make_key(profile_text) for index, profile_text in targets}
+            cached = cache.get_many(list(set(keys.values())))
+            for index, _ in targets:
+                if keys[index] in cached:
+                    profile_infos[index] = cached[keys[index]]
+            targets = [(index, profile_text) for index, profile_text in targets if index not in profile_infos]
+
+        batch_size = config.EXTRACTION_BATCH_SIZE
+        batches = [targets[i:i + batch_size] for i in range(0, len(targets), batch_size)]
+
+        # 並列時もバッチの投入順に結果を受け取るため、出力順は常に同じになる
+        if self.workers > 1 and len(batches) > 1:
+            outputs = self._get_executor().map(_extract_batch_in_worker, batches)
+        else:
+            outputs = (extract_profile_batch(self.text_extractor, batch) for batch in batches)
+
+        # 件数が多い場合は途中経過を定期的に出力（完了時は下の集計で出力）
+        progress = ProgressLogger(self.logger, "プロフィール抽出", total=len(targets))
+        watch = Stopwatch()
+        for results, errors in outputs:
+            # 並列時は結果を待つ時間も含めたバッチごとの処理時間
+            metrics.observe('extraction', *watch.lap(), records=len(results) + len(errors))
+            progress.update(len(results) + len(errors))
+            profile_infos.update(results)
+            if cache is not None:
+                cache.set_many([(keys[index], profile_info) for index, profile_info in results])
+            for index, message in errors:
+                row_number = row_numbers[index] if row_numbers is not None else index
+                self.extraction_errors.append((row_number, message))
+                self.logger.error(f"プロフィールテキスト抽出エラー (行{row_number}): {message}")
+            watch.restart()
+
+        self.logger.info(f"プロフィールテキストから情報を抽出しました: {len(profile_infos)}件")
+        return profile_infos
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """抽出用のプロセスプールを取得（初回のみ起動）"""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_extraction_worker)
+            self.logger.info(f"プロフィール抽出を{self.workers}プロセスで並列実行します")
+        return self._executor
+
+    def _get_cache(self) -> Optional[ExtractionCache]:
+        """抽出キャッシュを取得（無効時・オープン失敗時はNone）"""
+        if self._cache is None and self.use_cache:
+            try:
+                self._cache = ExtractionCache(config.EXTRACTION_CACHE_FILE, config.EXTRACTION_CACHE_MAX_BYTES)
+            except Exception as e:
+                self.logger.warning(f"抽出キャッシュを開けないため使用しません: {e}")
+                self.use_cache = False
+        return self._cache
+
+    def close(self) -> None:
+        """プロセスプールとキャッシュを終了"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        if self._cache is not None:
+            self._cache.close()
+            self._cache = None
+
+    @staticmethod
+    def _column_values(df: Table, key: str) -> List[Any]:
+        """列の値をリストで取得（列がない場合は空文字）"""
+        values = column_values(df, config.get_csv_column(key))
+        if values is not None:
+            return values
+        return [''] * len(df)
+
+    @staticmethod
+    def _has_profile_text(value: Any) -> bool:
+        """プロフィールデータが入力されているか（NaN・空欄は対象外）"""
+        return isinstance(value, str) and value.strip() != ''
 
-    def save_processed_data(self, participants: List[Dict[str, Any]]) -> None:
-        """処理済みデータを保存"""
+    def save_processed_data(self, participants: List[Participant]) -> bool:
+        """処理済みデータを保存（失敗した場合はFalse）"""
         try:
-            output_data = {
-                'processed_at': time.strftime('%Y-%m-%d %H:%M:%S'),
-                'total_participants': len(participants),
-                'participants': participants
-            }
+            processed_at = time.strftime('%Y-%m-%d %H:%M:%S')
 
-            # 出力ディレクトリを作成
-            os.makedirs(config.OUTPUT_DIR, exist_ok=True)
+            # 参加者ストアに保存
+            with ParticipantStore(config.PARTICIPANT_STORE_FILE) as store:
+                store.replace_all((participant.to_dict() for participant in participants), processed_at)
+                generation = store.get_generation()
+                self.logger.info(f"処理済みデータを保存しました: {config.PARTICIPANT_STORE_FILE}")
 
-            # JSONファイルに保存
-            with open(config.PROCESSED_DATA_FILE, 'w', encoding='utf-8') as f:
-                json.dump(output_data, f, ensure_ascii=False, indent=2)
+                # 互換用のJSONファイルを書き出し
+                if config.EXPORT_PROCESSED_JSON:
+                    store.export_json(config.PROCESSED_DATA_FILE)
+                    self.logger.info(f"処理済みデータを保存しました: {config.PROCESSED_DATA_FILE}")
+
+            # 読み込み用のスナップショットを書き出し（ストアの世代番号を記録し、同じ内容であることを示す）
+            if config.WRITE_PARTICIPANT_SNAPSHOT:
+                write_snapshot(config.PARTICIPANT_SNAPSHOT_FILE, participants, processed_at, generation)
+                self.logger.info(f"処理済みデータを保存しました: {config.PARTICIPANT_SNAPSHOT_FILE}")
 
-            self.logger.info(f"処理済みデータを保存しました: {config.PROCESSED_DATA_FILE}")
             self.logger.info(f"参加者数: {len(participants)}人")
+            return True
 
         except Exception as e:
             self.logger.error(f"データ保存エラー: {e}")
+            return False
+
+    def save_processed_jsonl(self, participants: Iterator[Participant]) -> int:
+        """処理済みデータをJSON Lines形式と参加者ストアに1件ずつ保存"""
+        os.makedirs(config.OUTPUT_DIR, exist_ok=True)
+
+        output_file = config.PROCESSED_DATA_JSONL_FILE
+        temp_file = f"{output_file}.tmp"
+
+        processed_at = time.strftime('%Y-%m-%d %H:%M:%S')
+        snapshot = None
+        if config.WRITE_PARTICIPANT_SNAPSHOT:
+            snapshot = SnapshotWriter(config.PARTICIPANT_SNAPSHOT_FILE, processed_at)
+
+        with open(temp_file, 'w', encoding='utf-8') as f, ParticipantStore(config.PARTICIPANT_STORE_FILE) as store:
+            def write_lines() -> Iterator[Dict[str, Any]]:
+                for participant in participants:
+                    data = participant.to_dict()
+                    f.write(json.dumps(data, ensure_ascii=False))
+                    f.write('\n')
+                    if snapshot is not None:
+                        snapshot.add(participant)
+                    yield data
+
+            try:
+                count = store.replace_all(write_lines(), processed_at)
+            except Exception:
+                if snapshot is not None:
+                    snapshot.discard()
+                raise
+            if snapshot is not None:
+                snapshot.generation = store.get_generation()
+
+        os.replace(temp_file, output_file)
+        self.logger.info(f"処理済みデータを保存しました: {output_file}, {config.PARTICIPANT_STORE_FILE}")
+        if snapshot is not None:
+            snapshot.close()
+            self.logger.info(f"処理済みデータを保存しました: {config.PARTICIPANT_SNAPSHOT_FILE}")
+        self.logger.info(f"参加者数: {count}人")
+        return count
+
+    def run_streaming(self, chunk_size: Optional[int] = None) -> None:
+        """CSVをチャンク単位で読み込みながらデータ処理を実行"""
+        merger = None
+        try:
+            chunk_size = chunk_size or config.CSV_CHUNK_SIZE
+            self.logger.info("=== Skill-Zero Analyzer - Data Processor (streaming) ===")
+            self.logger.info(f"データ処理を開始します... (チャンクサイズ: {chunk_size}行)")
+
+            chunks = self.load_csv_chunks(chunk_size)
+            if chunks is None:
+                return
+
+            os.makedirs(config.OUTPUT_DIR, exist_ok=True)
+            merger = StreamingMerger(f"{config.PROCESSED_DATA_JSONL_FILE}.spool")
+
+            # チャンクごとに抽出して一時ファイルに退避
+            for chunk_index, chunk in enumerate(chunks):
+                merger.add(self.build_participants(chunk))
+                self.logger.info(f"チャンク{chunk_index + 1}を処理しました: 累計{merger.total_count}件")
+
+            # 重複データを統合しながら保存
+            self.logger.info("重複データの統合を開始...")
+            merged_count = self.save_processed_jsonl(merger.merged_participants())
+            self.logger.info(f"統合前: {merger.total_count}人 → 統合後: {merged_count}人")
 
-    def run(self) -> None:
-        """データ処理を実行"""
+            self.logger.info("=== データ処理完了 ===")
+            self.logger.info(f"出力ファイル: {config.PROCESSED_DATA_JSONL_FILE}")
+            self._log_extraction_summary()
+
+        except Exception as e:
+            self.logger.error(f"データ処理エラー: {e}")
+        finally:
+            if merger is not None:
+                merger.close()
+            self.close()
+
+    def run(self) -> Optional[List[Participant]]:
+        """データ処理を実行し、統合後の参加者データを返す（失敗時はNone）"""
         try:
             self.logger.info("=== Skill-Zero Analyzer - Data Processor ===")
             self.logger.info("データ処理を開始します...")
@@ -241,33 +626,74 @@ class DataProcessor:
             # CSVデータを読み込み
             df = self.load_csv_data()
             if df is None:
-                return
+                return None
 
             # 参加者データを処理
-            participants = []
-            for _, row in df.iterrows():
-                participant_data = self.process_participant_data(row)
-                if participant_data:
-                    participants.append(participant_data)
+            participants = self.build_participants(df)
 
             # 重複データを統合
             self.logger.info("重複データの統合を開始...")
             original_count = len(participants)
-            participants = DataMerger.merge_duplicate_participants(participants)
+            with metrics.stage('merge', records=original_count):
+                participants = DataMerger.merge_duplicate_participants(participants)
             merged_count = len(participants)
             self.logger.info(f"統合前: {original_count}人 → 統合後: {merged_count}人")
 
             # 処理済みデータを保存
-            self.save_processed_data(participants)
+            with metrics.stage('file_write', records=len(participants)):
+                if not self.save_processed_data(participants):
+                    return None
 
             self.logger.info("=== データ処理完了 ===")
             self.logger.info(f"処理された参加者数: {len(participants)}人")
             self.logger.info(f"出力ファイル: {config.PROCESSED_DATA_FILE}")
+            self._log_extraction_summary()
+            return participants
 
         except Exception as e:
             self.logger.error(f"データ処理エラー: {e}")
+            return None
+        finally:
+            self.close()
+
+    def _log_extraction_summary(self) -> None:
+        """抽出キャッシュの統計と抽出エラーの一覧を出力"""
+        if self._cache is not None:
+            stats = self._cache.stats()
+            self.logger.info(f"抽出キャッシュ: ヒット {stats['hits']}件 / ミス {stats['misses']}件 / "
+                             f"削除 {stats['evictions']}件")
+
+        if not self.extraction_errors:
+            return
+
+        self.logger.warning(f"プロフィール抽出に失敗した行: {len(self.extraction_errors)}件")
+        for row_number, message in self.extraction_errors:
+            self.logger.warning(f"  行{row_number}: {message}")
+
+
+def main():
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description="Skill-Zero Analyzer - Data Processor")
+    parser.add_argument('--stream', action='store_true',
+                        help=f"CSVをチャンク単位で処理し {config.PROCESSED_DATA_JSONL_FILE} に出力")
+    parser.add_argument('--chunk-size', type=int, default=config.CSV_CHUNK_SIZE,
+                        help="ストリーミング処理のチャンク行数")
+    parser.add_argument('--workers', type=int, default=config.EXTRACTION_WORKERS,
+                        help="プロフィール抽出の並列プロセス数")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="抽出キャッシュを使わずに全行を抽出")
+    parser.add_argument('--csv-backend', choices=CSV_BACKENDS, default=config.CSV_BACKEND,
+                        help="CSVの読み込み方法（pandas を指定した場合だけ pandas を読み込む）")
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+
+    processor = DataProcessor(workers=args.workers, use_cache=not args.no_cache, csv_backend=args.csv_backend)
+    with instrument('data_processor', args.metrics, args.profile):
+        if args.stream:
+            processor.run_streaming(args.chunk_size)
+        else:
+            processor.run()
 
 
 if __name__ == "__main__":
-    processor = DataProcessor()
-    processor.run()
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Skill-Zero Analyzer - Disk Cache
+SQLiteを使ったサイズ上限付きの永続キャッシュ
+"""
+
+import os
+import sqlite3
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+from utils import FileUtils
+
+
+class DiskCache:
+    """サイズ上限付きの永続キャッシュクラス
+
+    値は文字列で保存し、合計サイズが上限を超えた場合は最終利用日時が古いものから削除する。
+    ttl（秒）を指定すると、保存してからその時間が経過した値は見つからなかったものとして扱う。
+    read_only=True の場合は既存のキャッシュファイルを読むだけで、保存・削除・最終利用日時の更新は行わない。
+    """
+
+    # SQLiteのプレースホルダ数上限を超えないように分割して問い合わせる
+    QUERY_BATCH_SIZE = 500
+
+    def __init__(self, path: str, max_bytes: int, ttl: Optional[float] = None, read_only: bool = False):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.read_only = read_only
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+
+        if read_only:
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"キャッシュファイルが見つかりません: {path}")
+            self.connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+            self.total_bytes = self.connection.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+            return
+
+        directory = os.path.dirname(path)
+        if directory:
+            FileUtils.ensure_directory(directory)
+
+        self.connection = sqlite3.connect(path)
+        self.connection.execute('PRAGMA journal_mode = WAL')
+        self.connection.execute('PRAGMA synchronous = NORMAL')
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS entries ('
+            'key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL, '
+            'created REAL NOT NULL DEFAULT 0)'
+        )
+        columns = {row[1] for row in self.connection.execute('PRAGMA table_info(entries)')}
+        if 'created' not in columns:
+            # 保存日時の列がない以前のキャッシュファイルに列を追加（既存の値は最終利用日時を保存日時とみなす）
+            self.connection.execute('ALTER TABLE entries ADD COLUMN created REAL NOT NULL DEFAULT 0')
+            self.connection.execute('UPDATE entries SET created = last_used')
+        self.connection.execute('CREATE INDEX IF NOT EXISTS idx_entries_last_used ON entries (last_used)')
+        self.connection.commit()
+
+        self.total_bytes = self.connection.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+
+        # 上限が小さく変更された場合に備えて開いた時点でも削除する
+        self._evict()
+        self.connection.commit()
+
+    def get_many(self, keys: List[str]) -> Dict[str, str]:
+        """複数のキーをまとめて取得（見つかったものだけ返す）"""
+        found = {}
+        now = time.time()
+        for i in range(0, len(keys), self.QUERY_BATCH_SIZE):
+            batch = keys[i:i + self.QUERY_BATCH_SIZE]
+            placeholders = ','.join('?' * len(batch))
+            rows = self.connection.execute(
+                f'SELECT key, value, created FROM entries WHERE key IN ({placeholders})', batch
+            ).fetchall()
+
+            used_keys = []
+            for key, value, created in rows:
+                if self.ttl is not None and now - created > self.ttl:
+                    self.expired += 1
+                    continue
+                found[key] = value
+                used_keys.append(key)
+
+            if used_keys and not self.read_only:
+                # 最終利用日時を更新（LRU順の維持）
+                self.connection.execute(
+                    f"UPDATE entries SET last_used = ? WHERE key IN ({','.join('?' * len(used_keys))})",
+                    [now] + used_keys
+                )
+
+        if found and not self.read_only:
+            self.connection.commit()
+
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def get(self, key: str) -> Optional[str]:
+        """キーに対応する値を取得"""
+        return self.get_many([key]).get(key)
+
+    def set_many(self, items: Iterable[Tuple[str, str]]) -> None:
+        """複数の値をまとめて保存（読み込み専用の場合は何もしない）"""
+        if self.read_only:
+            return
+
+        now = time.time()
+        for key, value in items:
+            size = len(value.encode('utf-8'))
+            previous = self.connection.execute('SELECT size FROM entries WHERE key = ?', (key,)).fetchone()
+            if previous:
+                self.total_bytes -= previous[0]
+            self.connection.execute(
+                'INSERT OR REPLACE INTO entries (key, value, size, last_used, created) VALUES (?, ?, ?, ?, ?)',
+                (key, value, size, now, now)
+            )
+            self.total_bytes += size
+
+        self._evict()
+        self.connection.commit()
+
+    def set(self, key: str, value: str) -> None:
+        """値を保存"""
+        self.set_many([(key, value)])
+
+    def _evict(self) -> None:
+        """サイズ上限を超えた分を最終利用日時の古い順に削除"""
+        if self.total_bytes <= self.max_bytes:
+            return
+
+        cursor = self.connection.execute('SELECT key, size FROM entries ORDER BY last_used ASC')
+        evicted_keys = []
+        for key, size in cursor:
+            if self.total_bytes <= self.max_bytes:
+                break
+            evicted_keys.append((key,))
+            self.total_bytes -= size
+
+        self.connection.executemany('DELETE FROM entries WHERE key = ?', evicted_keys)
+        self.evictions += len(evicted_keys)
+
+    def stats(self) -> Dict[str, int]:
+        """ヒット・ミス・削除件数を取得"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expired': self.expired,
+            'bytes': self.total_bytes
+        }
+
+    def close(self) -> None:
+        """データベース接続を閉じる"""
+        self.connection.close()
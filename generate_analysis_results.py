@@ -4,15 +4,34 @@
 完成したドキュメントフォーマットを他の参加者のanalysis_result.txtにも適用
 """
 
+import argparse
+import hashlib
+import html
 import os
 import re
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from config import config
+from utils import FileUtils
+from metrics import Stopwatch, metrics, add_metrics_arguments, instrument
+
+# テンプレート内のプレースホルダー（{{NAME}} など）
+PLACEHOLDER_PATTERN = re.compile(r'\{\{([A-Z_]+)\}\}')
+
+# 分析結果の書式
+PROPOSAL_PATTERN = re.compile(r'【提案(\d+)】')
+ACTION_HEADER = '具体的なアクション:'
 
 def read_template(template_path):
     """HTMLテンプレートを読み込み"""
     with open(template_path, 'r', encoding='utf-8') as f:
         return f.read()
 
+def compile_template(template):
+    """HTMLテンプレートを固定部分とプレースホルダーに分解"""
+    return CompiledTemplate(template)
+
 def parse_analysis_result(result_path):
     """analysis_result.txtファイルを解析して内容を抽出"""
     with open(result_path, 'r', encoding='utf-8') as f:
@@ -47,131 +66,381 @@ def parse_analysis_result(result_path):
 
     return name, sections
 
+class MarkdownRenderer:
+    """分析結果のMarkdownをHTMLに変換するクラス
+
+    使用している書式（【提案N】の見出し・強調・具体的なアクション・「・」の箇条書き・段落）だけを
+    先頭から1回だけ走査して変換する。処理時間は入力の長さに比例する。
+    """
+
+    def __init__(self):
+        self.parts = []
+        self.bullets = []         # 作成中の箇条書きの項目
+        self.newlines = 0         # 直前の出力との間の改行数
+        self.in_proposal = False  # 提案の div の中か
+
+    def render(self, markdown_text):
+        """MarkdownテキストをHTMLに変換"""
+        lines = markdown_text.split('\n')
+        self.parts.append('<p>')
+        index = 0
+
+        while index < len(lines):
+            line = lines[index]
+            index += 1
+
+            if not line:
+                self.newlines += 1
+                continue
+
+            stripped = line.strip()
+            header_position = line.find(ACTION_HEADER)
+            has_action = (header_position >= 0 and index < len(lines)
+                          and not line[header_position + len(ACTION_HEADER):].strip())
+
+            if not has_action and stripped.startswith('・'):
+                # 改行1つで続く箇条書きの行は1つの <ul> にまとめる
+                if not self.bullets or self.newlines != 1:
+                    self._flush_bullets()
+                    self._add_breaks()
+                self.bullets.append(f'<li>{self._render_inline(stripped[1:].strip())}</li>')
+                self.newlines = 1
+                continue
+
+            self._flush_bullets()
+            self._add_breaks()
+
+            if has_action:
+                self.parts.append(self._render_inline(line[:header_position]))
+                # 提案の div は具体的なアクションの直前で閉じる
+                self._close_proposal()
+                index = self._render_action_list(lines, index)
+            else:
+                self.parts.append(self._render_inline(line))
+
+            self.newlines = 1
+
+        self._flush_bullets()
+        self._add_trailing_breaks()
+        self._close_proposal()
+        self.parts.append('</p>')
+        return ''.join(self.parts)
+
+    def _add_trailing_breaks(self):
+        """末尾の改行を出力（従来の変換と同じく、提案の div は最後の改行の直前で閉じる）"""
+        # 最後の行の後にも次の行の分の改行を数えているため1つ減らす
+        trailing = self.newlines - 1
+        if trailing <= 0:
+            return
+        if self.in_proposal:
+            self.newlines = trailing - 1
+            self._add_breaks()
+            self._close_proposal()
+            trailing = 1
+        self.newlines = trailing
+        self._add_breaks()
+
+    def _add_breaks(self):
+        """改行を出力（空行（改行2つ）は段落の区切り、残りの改行は <br>）"""
+        self.parts.append('</p><p>' * (self.newlines // 2) + '<br>' * (self.newlines % 2))
+
+    def _flush_bullets(self):
+        """作成中の箇条書きを出力"""
+        if self.bullets:
+            self.parts.append(f'<ul>{"".join(self.bullets)}</ul>')
+            self.bullets = []
+
+    def _close_proposal(self):
+        """提案の div を閉じる"""
+        if self.in_proposal:
+            self.parts.append('</div>')
+            self.in_proposal = False
+
+    def _render_inline(self, text):
+        """1行分のテキストを変換（強調（**text**）を span にし、提案の見出しを div にする）"""
+        parts = []
+        position = 0
+        while True:
+            start = text.find('**', position)
+            if start < 0:
+                break
+            end = text.find('**', start + 2)
+            if end < 0:
+                # 閉じる ** がない場合はそのまま出力
+                break
+            parts.append(self._render_text(text[position:start]))
+            parts.append(f'<span class="highlight">{self._render_text(text[start + 2:end])}</span>')
+            position = end + 2
+        parts.append(self._render_text(text[position:]))
+        return ''.join(parts)
+
+    def _render_text(self, text):
+        """HTMLの特殊文字をエスケープし、提案の見出しごとに div を開始（前の提案は見出しの直前で閉じる）"""
+        if '【' not in text:
+            return html.escape(text, quote=False)
+
+        parts = []
+        position = 0
+        for match in PROPOSAL_PATTERN.finditer(text):
+            parts.append(html.escape(text[position:match.start()], quote=False))
+            if self.in_proposal:
+                parts.append('</div>')
+            parts.append(f'<div class="proposal-item"><h3>提案{match.group(1)}</h3>')
+            self.in_proposal = True
+            position = match.end()
+        parts.append(html.escape(text[position:], quote=False))
+        return ''.join(parts)
+
+    def _render_action_list(self, lines, index):
+        """「具体的なアクション:」に続く行を箇条書きとして出力し、次に処理する行の位置を返す
+
+        空行・** で始まる行・提案の見出しを含む行の直前までを1つの箇条書きとする。
+        """
+        # 見出しの直後の空白だけの行は読み飛ばす
+        while index + 1 < len(lines) and not lines[index].strip():
+            index += 1
+
+        items = []
+        while index < len(lines):
+            line = lines[index]
+            if not line or line.startswith('**') or PROPOSAL_PATTERN.search(line):
+                break
+            content = line.strip()
+            if content.startswith('・'):
+                content = content[1:].strip()
+            if content:
+                items.append(f'<li>{self._render_inline(content)}</li>')
+            index += 1
+
+        self.parts.append(f'<div class="action-list"><h4>{ACTION_HEADER}</h4><ul>{"".join(items)}</ul></div>')
+        return index
+
 def convert_markdown_to_html(markdown_text):
     """MarkdownテキストをHTMLに変換"""
     if not markdown_text:
         return ""
-
-    # 基本的なMarkdown変換
-    html = markdown_text
-
-    # 提案項目（【title】）を処理
-    html = re.sub(r'【提案(\d+)】(.*?)(?=【提案\d+】|具体的なアクション:|$)',
-                  r'<div class="proposal-item"><h3>提案\1</h3>\2</div>',
-                  html, flags=re.DOTALL)
-
-    # 強調（**text**）
-    html = re.sub(r'\*\*(.*?)\*\*', r'<span class="highlight">\1</span>', html)
-
-    # 具体的なアクションセクションを処理
-    html = re.sub(r'具体的なアクション:\s*\n(.*?)(?=\n\n|\n\*\*|$)',
-                  r'<div class="action-list"><h4>具体的なアクション:</h4><ul>\1</ul></div>',
-                  html, flags=re.DOTALL)
-
-    # 箇条書きの処理 - より確実な方法
-    # まず、箇条書きの行を特定
-    lines = html.split('\n')
-    result_lines = []
-    in_list = False
-    list_items = []
-
-    for line in lines:
-        if line.strip().startswith('・'):
-            # 箇条書きの開始
-            if not in_list:
-                in_list = True
-            # 箇条書きの内容を抽出
-            content = line.strip()[1:].strip()  # ・を除去
-            list_items.append(f'<li>{content}</li>')
-        else:
-            # 箇条書き以外の行
-            if in_list and list_items:
-                # 箇条書きを終了してulタグで囲む
-                result_lines.append(f'<ul>{"".join(list_items)}</ul>')
-                list_items = []
-                in_list = False
-            result_lines.append(line)
-
-    # 最後の箇条書きを処理
-    if in_list and list_items:
-        result_lines.append(f'<ul>{"".join(list_items)}</ul>')
-
-    html = '\n'.join(result_lines)
-
-    # 段落処理
-    html = re.sub(r'\n\n', r'</p><p>', html)
-
-    # 改行を処理
-    html = re.sub(r'\n', r'<br>', html)
-
-    # 段落タグで囲む
-    html = f'<p>{html}</p>'
-
-    return html
+    return MarkdownRenderer().render(markdown_text)
+
+# 内容がない場合に表示する文言
+MISSING_SECTION_HTML = '<p>（記載なし）</p>'
+
+# プレースホルダーごとの設定
+# source: 値の取得元（'name' は参加者名、それ以外は sections のキー）
+# default: 値がない場合の既定値（出力済みのHTMLとしてそのまま埋め込む）
+# render: 値をHTMLに変換する処理（参加者名はエスケープ、各セクションはMarkdownから変換）
+TEMPLATE_SLOTS = {
+    'NAME': {'source': 'name', 'default': '参加者', 'render': html.escape},
+    'ANALYSIS_SUMMARY': {'source': 'analysis_summary', 'default': MISSING_SECTION_HTML,
+                         'render': convert_markdown_to_html},
+    'PROPOSAL_CONTENT': {'source': 'proposal_content', 'default': MISSING_SECTION_HTML,
+                         'render': convert_markdown_to_html},
+    'TIPS_CONTENT': {'source': 'tips_content', 'default': MISSING_SECTION_HTML,
+                     'render': convert_markdown_to_html},
+    'RISK_CONTENT': {'source': 'risk_content', 'default': MISSING_SECTION_HTML,
+                     'render': convert_markdown_to_html},
+}
+
+class CompiledTemplate:
+    """固定部分とプレースホルダーに分解済みのHTMLテンプレート
+
+    テンプレートは1回だけ解析し、描画時は各プレースホルダーの値を1回ずつ変換して
+    固定部分と交互に連結する。
+    """
+
+    def __init__(self, template):
+        self.segments = []  # 固定部分（プレースホルダー数 + 1 個）
+        self.slots = []     # 固定部分の間に入るプレースホルダー名
+        position = 0
+        for match in PLACEHOLDER_PATTERN.finditer(template):
+            self.segments.append(template[position:match.start()])
+            self.slots.append(match.group(1))
+            position = match.end()
+        self.segments.append(template[position:])
+        self.unique_slots = sorted(set(self.slots))  # 同じプレースホルダーの値は1回だけ変換する
+
+        unknown = sorted(set(self.slots) - set(TEMPLATE_SLOTS))
+        if unknown:
+            raise ValueError(f"テンプレートに未定義のプレースホルダーがあります: {unknown}")
+
+    def render(self, name, sections):
+        """参加者名とセクションの内容からHTMLを生成"""
+        values = {}
+        for slot in self.unique_slots:
+            setting = TEMPLATE_SLOTS[slot]
+            value = name if setting['source'] == 'name' else sections.get(setting['source'])
+            values[slot] = setting['render'](value) if value else setting['default']
+        return self.fill(values)
+
+    def fill(self, values):
+        """変換済みの値（プレースホルダー名 → HTML）を埋め込む"""
+        parts = [self.segments[0]]
+        for slot, segment in zip(self.slots, self.segments[1:]):
+            parts.append(values[slot])
+            parts.append(segment)
+        return ''.join(parts)
 
 def generate_html_result(name, sections, template):
-    """HTML結果を生成"""
-    html = template
-
-    # プレースホルダーを置換
-    html = html.replace('{{NAME}}', name)
-
-    # 各セクションの内容をHTMLに変換して置換
-    if 'analysis_summary' in sections:
-        analysis_html = convert_markdown_to_html(sections['analysis_summary'])
-        html = html.replace('{{ANALYSIS_SUMMARY}}', analysis_html)
-
-    if 'proposal_content' in sections:
-        proposal_html = convert_markdown_to_html(sections['proposal_content'])
-        html = html.replace('{{PROPOSAL_CONTENT}}', proposal_html)
-
-    if 'tips_content' in sections:
-        tips_html = convert_markdown_to_html(sections['tips_content'])
-        html = html.replace('{{TIPS_CONTENT}}', tips_html)
-
-    if 'risk_content' in sections:
-        risk_html = convert_markdown_to_html(sections['risk_content'])
-        html = html.replace('{{RISK_CONTENT}}', risk_html)
+    """HTML結果を生成（template は文字列または compile_template の結果）"""
+    if not isinstance(template, CompiledTemplate):
+        template = compile_template(template)
+    return template.render(name, sections)
+
+def build_report(result_file, template):
+    """1人分のHTMLレポートを生成し、(結果ファイル名, エラー内容, 段階ごとの (実行時間, CPU時間)) を返す
+
+    ワーカープロセスで実行した場合も呼び出し側で計測値を記録できるよう、処理時間は戻り値で返す。
+    """
+    watch = Stopwatch()
+    timings = {}
+    try:
+        # 分析内容を解析してHTML結果を生成
+        name, sections = parse_analysis_result(result_file)
+        html_result = generate_html_result(name, sections, template)
+        timings['html_render'] = watch.lap()
+
+        # HTMLファイルを保存
+        with open(report_path(result_file), 'w', encoding='utf-8') as f:
+            f.write(html_result)
+        timings['file_write'] = watch.lap()
+
+        return result_file.name, None, timings
+
+    except Exception as e:
+        return result_file.name, str(e), timings
+
+def report_path(result_file):
+    """分析結果ファイルに対応するHTMLファイルのパス"""
+    return result_file.with_name(result_file.name.replace('_analysis_result.txt', '_analysis_result.html'))
+
+_worker_template = None
+
+def _init_build_worker(template_text):
+    """ワーカープロセスを初期化（テンプレートは1回だけ解析）"""
+    global _worker_template
+    _worker_template = compile_template(template_text)
+
+def _build_report_in_worker(result_file):
+    """ワーカープロセスでHTMLレポートを生成"""
+    return build_report(result_file, _worker_template)
+
+class ReportManifest:
+    """生成済みHTMLレポートの入力ハッシュ値を記録するマニフェスト
+
+    分析結果ファイルごとに内容のハッシュ値・更新日時・サイズと、生成に使ったテンプレートの
+    ハッシュ値を記録する。更新日時とサイズが同じファイルは読み込まずに変更なしとみなす。
+    """
+
+    def __init__(self, path, template_text):
+        self.path = path
+        source = f"{config.REPORT_RENDERER_VERSION}\0{template_text}"
+        self.template_hash = hashlib.sha256(source.encode('utf-8')).hexdigest()
+        manifest = FileUtils.safe_read_json(path) if os.path.exists(path) else None
+        self.entries = manifest.get('reports', {}) if manifest else {}
+
+    def is_up_to_date(self, result_file):
+        """前回生成したときから分析結果とテンプレートが変わっていないか"""
+        entry = self.entries.get(result_file.name)
+        if entry is None or entry['template_hash'] != self.template_hash:
+            return False
+        if not report_path(result_file).exists():
+            return False
+
+        stat = result_file.stat()
+        if entry['mtime_ns'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+            return True
+
+        # 更新日時だけが変わった場合は内容を比較
+        if entry['source_hash'] != self._hash_file(result_file):
+            return False
+        entry['mtime_ns'] = stat.st_mtime_ns
+        return True
+
+    def record(self, result_file):
+        """生成したレポートの入力を記録"""
+        stat = result_file.stat()
+        self.entries[result_file.name] = {
+            'source_hash': self._hash_file(result_file),
+            'template_hash': self.template_hash,
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size
+        }
+
+    def save(self, result_files):
+        """マニフェストを保存（存在しない分析結果の記録は削除）"""
+        names = {result_file.name for result_file in result_files}
+        self.entries = {name: entry for name, entry in self.entries.items() if name in names}
+        FileUtils.safe_write_json(self.path, {'reports': self.entries})
+
+    @staticmethod
+    def _hash_file(path):
+        with open(path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+
+def build_reports(result_files, template_text, workers, force=False):
+    """変更のあった分析結果だけHTMLレポートを生成し、集計結果を返す"""
+    started = time.perf_counter()
+    manifest = ReportManifest(config.REPORT_BUILD_MANIFEST_FILE, template_text)
+
+    targets = [result_file for result_file in result_files
+               if force or not manifest.is_up_to_date(result_file)]
+    stats = {'built': 0, 'skipped': len(result_files) - len(targets), 'failed': 0, 'render_seconds': 0.0}
+    paths = {result_file.name: result_file for result_file in targets}
+
+    # 生成対象より多いプロセスは起動しない（対象が1件なら並列化しない）
+    workers = min(workers, len(targets))
+    if workers > 1:
+        # 1回の受け渡しで複数ファイルを処理し、プロセス間通信の回数を減らす
+        chunksize = max(1, len(targets) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_build_worker,
+                                 initargs=(template_text,)) as executor:
+            results = list(executor.map(_build_report_in_worker, targets, chunksize=chunksize))
+    else:
+        template = compile_template(template_text)
+        results = [build_report(result_file, template) for result_file in targets]
+
+    for name, error, timings in results:
+        for stage, (wall, cpu) in timings.items():
+            metrics.observe(stage, wall, cpu)
+            stats['render_seconds'] += wall
+        if error:
+            stats['failed'] += 1
+            print(f"エラー ({name}): {error}")
+        else:
+            stats['built'] += 1
+            manifest.record(paths[name])
+            print(f"生成完了: {report_path(paths[name]).name}")
 
-    return html
+    manifest.save(result_files)
+    stats['seconds'] = time.perf_counter() - started
+    return stats
 
 def main():
     """メイン処理"""
-    output_dir = Path('output')
+    parser = argparse.ArgumentParser(description="Skill-Zero Analyzer - HTMLレポート生成")
+    parser.add_argument('--workers', type=int, default=config.REPORT_BUILD_WORKERS,
+                        help="HTML生成のプロセス数（1は並列化しない）")
+    parser.add_argument('--force', action='store_true',
+                        help="変更の有無にかかわらずすべてのHTMLを生成")
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+
+    output_dir = Path(config.OUTPUT_DIR)
     template_path = output_dir / 'analysis_result_template.html'
 
-    # テンプレートを読み込み
-    template = read_template(template_path)
+    # テンプレートを読み込み（解析は生成する側で1回だけ行う）
+    template_text = read_template(template_path)
 
     # analysis_result.txtファイルを検索
-    result_files = list(output_dir.glob('*_analysis_result.txt'))
+    result_files = sorted(output_dir.glob('*_analysis_result.txt'))
 
     print(f"処理対象ファイル数: {len(result_files)}")
 
-    for result_file in result_files:
-        try:
-            print(f"処理中: {result_file.name}")
-
-            # 分析内容を解析
-            name, sections = parse_analysis_result(result_file)
-
-            # HTML結果を生成
-            html_result = generate_html_result(name, sections, template)
-
-            # 結果ファイル名を生成
-            result_filename = result_file.name.replace('_analysis_result.txt', '_analysis_result.html')
-            result_path = output_dir / result_filename
-
-            # HTMLファイルを保存
-            with open(result_path, 'w', encoding='utf-8') as f:
-                f.write(html_result)
-
-            print(f"生成完了: {result_filename}")
-
-        except Exception as e:
-            print(f"エラー ({result_file.name}): {e}")
+    with instrument('generate_analysis_results', args.metrics, args.profile):
+        stats = build_reports(result_files, template_text, args.workers, args.force)
 
+    print(f"生成: {stats['built']}件 / スキップ: {stats['skipped']}件 / 失敗: {stats['failed']}件 "
+          f"(合計 {stats['seconds'] * 1000:.0f}ms, 生成処理 {stats['render_seconds'] * 1000:.0f}ms)")
     print("すべての処理が完了しました。")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Skill-Zero Analyzer - Keyword Matcher
+複数のキーワードを1回の走査で探す Aho-Corasick 法の照合器
+"""
+
+from typing import List, Iterable, Set
+
+
+class KeywordMatcher:
+    """複数のキーワードを1回の走査で探すクラス（Aho-Corasick 法）
+
+    キーワードからトライ木と失敗遷移を作り、テキストを先頭から1文字ずつ読んで
+    すべてのキーワードの出現（重なりを含む）を見つける。キーワード数が増えても
+    走査は1回で済む。失敗遷移をたどって求めた遷移先は状態ごとに記録し、
+    同じ状態で同じ文字を読んだときは1回の参照で遷移する。
+    空のキーワードは `'' in text` と同じく、どのテキスト（空文字列を含む）にも現れるものとする。
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = []  # キーワード番号 → キーワード
+        numbers = {}
+        self.goto = [{}]  # 状態 → 文字 → 次の状態（トライ木）
+        self.outputs = [()]  # 状態 → その状態で見つかるキーワード番号（失敗遷移先の分を含む）
+
+        for keyword in keywords:
+            if keyword in numbers:
+                continue
+            numbers[keyword] = len(self.keywords)
+            self.keywords.append(keyword)
+            state = 0
+            for char in keyword:
+                next_state = self.goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto[state][char] = next_state
+                    self.goto.append({})
+                    self.outputs.append(())
+                state = next_state
+            self.outputs[state] += (numbers[keyword],)
+
+        self.fail = self._build_failure_links()
+        # キーワードに含まれない文字を読んだら必ず初期状態に戻る
+        self.alphabet = frozenset(char for transitions in self.goto for char in transitions)
+        self.transitions = [dict(transitions) for transitions in self.goto]
+
+    def _build_failure_links(self) -> List[int]:
+        """幅優先で失敗遷移を求め、失敗遷移先で見つかるキーワードを出力に加える"""
+        fail = [0] * len(self.goto)
+        # 初期状態の子の失敗遷移先は初期状態（孫から順に求める）
+        queue = list(self.goto[0].values())
+        for state in queue:
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                target = fail[state]
+                while target and char not in self.goto[target]:
+                    target = fail[target]
+                fail[next_state] = self.goto[target].get(char, 0)
+                self.outputs[next_state] += self.outputs[fail[next_state]]
+        return fail
+
+    def __len__(self) -> int:
+        return len(self.keywords)
+
+    def _step(self, state: int, char: str) -> int:
+        """失敗遷移をたどって次の状態を求め、状態ごとに記録"""
+        target = state
+        while target and char not in self.goto[target]:
+            target = self.fail[target]
+        next_state = self.goto[target].get(char, 0)
+        self.transitions[state][char] = next_state
+        return next_state
+
+    def find(self, text: str) -> Set[int]:
+        """テキストに現れるキーワードの番号"""
+        transitions = self.transitions
+        outputs = self.outputs
+        alphabet = self.alphabet
+        found = set(outputs[0])
+        state = 0
+        for char in text:
+            if char not in alphabet:
+                state = 0
+                continue
+            next_state = transitions[state].get(char)
+            state = self._step(state, char) if next_state is None else next_state
+            if outputs[state]:
+                found.update(outputs[state])
+        return found
+
+    def search(self, text: str) -> bool:
+        """テキストにいずれかのキーワードが現れるか（最初の出現で打ち切る）"""
+        transitions = self.transitions
+        outputs = self.outputs
+        alphabet = self.alphabet
+        if outputs[0]:
+            return True
+        state = 0
+        for char in text:
+            if char not in alphabet:
+                state = 0
+                continue
+            next_state = transitions[state].get(char)
+            state = self._step(state, char) if next_state is None else next_state
+            if outputs[state]:
+                return True
+        return False
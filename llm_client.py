@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Skill-Zero Analyzer - LLM Client
+OpenAI互換のHTTPエンドポイントに分析用プロンプトを送信するクライアント
+"""
+
+import asyncio
+import email.utils
+import hashlib
+import json
+import math
+import os
+import random
+import socket
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Any, Optional, Tuple
+from config import config
+from disk_cache import DiskCache
+from utils import Logger, ProgressLogger
+
+
+class LLMRequestError(Exception):
+    """LLMへのリクエストエラー"""
+
+    def __init__(self, message: str, retryable: bool, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After ヘッダーの値を待機秒数に変換（秒数とHTTP日付に対応、解析できない場合はNone）"""
+    if not value:
+        return None
+
+    value = value.strip()
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            date = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if date.tzinfo is None:
+            date = date.replace(tzinfo=timezone.utc)
+        seconds = (date - datetime.now(timezone.utc)).total_seconds()
+
+    if not math.isfinite(seconds):
+        return None
+    return max(0.0, seconds)
+
+
+class TokenBucket:
+    """トークンバケット方式のレート制限クラス"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """トークンを1つ取得（足りない場合は補充されるまで待機）"""
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class LLMClient:
+    """OpenAI互換のチャット補完APIクライアント
+
+    HTTP通信は標準ライブラリ（urllib）で行い、呼び出し側のイベントループを止めないよう
+    専用のスレッドプールで実行する。タイムアウトとリトライ回数は Config の設定に従う。
+    """
+
+    def __init__(self, api_base: Optional[str] = None, api_key: Optional[str] = None,
+                 model: Optional[str] = None, timeout: Optional[float] = None,
+                 max_retries: Optional[int] = None):
+        self.url = (api_base or config.LLM_API_BASE).rstrip('/') + '/chat/completions'
+        self.api_key = api_key if api_key is not None else os.getenv(config.LLM_API_KEY_ENV, '')
+        self.model = model or config.LLM_MODEL
+        self.timeout = timeout or config.REQUEST_TIMEOUT
+        self.max_retries = config.MAX_RETRY_COUNT if max_retries is None else max_retries
+        self.retry_count = 0
+
+    @property
+    def params(self) -> Dict[str, Any]:
+        """応答内容に影響するリクエストパラメータ"""
+        return {'temperature': config.LLM_TEMPERATURE, 'max_tokens': config.LLM_MAX_TOKENS}
+
+    def build_payload(self, prompt: str) -> Dict[str, Any]:
+        """リクエスト本文を作成"""
+        payload = {'model': self.model, 'messages': [{'role': 'user', 'content': prompt}]}
+        payload.update(self.params)
+        return payload
+
+    def _post(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """リクエストを送信（同期処理）"""
+        headers = {'Content-Type': 'application/json'}
+        if self.api_key:
+            headers['Authorization'] = f"Bearer {self.api_key}"
+
+        request = urllib.request.Request(
+            self.url, data=json.dumps(payload, ensure_ascii=False).encode('utf-8'), headers=headers, method='POST'
+        )
+
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return json.loads(response.read().decode('utf-8'))
+
+        except urllib.error.HTTPError as e:
+            body = e.read().decode('utf-8', 'replace')[:200]
+            retry_after = e.headers.get('Retry-After') if e.headers else None
+            raise LLMRequestError(
+                f"HTTP {e.code}: {body}",
+                retryable=e.code == 429 or e.code >= 500,
+                retry_after=parse_retry_after(retry_after)
+            )
+        except (urllib.error.URLError, socket.timeout, TimeoutError, ConnectionError) as e:
+            raise LLMRequestError(f"通信エラー: {e}", retryable=True)
+        except ValueError as e:
+            raise LLMRequestError(f"レスポンス解析エラー: {e}", retryable=False)
+
+    def _backoff_delay(self, attempt: int, retry_after: Optional[float]) -> float:
+        """リトライまでの待機時間（Retry-After の指定、なければ指数バックオフ＋ジッター。上限は LLM_RETRY_BACKOFF_MAX）"""
+        if retry_after is not None:
+            return min(retry_after, config.LLM_RETRY_BACKOFF_MAX)
+        cap = min(config.LLM_RETRY_BACKOFF_MAX, config.LLM_RETRY_BACKOFF_BASE * (2 ** attempt))
+        return random.uniform(cap / 2, cap)
+
+    async def complete(self, prompt: str, executor: Optional[ThreadPoolExecutor] = None,
+                       bucket: Optional[TokenBucket] = None) -> str:
+        """プロンプトを送信して応答本文を取得（bucket を指定した場合はリトライを含む送信ごとにトークンを取得）"""
+        loop = asyncio.get_running_loop()
+        payload = self.build_payload(prompt)
+
+        for attempt in range(self.max_retries + 1):
+            if bucket is not None:
+                await bucket.acquire()
+            try:
+                response = await asyncio.wait_for(
+                    loop.run_in_executor(executor, self._post, payload), timeout=self.timeout
+                )
+                return response['choices'][0]['message']['content']
+
+            except asyncio.TimeoutError:
+                error = LLMRequestError(f"タイムアウト（{self.timeout}秒）", retryable=True)
+            except LLMRequestError as e:
+                error = e
+            except (KeyError, IndexError, TypeError) as e:
+                error = LLMRequestError(f"レスポンス形式エラー: {e}", retryable=False)
+
+            if not error.retryable or attempt >= self.max_retries:
+                raise error
+
+            self.retry_count += 1
+            await asyncio.sleep(self._backoff_delay(attempt, error.retry_after))
+
+        raise LLMRequestError("リトライ回数の上限に達しました", retryable=False)
+
+
+class ResponseCache:
+    """LLM応答の永続キャッシュクラス
+
+    キーはプロンプトのハッシュ値・モデル名・リクエストパラメータのハッシュ値。
+    read_only=True の場合は過去の実行結果の再生用として、キャッシュを変更しない。
+    """
+
+    def __init__(self, path: str, max_bytes: int, ttl: Optional[float] = None, read_only: bool = False):
+        self.cache = DiskCache(path, max_bytes, ttl=ttl, read_only=read_only)
+        self.read_only = read_only
+
+    @staticmethod
+    def make_key(prompt_hash: str, model: str, params: Dict[str, Any]) -> str:
+        """キャッシュキーを生成"""
+        source = json.dumps([prompt_hash, model, params], ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(source.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """キャッシュ済みの応答を取得"""
+        return self.cache.get(key)
+
+    def set(self, key: str, response: str) -> None:
+        """応答を保存"""
+        self.cache.set(key, response)
+
+    def stats(self) -> Dict[str, int]:
+        """ヒット・ミス・削除件数を取得"""
+        return self.cache.stats()
+
+    def close(self) -> None:
+        """キャッシュを閉じる"""
+        self.cache.close()
+
+
+class LLMExecutor:
+    """複数の分析用プロンプトを並行してLLMに送信するクラス
+
+    同時実行数はセマフォで、送信ペースはトークンバケットで制限する。
+    結果は受け取った順に保存処理に渡す。応答キャッシュを指定した場合はキャッシュ済みの
+    応答を送信せずに使い、読み込み専用のキャッシュではキャッシュにない参加者をエラーとする。
+    """
+
+    def __init__(self, client: Optional[LLMClient] = None, concurrency: Optional[int] = None,
+                 rate_per_sec: Optional[float] = None, burst: Optional[int] = None,
+                 cache: Optional[ResponseCache] = None):
+        self.logger = Logger.setup_logger(__name__)
+        self.client = client or LLMClient()
+        self.concurrency = concurrency or config.LLM_MAX_CONCURRENCY
+        self.rate_per_sec = rate_per_sec or config.LLM_RATE_LIMIT_PER_SEC
+        self.burst = burst or config.LLM_RATE_LIMIT_BURST
+        self.cache = cache
+
+    def _cache_key(self, name: str, prompt_hash: Optional[Callable[[str], Optional[str]]]) -> Optional[str]:
+        """参加者の応答キャッシュキー（プロンプトのハッシュ値がない場合はNone）"""
+        if self.cache is None or prompt_hash is None:
+            return None
+        hash_value = prompt_hash(name)
+        if hash_value is None:
+            return None
+        return ResponseCache.make_key(hash_value, self.client.model, self.client.params)
+
+    async def _run_job(self, name: str, load_prompt: Callable[[str], Optional[str]],
+                       save_result: Callable[[str, str], Any], semaphore: asyncio.Semaphore,
+                       bucket: TokenBucket, executor: ThreadPoolExecutor,
+                       prompt_hash: Optional[Callable[[str], Optional[str]]]) -> Tuple[str, Optional[str]]:
+        """1件分のプロンプトを送信して結果を保存（エラー時はエラー内容を返す）"""
+        async with semaphore:
+            cache_key = self._cache_key(name, prompt_hash)
+            if cache_key is not None:
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    save_result(name, cached)
+                    return name, None
+                if self.cache.read_only:
+                    return name, "キャッシュに応答がありません（再生モード）"
+
+            prompt = load_prompt(name)
+            if not prompt:
+                return name, "プロンプトが見つかりません"
+
+            try:
+                # 429・5xx の後のリトライも送信ペースの制限を受けるよう、トークンは送信ごとに取得する
+                result = await self.client.complete(prompt, executor, bucket)
+            except LLMRequestError as e:
+                return name, str(e)
+
+            if cache_key is not None:
+                self.cache.set(cache_key, result)
+            save_result(name, result)
+            return name, None
+
+    async def run_async(self, names: List[str], load_prompt: Callable[[str], Optional[str]],
+                        save_result: Callable[[str, str], Any],
+                        prompt_hash: Optional[Callable[[str], Optional[str]]] = None) -> Dict[str, Any]:
+        """全プロンプトを並行して送信（prompt_hash を指定すると応答キャッシュを使う）"""
+        semaphore = asyncio.Semaphore(self.concurrency)
+        bucket = TokenBucket(self.rate_per_sec, self.burst)
+        started = time.perf_counter()
+        errors = []
+
+        progress = ProgressLogger(self.logger, "LLM実行", total=len(names))
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            jobs = [self._run_job(name, load_prompt, save_result, semaphore, bucket, executor, prompt_hash)
+                    for name in names]
+            for future in asyncio.as_completed(jobs):
+                name, error = await future
+                if error:
+                    errors.append((name, error))
+                    self.logger.error(f"LLM実行エラー ({name}): {error}")
+                    progress.update(failed=1)
+                else:
+                    self.logger.debug(f"分析結果を保存しました: {name}")
+                    progress.update()
+        progress.finish()
+
+        elapsed = time.perf_counter() - started
+        cache_stats = self.cache.stats() if self.cache is not None else {'hits': 0, 'misses': 0}
+        return {
+            'total': len(names),
+            'cache_hits': cache_stats['hits'],
+            'cache_misses': cache_stats['misses'],
+            'succeeded': len(names) - len(errors),
+            'failed': len(errors),
+            'errors': errors,
+            'retries': self.client.retry_count,
+            'elapsed': elapsed,
+            'requests_per_sec': len(names) / elapsed if elapsed > 0 else 0.0
+        }
+
+    def run(self, names: List[str], load_prompt: Callable[[str], Optional[str]],
+            save_result: Callable[[str, str], Any],
+            prompt_hash: Optional[Callable[[str], Optional[str]]] = None) -> Dict[str, Any]:
+        """全プロンプトを並行して送信（同期呼び出し用）"""
+        return asyncio.run(self.run_async(names, load_prompt, save_result, prompt_hash))
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Skill-Zero Analyzer - Metrics
+処理段階ごとの計測（実行時間・CPU時間・件数・処理時間の分布）とプロファイリング
+"""
+
+import argparse
+import bisect
+import cProfile
+import io
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, List, Any, Iterator, Optional, Tuple
+from config import config
+from utils import Logger, FileUtils
+
+
+class Stopwatch:
+    """実行時間（wall）とCPU時間を同時に計るストップウォッチ"""
+
+    def __init__(self):
+        self.restart()
+
+    def restart(self) -> None:
+        """計測を開始し直す"""
+        self.wall = time.perf_counter()
+        self.cpu = time.process_time()
+
+    def lap(self) -> Tuple[float, float]:
+        """前回の開始からの (実行時間, CPU時間) を返し、計測を開始し直す"""
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        elapsed = (wall - self.wall, cpu - self.cpu)
+        self.wall = wall
+        self.cpu = cpu
+        return elapsed
+
+
+class StageMetrics:
+    """1つの処理段階の集計値"""
+
+    def __init__(self, buckets: List[float]):
+        self.buckets = buckets
+        self.calls = 0
+        self.records = 0
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.max_seconds = 0.0
+        # 区切りごとの件数（最後の要素は最大の区切りを超えた件数）
+        self.bucket_counts = [0] * (len(buckets) + 1)
+
+    def observe(self, wall: float, cpu: float, records: int) -> None:
+        """1回分の処理時間を加算"""
+        self.calls += 1
+        self.records += records
+        self.wall_seconds += wall
+        self.cpu_seconds += cpu
+        self.max_seconds = max(self.max_seconds, wall)
+        self.bucket_counts[bisect.bisect_left(self.buckets, wall)] += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON出力用の辞書に変換"""
+        cumulative = 0
+        histogram = {}
+        for bound, count in zip(self.buckets + ['+Inf'], self.bucket_counts):
+            cumulative += count
+            histogram[str(bound)] = cumulative
+
+        return {
+            'calls': self.calls,
+            'records': self.records,
+            'wall_seconds': round(self.wall_seconds, 6),
+            'cpu_seconds': round(self.cpu_seconds, 6),
+            'mean_seconds': round(self.wall_seconds / self.calls, 6) if self.calls else 0.0,
+            'max_seconds': round(self.max_seconds, 6),
+            'records_per_sec': round(self.records / self.wall_seconds, 1) if self.wall_seconds > 0 else 0.0,
+            'latency_histogram': histogram
+        }
+
+
+class MetricsRegistry:
+    """処理段階ごとの計測値を集めるクラス
+
+    段階名ごとに呼び出し回数・件数・実行時間・CPU時間と、1回あたりの処理時間の
+    ヒストグラムを記録し、JSONとPrometheusのテキスト形式で出力する。
+    """
+
+    PROMETHEUS_PREFIX = 'skill_zero'
+
+    def __init__(self, buckets: Optional[List[float]] = None):
+        self.buckets = sorted(buckets or config.METRICS_LATENCY_BUCKETS)
+        self.stages = {}
+        self.lock = threading.Lock()
+        self.started = Stopwatch()
+
+    def observe(self, name: str, wall: float, cpu: float = 0.0, records: int = 1) -> None:
+        """計測済みの処理時間を記録"""
+        with self.lock:
+            stage = self.stages.get(name)
+            if stage is None:
+                stage = self.stages[name] = StageMetrics(self.buckets)
+            stage.observe(wall, cpu, records)
+
+    @contextmanager
+    def stage(self, name: str, records: int = 1) -> Iterator[None]:
+        """with ブロックの処理時間を記録"""
+        watch = Stopwatch()
+        try:
+            yield
+        finally:
+            self.observe(name, *watch.lap(), records=records)
+
+    def reset(self) -> None:
+        """記録をすべて消去"""
+        with self.lock:
+            self.stages = {}
+            self.started = Stopwatch()
+
+    def snapshot(self, run: str) -> Dict[str, Any]:
+        """記録の内容を辞書で取得"""
+        wall, cpu = self.started.lap()
+        with self.lock:
+            stages = {name: stage.to_dict() for name, stage in self.stages.items()}
+        return {
+            'run': run,
+            'recorded_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'wall_seconds': round(wall, 6),
+            'cpu_seconds': round(cpu, 6),
+            'stages': stages
+        }
+
+    def to_prometheus(self, snapshot: Dict[str, Any]) -> str:
+        """Prometheusのテキスト形式（node_exporter の textfile collector 用）に変換"""
+        prefix = self.PROMETHEUS_PREFIX
+        run = snapshot['run']
+        lines = []
+
+        counters = [
+            ('stage_calls_total', 'calls', "処理段階の呼び出し回数"),
+            ('stage_records_total', 'records', "処理段階で処理した件数"),
+            ('stage_wall_seconds_total', 'wall_seconds', "処理段階の実行時間（秒）"),
+            ('stage_cpu_seconds_total', 'cpu_seconds', "処理段階のCPU時間（秒）")
+        ]
+        for metric, key, description in counters:
+            lines.append(f"# HELP {prefix}_{metric} {description}")
+            lines.append(f"# TYPE {prefix}_{metric} counter")
+            for name, stage in snapshot['stages'].items():
+                lines.append(f'{prefix}_{metric}{{run="{run}",stage="{name}"}} {stage[key]}')
+
+        metric = f"{prefix}_stage_latency_seconds"
+        lines.append(f"# HELP {metric} 処理段階の1回あたりの処理時間（秒）")
+        lines.append(f"# TYPE {metric} histogram")
+        for name, stage in snapshot['stages'].items():
+            for bound, count in stage['latency_histogram'].items():
+                lines.append(f'{metric}_bucket{{run="{run}",stage="{name}",le="{bound}"}} {count}')
+            lines.append(f'{metric}_sum{{run="{run}",stage="{name}"}} {stage["wall_seconds"]}')
+            lines.append(f'{metric}_count{{run="{run}",stage="{name}"}} {stage["calls"]}')
+
+        for metric, key, description in [('run_wall_seconds', 'wall_seconds', "実行全体の実行時間（秒）"),
+                                         ('run_cpu_seconds', 'cpu_seconds', "実行全体のCPU時間（秒）")]:
+            lines.append(f"# HELP {prefix}_{metric} {description}")
+            lines.append(f"# TYPE {prefix}_{metric} gauge")
+            lines.append(f'{prefix}_{metric}{{run="{run}"}} {snapshot[key]}')
+        lines.append(f"# TYPE {prefix}_run_completed_timestamp_seconds gauge")
+        lines.append(f'{prefix}_run_completed_timestamp_seconds{{run="{run}"}} {time.time():.0f}')
+
+        return '\n'.join(lines) + '\n'
+
+    def export(self, run: str, output_dir: Optional[str] = None) -> Tuple[str, str]:
+        """JSONとPrometheusのテキスト形式で出力し、(JSONのパス, テキストのパス) を返す"""
+        output_dir = output_dir or config.METRICS_DIR
+        FileUtils.ensure_directory(output_dir)
+        snapshot = self.snapshot(run)
+
+        json_path = os.path.join(output_dir, f"{run}_metrics.json")
+        FileUtils.safe_write_json(json_path, snapshot)
+
+        # textfile collector が書き込み途中のファイルを読まないよう、置き換えで出力する
+        prom_path = os.path.join(output_dir, f"{run}.prom")
+        temp_path = f"{prom_path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(self.to_prometheus(snapshot))
+        os.replace(temp_path, prom_path)
+
+        return json_path, prom_path
+
+
+class Profiler:
+    """cProfile と tracemalloc で実行全体をプロファイリングするクラス"""
+
+    def __init__(self, run: str, output_dir: Optional[str] = None):
+        self.run = run
+        self.output_dir = output_dir or config.PROFILE_DIR
+        self.profile = cProfile.Profile()
+
+    def start(self) -> None:
+        """プロファイリングを開始"""
+        tracemalloc.start(config.PROFILE_TRACEMALLOC_FRAMES)
+        self.profile.enable()
+
+    def stop(self) -> List[str]:
+        """プロファイリングを終了して結果を保存し、保存したファイルのパスを返す"""
+        self.profile.disable()
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        FileUtils.ensure_directory(self.output_dir)
+        base = os.path.join(self.output_dir, self.run)
+
+        # cProfile: snakeviz などで開ける形式と、累積時間の上位を並べたテキスト
+        self.profile.dump_stats(f"{base}.prof")
+        stream = io.StringIO()
+        pstats.Stats(self.profile, stream=stream).sort_stats('cumulative').print_stats(config.PROFILE_TOP_N)
+        with open(f"{base}_cprofile.txt", 'w', encoding='utf-8') as f:
+            f.write(stream.getvalue())
+
+        # tracemalloc: スナップショットと、確保量の多い行の上位
+        snapshot.dump(f"{base}.tracemalloc")
+        with open(f"{base}_tracemalloc.txt", 'w', encoding='utf-8') as f:
+            f.write(f"現在の確保量: {current / 1024:.1f} KiB / ピーク: {peak / 1024:.1f} KiB\n\n")
+            for stat in snapshot.statistics('lineno')[:config.PROFILE_TOP_N]:
+                f.write(f"{stat}\n")
+
+        return [f"{base}.prof", f"{base}_cprofile.txt", f"{base}.tracemalloc", f"{base}_tracemalloc.txt"]
+
+
+def add_metrics_arguments(parser: argparse.ArgumentParser) -> None:
+    """計測用のコマンドライン引数を追加"""
+    parser.add_argument('--metrics', action='store_true',
+                        help=f"処理段階ごとの計測結果を {config.METRICS_DIR} にJSONとPrometheus形式で出力")
+    parser.add_argument('--profile', action='store_true',
+                        help=f"cProfile と tracemalloc の結果を {config.PROFILE_DIR} に出力（--metrics を含む）")
+
+
+@contextmanager
+def instrument(run: str, export: bool = False, profile: bool = False) -> Iterator[None]:
+    """with ブロック全体を計測し、終了時に計測結果（とプロファイル）を出力"""
+    logger = Logger.setup_logger(__name__)
+    metrics.reset()
+    profiler = Profiler(run) if profile else None
+    if profiler is not None:
+        profiler.start()
+
+    try:
+        yield
+    finally:
+        if profiler is not None:
+            for path in profiler.stop():
+                logger.info(f"プロファイルを保存しました: {path}")
+        if export or profile:
+            for path in metrics.export(run):
+                logger.info(f"計測結果を保存しました: {path}")
+
+
+# 計測値の記録先（プロセス内で共有）
+metrics = MetricsRegistry()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Skill-Zero Analyzer - Models
+参加者データのレコードクラス
+"""
+
+import sys
+from typing import Dict, Any, Tuple
+
+
+class _Missing:
+    """項目に値がないことを表す値（None や空文字とは区別する）"""
+
+    __slots__ = ()
+
+    def __bool__(self) -> bool:
+        return False
+
+    def __repr__(self) -> str:
+        return 'MISSING'
+
+    def __reduce__(self) -> str:
+        return 'MISSING'
+
+
+MISSING = _Missing()
+
+
+class Record:
+    """項目を __slots__ で固定したレコードの基底クラス
+
+    辞書と違い項目名（キー）をレコードごとに持たないため、大量の参加者を保持しても
+    メモリ使用量が少ない。辞書との変換では FIELDS の順に値のある項目だけを出力し、
+    FIELDS にないキーは extra に保持するため、JSONとの相互変換で内容は変わらない。
+    """
+
+    __slots__ = ('extra',)
+
+    FIELDS: Tuple[str, ...] = ()
+    # 辞書から変換するときにレコードに変換する項目（項目名 → レコードクラス）
+    NESTED: Dict[str, type] = {}
+    # 値の種類が少ない項目（同じ文字列を1つのオブジェクトで共有する）
+    INTERNED_FIELDS: Tuple[str, ...] = ()
+
+    def __init__(self, **values: Any):
+        for field in self.FIELDS:
+            setattr(self, field, values.pop(field, MISSING))
+        self.extra = {sys.intern(key): value for key, value in values.items()} or None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Record':
+        """辞書（JSON）からレコードを作成"""
+        record = cls.__new__(cls)
+        for field in cls.FIELDS:
+            value = data.get(field, MISSING)
+            if field in cls.NESTED and isinstance(value, dict):
+                value = cls.NESTED[field].from_dict(value)
+            elif field in cls.INTERNED_FIELDS and isinstance(value, str):
+                value = sys.intern(value)
+            setattr(record, field, value)
+
+        extra = {sys.intern(key): value for key, value in data.items() if key not in cls.FIELDS}
+        record.extra = extra or None
+        return record
+
+    def to_dict(self) -> Dict[str, Any]:
+        """辞書（JSON）に変換"""
+        data = {}
+        for field in self.FIELDS:
+            value = getattr(self, field)
+            if value is MISSING:
+                continue
+            data[field] = value.to_dict() if isinstance(value, Record) else value
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def get(self, field: str, default: Any = None) -> Any:
+        """項目の値を取得（値がない場合は default）"""
+        if field in self.FIELDS:
+            value = getattr(self, field)
+            return default if value is MISSING else value
+        return self.extra.get(field, default) if self.extra else default
+
+    def __contains__(self, field: str) -> bool:
+        """項目に値があるか（辞書の in と同じ）"""
+        return self.get(field, MISSING) is not MISSING
+
+    def copy(self) -> 'Record':
+        """浅いコピーを作成"""
+        record = self.__class__.__new__(self.__class__)
+        for field in self.FIELDS:
+            setattr(record, field, getattr(self, field))
+        record.extra = dict(self.extra) if self.extra else None
+        return record
+
+    def __bool__(self) -> bool:
+        # 空の辞書と同じく、値のある項目が1つもなければ偽
+        return bool(self.extra) or any(getattr(self, field) is not MISSING for field in self.FIELDS)
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, Record):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.to_dict()!r})"
+
+
+class FormData(Record):
+    """フォーム回答"""
+
+    FIELDS = ('experience', 'strengths', 'appreciation', 'not_bad_at', 'weaknesses')
+    __slots__ = FIELDS
+
+    def merged(self, other: 'FormData') -> 'FormData':
+        """other の値のある項目で上書きしたフォーム回答を返す（dict.update と同じ）"""
+        merged = self.copy()
+        for field in self.FIELDS:
+            value = getattr(other, field)
+            if value is not MISSING:
+                setattr(merged, field, value)
+        if other.extra:
+            merged.extra = {**(merged.extra or {}), **other.extra}
+        return merged
+
+
+class ProfileInfo(Record):
+    """プロフィール情報
+
+    プロフィールテキストから抽出した場合は username〜categories、プロフィールデータが
+    ない場合は url と extracted_at だけに値がある。
+    """
+
+    FIELDS = ('username', 'bio', 'location', 'job', 'family', 'libecity_meeting', 'challenges', 'hobbies',
+              'likes', 'skills', 'duration', 'register_date', 'work_history', 'strengths', 'likes_list',
+              'categories', 'url', 'extracted_at')
+    __slots__ = FIELDS
+    INTERNED_FIELDS = ('location', 'job', 'family', 'duration', 'register_date', 'extracted_at')
+
+
+class Participant(Record):
+    """参加者（フォーム回答とプロフィール情報）"""
+
+    FIELDS = ('timestamp', 'email', 'nickname', 'profile_url', 'form_data', 'submitted', 'profile_info')
+    __slots__ = FIELDS
+    NESTED = {'form_data': FormData, 'profile_info': ProfileInfo}
+
+    @property
+    def name(self) -> str:
+        """表示名（ニックネームがない場合は 'Unknown'）"""
+        return self.get('nickname', 'Unknown')
+
+    def profile(self) -> ProfileInfo:
+        """プロフィール情報（ない場合は空のプロフィール情報）"""
+        return self.profile_info if isinstance(self.profile_info, ProfileInfo) else ProfileInfo()
+
+    def form(self) -> FormData:
+        """フォーム回答（ない場合は空のフォーム回答）"""
+        return self.form_data if isinstance(self.form_data, FormData) else FormData()
+
+
+def to_participant(data: Any) -> Participant:
+    """辞書またはレコードを参加者レコードに変換"""
+    return data if isinstance(data, Participant) else Participant.from_dict(data)
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Skill-Zero Analyzer - Participant Snapshot
+処理済み参加者データのバイナリスナップショット（mmapで読み込む）
+"""
+
+import json
+import mmap
+import os
+import struct
+import tempfile
+from typing import Dict, List, Any, Iterable, Iterator, Optional
+from models import MISSING, Participant, Record
+from utils import FileUtils
+
+
+class SnapshotFormatError(ValueError):
+    """スナップショットの形式が正しくない場合の例外"""
+
+
+# ファイルの構成（数値はすべてリトルエンディアン）
+#   マジック（8バイト）、メタデータ長（4バイト）、メタデータ（JSON）
+#   オフセット表（参加者数 × 項目数 × 8バイト、8バイト境界から開始）
+#   文字列ヒープ（すべての値のUTF-8を連結したもの）
+# オフセット表の1要素は (ヒープ内の位置, 長さ) で、長さの最上位ビットが立っている値は
+# 文字列以外（NaN・真偽値・リストなど）をJSONにしたもの。値がない項目の長さは MISSING_LENGTH。
+MAGIC = b'SZSNAP01'
+HEADER = struct.Struct('<8sI')
+CELL = struct.Struct('<II')
+JSON_FLAG = 0x80000000
+MISSING_LENGTH = 0xFFFFFFFF
+MAX_HEAP_SIZE = 0xFFFFFFFF
+
+# FIELDS にないキー（Record.extra）と、レコードでない form_data / profile_info をまとめて保存する列
+EXTRA_COLUMN = '__extra__'
+
+
+def snapshot_columns() -> List[str]:
+    """スナップショットの列名（profile_info.bio のように入れ子の項目は . で区切る）"""
+    columns = []
+    for field in Participant.FIELDS:
+        columns.append(field)
+        if field in Participant.NESTED:
+            columns.extend(f"{field}.{nested}" for nested in Participant.NESTED[field].FIELDS)
+    columns.append(EXTRA_COLUMN)
+    return columns
+
+
+def _flatten(participant: Participant) -> List[Any]:
+    """参加者レコードを列ごとの値に変換（入れ子のレコードがある列には空文字を入れる）"""
+    values = []
+    extra = {}
+    if participant.extra:
+        extra[''] = participant.extra
+
+    for field in Participant.FIELDS:
+        value = getattr(participant, field)
+        nested = Participant.NESTED.get(field)
+        if nested is None:
+            values.append(value)
+        elif isinstance(value, Record):
+            values.append('')
+            values.extend(getattr(value, name) for name in nested.FIELDS)
+            if value.extra:
+                extra[field] = value.extra
+        else:
+            values.append(MISSING)
+            values.extend(MISSING for _ in nested.FIELDS)
+            if value is not MISSING:
+                extra[field] = value
+
+    values.append(extra or MISSING)
+    return values
+
+
+class SnapshotWriter:
+    """スナップショットを1件ずつ書き込むクラス
+
+    値はヒープ用の一時ファイルに書き、オフセット表だけをメモリに持つ。
+    close() でヘッダー・オフセット表・ヒープを連結して置き換える。
+    """
+
+    def __init__(self, path: str, processed_at: str = '', generation: Optional[int] = None):
+        directory = os.path.dirname(path)
+        if directory:
+            FileUtils.ensure_directory(directory)
+
+        self.path = path
+        self.processed_at = processed_at
+        self.generation = generation  # 書き出し元の参加者ストアの世代番号（close() までに設定すればよい）
+        self.columns = snapshot_columns()
+        self.table = bytearray()
+        self.count = 0
+        self.heap_size = 0
+        self.heap = tempfile.TemporaryFile(dir=directory or None)
+
+    def __enter__(self) -> 'SnapshotWriter':
+        return self
+
+    def __exit__(self, exc_type, *exc_info) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+    def _append(self, value: Any) -> None:
+        """値をヒープに書き込み、オフセット表に位置を追加"""
+        if value is MISSING:
+            self.table += CELL.pack(0, MISSING_LENGTH)
+            return
+
+        if isinstance(value, str):
+            data = value.encode('utf-8')
+            flag = 0
+        else:
+            data = json.dumps(value, ensure_ascii=False).encode('utf-8')
+            flag = JSON_FLAG
+
+        if len(data) >= JSON_FLAG or self.heap_size + len(data) > MAX_HEAP_SIZE:
+            raise SnapshotFormatError(f"スナップショットの上限（4GiB）を超えました: {self.path}")
+        self.table += CELL.pack(self.heap_size, len(data) | flag)
+        self.heap.write(data)
+        self.heap_size += len(data)
+
+    def add(self, participant: Participant) -> None:
+        """参加者を追加"""
+        for value in _flatten(participant):
+            self._append(value)
+        self.count += 1
+
+    def add_all(self, participants: Iterable[Participant]) -> int:
+        """参加者をまとめて追加し、追加した件数を返す"""
+        before = self.count
+        for participant in participants:
+            self.add(participant)
+        return self.count - before
+
+    def discard(self) -> None:
+        """書き出さずに破棄（既存のスナップショットはそのまま残る）"""
+        self.heap.close()
+
+    def close(self) -> None:
+        """スナップショットを書き出し"""
+        metadata = json.dumps({
+            'processed_at': self.processed_at,
+            'generation': self.generation,
+            'count': self.count,
+            'columns': self.columns
+        }, ensure_ascii=False).encode('utf-8')
+        header = HEADER.pack(MAGIC, len(metadata)) + metadata
+        padding = -len(header) % 8
+
+        temp_file = f"{self.path}.tmp"
+        try:
+            with open(temp_file, 'wb') as f:
+                f.write(header)
+                f.write(b'\0' * padding)
+                f.write(self.table)
+                self.heap.seek(0)
+                while True:
+                    block = self.heap.read(1024 * 1024)
+                    if not block:
+                        break
+                    f.write(block)
+            os.replace(temp_file, self.path)
+        finally:
+            self.heap.close()
+
+
+def write_snapshot(path: str, participants: Iterable[Participant], processed_at: str = '',
+                   generation: Optional[int] = None) -> int:
+    """参加者をスナップショットに書き出し、書き出した件数を返す"""
+    with SnapshotWriter(path, processed_at, generation) as writer:
+        return writer.add_all(participants)
+
+
+class ParticipantSnapshot:
+    """スナップショットを読み込むクラス
+
+    ファイルをmmapし、開く時点ではヘッダーだけを読む。値は参照されたときに
+    オフセット表から位置を求めてその部分だけを変換するため、参加者数によらず
+    すぐに開け、任意の参加者の任意の項目を取り出せる。
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.file = open(path, 'rb')
+        try:
+            self.mm = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self.file.close()
+            raise SnapshotFormatError(f"スナップショットが空です: {path}")
+
+        try:
+            magic, metadata_length = HEADER.unpack_from(self.mm, 0)
+            if magic != MAGIC:
+                raise SnapshotFormatError(f"スナップショットの形式が正しくありません: {path}")
+            metadata = json.loads(self.mm[HEADER.size:HEADER.size + metadata_length])
+        except (struct.error, ValueError) as e:
+            self.close()
+            if isinstance(e, SnapshotFormatError):
+                raise
+            raise SnapshotFormatError(f"スナップショットのヘッダーを読み込めません: {path}: {e}")
+
+        self.columns = metadata.get('columns')
+        if self.columns != snapshot_columns():
+            self.close()
+            raise SnapshotFormatError(f"スナップショットの列構成が現在の形式と異なります: {path}")
+
+        self.processed_at = metadata.get('processed_at', '')
+        self.generation = metadata.get('generation')
+        self.column_positions = {name: position for position, name in enumerate(self.columns)}
+        self.total = metadata['count']
+        header_size = HEADER.size + metadata_length
+        self.table_offset = header_size + (-header_size % 8)
+        self.heap_offset = self.table_offset + self.total * len(self.columns) * CELL.size
+        self.nickname_index = None
+
+        if self.heap_offset > len(self.mm):
+            self.close()
+            raise SnapshotFormatError(f"スナップショットが途中で切れています: {path}")
+
+    def __enter__(self) -> 'ParticipantSnapshot':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.total
+
+    def count(self) -> int:
+        """参加者数を取得"""
+        return self.total
+
+    def get_processed_at(self) -> str:
+        """処理日時を取得"""
+        return self.processed_at
+
+    def get_generation(self) -> Optional[int]:
+        """書き出し元の参加者ストアの世代番号を取得（記録がない場合はNone）"""
+        return self.generation
+
+    def _cell(self, index: int, position: int) -> Any:
+        """オフセット表の1要素を読み込んで値に変換"""
+        offset, length = CELL.unpack_from(
+            self.mm, self.table_offset + (index * len(self.columns) + position) * CELL.size
+        )
+        if length == MISSING_LENGTH:
+            return MISSING
+
+        start = self.heap_offset + offset
+        if length & JSON_FLAG:
+            return json.loads(self.mm[start:start + (length & ~JSON_FLAG)])
+        return self.mm[start:start + length].decode('utf-8')
+
+    def value(self, index: int, column: str, default: Any = None) -> Any:
+        """参加者1件の1項目だけを取得（column は 'nickname' や 'profile_info.bio'）"""
+        if not 0 <= index < self.total:
+            raise IndexError(f"参加者の番号が範囲外です: {index}")
+        value = self._cell(index, self.column_positions[column])
+        return default if value is MISSING else value
+
+    def participant(self, index: int) -> Participant:
+        """参加者1件をレコードに変換"""
+        if not 0 <= index < self.total:
+            raise IndexError(f"参加者の番号が範囲外です: {index}")
+        cells = [self._cell(index, position) for position in range(len(self.columns))]
+        extra = cells[self.column_positions[EXTRA_COLUMN]] or {}
+        values = iter(cells)
+
+        participant = Participant.__new__(Participant)
+        for field in Participant.FIELDS:
+            value = next(values)
+            nested = Participant.NESTED.get(field)
+            if nested is not None:
+                nested_values = [next(values) for _ in nested.FIELDS]
+                if value is MISSING:
+                    value = extra.get(field, MISSING)
+                else:
+                    value = nested.__new__(nested)
+                    for name, nested_value in zip(nested.FIELDS, nested_values):
+                        setattr(value, name, nested_value)
+                    value.extra = extra.get(field) or None
+            setattr(participant, field, value)
+        participant.extra = extra.get('') or None
+        return participant
+
+    def iter_participants(self) -> Iterator[Participant]:
+        """全参加者を保存順に返す"""
+        for index in range(self.total):
+            yield self.participant(index)
+
+    def _nickname_positions(self) -> Dict[Any, List[int]]:
+        """ニックネームから参加者の番号を引く索引（初回の検索時に作成）"""
+        if self.nickname_index is None:
+            self.nickname_index = {}
+            for index in range(self.total):
+                nickname = self.value(index, 'nickname')
+                if isinstance(nickname, str):
+                    self.nickname_index.setdefault(nickname, []).append(index)
+        return self.nickname_index
+
+    def find_by_nickname(self, nickname: str) -> List[Participant]:
+        """ニックネームで参加者を検索"""
+        return [self.participant(index) for index in self._nickname_positions().get(nickname, [])]
+
+    def close(self) -> None:
+        """mmapとファイルを閉じる"""
+        if getattr(self, 'mm', None) is not None:
+            self.mm.close()
+            self.mm = None
+        self.file.close()
+
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Skill-Zero Analyzer - Participant Store
+処理済み参加者データを保持するSQLiteストア
+"""
+
+import json
+import os
+import sqlite3
+from typing import Dict, List, Any, Optional, Iterable, Iterator, Tuple
+from utils import FileUtils
+
+
+class ParticipantStore:
+    """処理済み参加者データの組み込みストアクラス
+
+    参加者データは1件ずつJSON文字列で保存し、ニックネーム・プロフィールURL・
+    タイムスタンプには索引を張る。読み込みは必要な分だけ逐次行う。
+    """
+
+    FETCH_SIZE = 500
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            FileUtils.ensure_directory(directory)
+
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute('PRAGMA journal_mode = WAL')
+        self.connection.executescript('''
+            CREATE TABLE IF NOT EXISTS participants (
+                id INTEGER PRIMARY KEY,
+                nickname TEXT,
+                profile_url TEXT,
+                timestamp TEXT,
+                data TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_participants_nickname ON participants (nickname);
+            CREATE INDEX IF NOT EXISTS idx_participants_profile_url ON participants (profile_url);
+            CREATE INDEX IF NOT EXISTS idx_participants_timestamp ON participants (timestamp);
+            CREATE TABLE IF NOT EXISTS metadata (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+        ''')
+        self.connection.commit()
+
+    def __enter__(self) -> 'ParticipantStore':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @staticmethod
+    def _indexed_value(value: Any) -> Optional[str]:
+        """索引列に保存する値（文字列以外・NaNはNULL）"""
+        return value if isinstance(value, str) else None
+
+    def _to_row(self, participant: Dict[str, Any]) -> Tuple[Optional[str], Optional[str], Optional[str], str]:
+        """参加者データを行データに変換"""
+        return (
+            self._indexed_value(participant.get('nickname')),
+            self._indexed_value(participant.get('profile_url')),
+            self._indexed_value(participant.get('timestamp')),
+            json.dumps(participant, ensure_ascii=False)
+        )
+
+    def replace_all(self, participants: Iterable[Dict[str, Any]], processed_at: str) -> int:
+        """全参加者データを置き換え（1トランザクションで書き込み）"""
+        with self.connection:
+            self.connection.execute('DELETE FROM participants')
+            before = self.connection.total_changes
+            self.connection.executemany(
+                'INSERT INTO participants (nickname, profile_url, timestamp, data) VALUES (?, ?, ?, ?)',
+                (self._to_row(participant) for participant in participants)
+            )
+            count = self.connection.total_changes - before
+            self.connection.execute(
+                'INSERT OR REPLACE INTO metadata (key, value) VALUES (?, ?)', ('processed_at', processed_at)
+            )
+            self._bump_generation()
+        return count
+
+    def save_entries(self, entries: Iterable[Tuple[Optional[int], Dict[str, Any]]], processed_at: str,
+                     metadata: Optional[Dict[str, str]] = None) -> List[int]:
+        """参加者データを追加・更新し、各参加者のidを返す（1トランザクションで書き込み）
+
+        entries は (id, 参加者データ) の並びで、id が None の参加者は追加、それ以外は置き換える。
+        metadata を指定した場合は同じトランザクションで保存する。
+        """
+        ids = []
+        with self.connection:
+            for participant_id, participant in entries:
+                row = self._to_row(participant)
+                if participant_id is None:
+                    cursor = self.connection.execute(
+                        'INSERT INTO participants (nickname, profile_url, timestamp, data) VALUES (?, ?, ?, ?)', row
+                    )
+                    participant_id = cursor.lastrowid
+                else:
+                    self.connection.execute(
+                        'UPDATE participants SET nickname = ?, profile_url = ?, timestamp = ?, data = ? WHERE id = ?',
+                        row + (participant_id,)
+                    )
+                ids.append(participant_id)
+
+            items = dict(metadata or {}, processed_at=processed_at)
+            self.connection.executemany('INSERT OR REPLACE INTO metadata (key, value) VALUES (?, ?)', items.items())
+            self._bump_generation()
+        return ids
+
+    def _bump_generation(self) -> None:
+        """世代番号を1つ進める（参加者データを書き込むトランザクション内で呼ぶ）"""
+        self.connection.execute(
+            "INSERT INTO metadata (key, value) VALUES ('generation', '1') "
+            "ON CONFLICT (key) DO UPDATE SET value = CAST(value AS INTEGER) + 1"
+        )
+
+    def get_metadata(self, key: str) -> Optional[str]:
+        """メタデータを取得"""
+        row = self.connection.execute('SELECT value FROM metadata WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_metadata(self, key: str, value: str) -> None:
+        """メタデータを保存"""
+        with self.connection:
+            self.connection.execute('INSERT OR REPLACE INTO metadata (key, value) VALUES (?, ?)', (key, value))
+
+    def get_processed_at(self) -> str:
+        """処理日時を取得"""
+        return self.get_metadata('processed_at') or ''
+
+    def get_generation(self) -> int:
+        """世代番号を取得（参加者データを書き込むたびに増える。処理日時と違い1秒以内の書き込みも区別できる）"""
+        return int(self.get_metadata('generation') or 0)
+
+    def count(self) -> int:
+        """参加者数を取得"""
+        return self.connection.execute('SELECT COUNT(*) FROM participants').fetchone()[0]
+
+    def _iter_query(self, query: str, parameters: Tuple[Any, ...] = ()) -> Iterator[Dict[str, Any]]:
+        """問い合わせ結果を少しずつ読み込んで返す"""
+        cursor = self.connection.execute(query, parameters)
+        while True:
+            rows = cursor.fetchmany(self.FETCH_SIZE)
+            if not rows:
+                break
+            for (data,) in rows:
+                yield json.loads(data)
+
+    def iter_participants(self) -> Iterator[Dict[str, Any]]:
+        """全参加者を保存順に返す"""
+        return self._iter_query('SELECT data FROM participants ORDER BY id')
+
+    def iter_entries(self) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """全参加者を (id, 参加者データ) で保存順に返す"""
+        cursor = self.connection.execute('SELECT id, data FROM participants ORDER BY id')
+        while True:
+            rows = cursor.fetchmany(self.FETCH_SIZE)
+            if not rows:
+                break
+            for participant_id, data in rows:
+                yield participant_id, json.loads(data)
+
+    def get(self, participant_id: int) -> Optional[Dict[str, Any]]:
+        """idで参加者を取得"""
+        row = self.connection.execute('SELECT data FROM participants WHERE id = ?', (participant_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def iter_since(self, timestamp: str) -> Iterator[Dict[str, Any]]:
+        """指定タイムスタンプ以降の参加者を返す"""
+        return self._iter_query('SELECT data FROM participants WHERE timestamp >= ? ORDER BY timestamp, id',
+                                (timestamp,))
+
+    def find_by_nickname(self, nickname: str) -> List[Dict[str, Any]]:
+        """ニックネームで参加者を検索"""
+        return list(self._iter_query('SELECT data FROM participants WHERE nickname = ? ORDER BY id', (nickname,)))
+
+    def find_by_profile_url(self, profile_url: str) -> List[Dict[str, Any]]:
+        """プロフィールURLで参加者を検索"""
+        return list(self._iter_query('SELECT data FROM participants WHERE profile_url = ? ORDER BY id',
+                                     (profile_url,)))
+
+    def export_json(self, filepath: str) -> int:
+        """processed_data.jsonと同じ形式で書き出し（参加者は1件ずつ書き込む）"""
+        directory = os.path.dirname(filepath)
+        if directory:
+            FileUtils.ensure_directory(directory)
+
+        total = self.count()
+        header = json.dumps({'processed_at': self.get_processed_at(), 'total_participants': total},
+                            ensure_ascii=False, indent=2)
+        temp_file = f"{filepath}.tmp"
+
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            f.write(header[:-2])
+            if total == 0:
+                f.write(',\n  "participants": []\n}')
+            else:
+                f.write(',\n  "participants": [\n')
+                for index, participant in enumerate(self.iter_participants()):
+                    if index:
+                        f.write(',\n')
+                    item = json.dumps(participant, ensure_ascii=False, indent=2)
+                    f.write('\n'.join('    ' + line for line in item.split('\n')))
+                f.write('\n  ]\n}')
+
+        os.replace(temp_file, filepath)
+        return total
+
+    def close(self) -> None:
+        """データベース接続を閉じる"""
+        self.connection.close()
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Skill-Zero Analyzer - Pipeline
+データ処理からHTMLレポート生成までを1つのプロセスで実行するスクリプト
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Any, Optional
+from config import config
+from utils import Logger, FileUtils
+from data_processor import DataProcessor
+from taxonomy import Taxonomy
+from ai_analyzer import AIAnalyzer
+from generate_analysis_results import build_reports, read_template
+from metrics import add_metrics_arguments, instrument
+
+
+class PipelineStage:
+    """パイプラインの1段階
+
+    fingerprint は段階の入力（ファイル内容や設定）を表す文字列を返す関数。
+    前回完了時と入力（依存する段階の入力を含む）が同じで、出力ファイルが残っていれば実行を省略する。
+    """
+
+    def __init__(self, name: str, run: Callable[[Dict[str, Any]], bool],
+                 fingerprint: Callable[[], str], depends_on: Optional[List[str]] = None,
+                 outputs: Optional[List[str]] = None):
+        self.name = name
+        self.run = run
+        self.fingerprint = fingerprint
+        self.depends_on = depends_on or []
+        self.outputs = outputs or []
+
+
+class Pipeline:
+    """段階を依存関係の順に実行し、段階ごとの完了状態を保存するクラス
+
+    段階間のデータは context（辞書）でメモリ上のまま受け渡す。
+    """
+
+    def __init__(self, checkpoint_path: str):
+        self.logger = Logger.setup_logger(__name__)
+        self.checkpoint_path = checkpoint_path
+        self.stages = {}
+        checkpoint = FileUtils.safe_read_json(checkpoint_path) if os.path.exists(checkpoint_path) else None
+        self.checkpoint = checkpoint.get('stages', {}) if checkpoint else {}
+
+    def add_stage(self, stage: PipelineStage) -> None:
+        """段階を追加（依存する段階は先に追加しておく）"""
+        for dependency in stage.depends_on:
+            if dependency not in self.stages:
+                raise ValueError(f"依存する段階が定義されていません: {stage.name} → {dependency}")
+        self.stages[stage.name] = stage
+
+    def _input_hash(self, stage: PipelineStage, hashes: Dict[str, str]) -> str:
+        """段階の入力ハッシュ値（依存する段階の入力ハッシュ値を含む）"""
+        source = json.dumps([stage.fingerprint()] + [hashes[name] for name in stage.depends_on], ensure_ascii=False)
+        return hashlib.sha256(source.encode('utf-8')).hexdigest()
+
+    def _is_up_to_date(self, stage: PipelineStage, input_hash: str) -> bool:
+        """前回の完了時から入力が変わっておらず、出力が残っているか"""
+        entry = self.checkpoint.get(stage.name)
+        if entry is None or entry.get('input_hash') != input_hash:
+            return False
+        return all(os.path.exists(path) for path in stage.outputs)
+
+    def _save_checkpoint(self) -> None:
+        """段階ごとの完了状態を保存"""
+        FileUtils.safe_write_json(self.checkpoint_path, {'stages': self.checkpoint})
+
+    def run(self, force: bool = False) -> Dict[str, Any]:
+        """全段階を依存関係の順に実行し、段階ごとの結果を返す"""
+        context = {}
+        hashes = {}
+        results = {}
+
+        # add_stage で依存する段階を先に追加しているため、追加順がそのまま実行順になる
+        for stage in self.stages.values():
+            failed_dependencies = [name for name in stage.depends_on if results[name] == 'failed']
+            if failed_dependencies:
+                results[stage.name] = 'failed'
+                self.logger.error(f"[{stage.name}] 依存する段階が失敗したため実行しません: {failed_dependencies}")
+                continue
+
+            input_hash = self._input_hash(stage, hashes)
+            hashes[stage.name] = input_hash
+            if not force and self._is_up_to_date(stage, input_hash):
+                results[stage.name] = 'skipped'
+                self.logger.info(f"[{stage.name}] 入力に変更がないため省略します")
+                continue
+
+            self.logger.info(f"[{stage.name}] 開始")
+            started = time.perf_counter()
+            try:
+                success = stage.run(context)
+            except Exception as e:
+                self.logger.error(f"[{stage.name}] エラー: {e}")
+                success = False
+            elapsed = time.perf_counter() - started
+
+            if not success:
+                results[stage.name] = 'failed'
+                self.logger.error(f"[{stage.name}] 失敗 ({elapsed:.2f}秒)")
+                continue
+
+            results[stage.name] = 'completed'
+            self.checkpoint[stage.name] = {
+                'input_hash': input_hash,
+                'completed_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+                'seconds': round(elapsed, 3)
+            }
+            self._save_checkpoint()
+            self.logger.info(f"[{stage.name}] 完了 ({elapsed:.2f}秒)")
+
+        return results
+
+
+def hash_file(path: str) -> str:
+    """ファイル内容のハッシュ値（存在しない場合は空文字）"""
+    if not os.path.exists(path):
+        return ''
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def build_pipeline(execute: bool = False, report_workers: Optional[int] = None) -> Pipeline:
+    """Skill-Zero Analyzer の各段階を定義したパイプラインを作成"""
+    pipeline = Pipeline(config.PIPELINE_CHECKPOINT_FILE)
+    output_dir = Path(config.OUTPUT_DIR)
+    template_path = output_dir / 'analysis_result_template.html'
+
+    def process(context: Dict[str, Any]) -> bool:
+        participants = DataProcessor().run()
+        if participants is None:
+            return False
+        context['participants'] = participants
+        return True
+
+    def process_fingerprint() -> str:
+        settings = [config.MERGE_KEY, config.EXTRACTION_RULES_VERSION, config.PROFILE_SECTIONS,
+                    config.PROFILE_SECTION_MARKERS, config.CSV_COLUMNS, Taxonomy.load().fingerprint]
+        return hash_file(config.CSV_FILE_PATH) + json.dumps(settings, ensure_ascii=False)
+
+    def analyzer(context: Dict[str, Any]) -> AIAnalyzer:
+        # 同じ実行の中ではプロンプトの保存状態を段階間で共有する
+        if 'analyzer' not in context:
+            context['analyzer'] = AIAnalyzer()
+        return context['analyzer']
+
+    def prompts(context: Dict[str, Any]) -> bool:
+        ai_analyzer = analyzer(context)
+        if 'participants' in context:
+            # データ処理の段階で作成した参加者データをそのまま使う
+            ai_analyzer.set_participants(context['participants'])
+        return ai_analyzer.run_analysis()
+
+    def prompts_fingerprint() -> str:
+        return hash_file(config.get_data_path('prompts.md')) + str(config.PROMPT_STORE_SPLIT_STATIC)
+
+    def run_llm(context: Dict[str, Any]) -> bool:
+        ai_analyzer = analyzer(context)
+        store = ai_analyzer.prompt_store
+        names = store.written + store.unchanged or list(store.manifest['participants'])
+        return ai_analyzer.run_llm_execution(names)
+
+    def llm_fingerprint() -> str:
+        return json.dumps([config.LLM_API_BASE, config.LLM_MODEL, config.LLM_TEMPERATURE, config.LLM_MAX_TOKENS])
+
+    def reports(context: Dict[str, Any]) -> bool:
+        result_files = sorted(output_dir.glob('*_analysis_result.txt'))
+        stats = build_reports(result_files, read_template(template_path),
+                              report_workers or config.REPORT_BUILD_WORKERS)
+        Logger.setup_logger(__name__).info(
+            f"HTMLレポート: 生成 {stats['built']}件 / スキップ {stats['skipped']}件 / 失敗 {stats['failed']}件"
+        )
+        return stats['failed'] == 0
+
+    def reports_fingerprint() -> str:
+        # 分析結果は件数が多くなりうるため、内容ではなく更新日時とサイズで判定する
+        files = []
+        for path in sorted(output_dir.glob('*_analysis_result.txt')):
+            stat = path.stat()
+            files.append((path.name, stat.st_mtime_ns, stat.st_size))
+        return hash_file(str(template_path)) + json.dumps(files, ensure_ascii=False)
+
+    pipeline.add_stage(PipelineStage('process', process, process_fingerprint,
+                                     outputs=[config.PARTICIPANT_STORE_FILE]))
+    pipeline.add_stage(PipelineStage('prompts', prompts, prompts_fingerprint, depends_on=['process'],
+                                     outputs=[os.path.join(config.PROMPT_STORE_DIR, 'manifest.json')]))
+    report_dependencies = ['prompts']
+    if execute:
+        pipeline.add_stage(PipelineStage('llm', run_llm, llm_fingerprint, depends_on=['prompts']))
+        report_dependencies = ['llm']
+    pipeline.add_stage(PipelineStage('reports', reports, reports_fingerprint, depends_on=report_dependencies))
+    return pipeline
+
+
+def main():
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description="Skill-Zero Analyzer - Pipeline")
+    parser.add_argument('--execute', action='store_true',
+                        help="プロンプト生成後にLLMへ送信する段階を含める")
+    parser.add_argument('--force', action='store_true',
+                        help="入力の変更の有無にかかわらず全段階を実行")
+    parser.add_argument('--report-workers', type=int,
+                        help="HTML生成のプロセス数")
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    with instrument('pipeline', args.metrics, args.profile):
+        results = build_pipeline(args.execute, args.report_workers).run(args.force)
+    elapsed = time.perf_counter() - started
+
+    summary = ' / '.join(f"{name}: {result}" for name, result in results.items())
+    print(f"パイプライン完了 ({elapsed:.2f}秒): {summary}")
+    if 'failed' in results.values():
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
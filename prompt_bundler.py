@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Skill-Zero Analyzer - Prompt Bundler
+複数参加者のプロフィールをトークン上限内で1つのプロンプトにまとめる
+"""
+
+import hashlib
+import math
+import os
+import re
+from typing import Dict, List, Any, Optional
+from config import config
+from utils import FileUtils
+
+
+class TokenEstimator:
+    """日本語を考慮したトークン数の概算クラス
+
+    ASCII文字は数文字で1トークン、それ以外（かな・漢字・全角記号など）は
+    1文字あたり一定のトークン数として概算する。文字種の判定は文字列全体に対する
+    組み込み処理だけで行い、1文字ずつのループは行わない。
+    """
+
+    def __init__(self, ascii_chars_per_token: Optional[float] = None,
+                 tokens_per_non_ascii_char: Optional[float] = None):
+        self.ascii_chars_per_token = ascii_chars_per_token or config.TOKEN_ESTIMATE_ASCII_CHARS_PER_TOKEN
+        self.tokens_per_non_ascii_char = tokens_per_non_ascii_char or config.TOKEN_ESTIMATE_NON_ASCII_TOKENS
+
+    def estimate(self, text: str) -> int:
+        """トークン数を概算"""
+        if not text:
+            return 0
+
+        if text.isascii():
+            ascii_count = len(text)
+        else:
+            ascii_count = len(text.encode('ascii', 'ignore'))
+        non_ascii_count = len(text) - ascii_count
+
+        return math.ceil(ascii_count / self.ascii_chars_per_token
+                         + non_ascii_count * self.tokens_per_non_ascii_char)
+
+
+class PromptBundler:
+    """複数参加者のプロンプトをトークン上限内でまとめるクラス
+
+    共通の前置きは各バンドルに1回だけ含め、残りのトークン数に収まるだけ参加者の
+    プロフィールブロックを詰める。各参加者には区切り行を出力するよう指示し、
+    マニフェストに記録した参加者IDで分析結果を参加者ごとに分割できるようにする。
+    """
+
+    RESULT_MARKER = "===== 分析結果 {participant_id} ====="
+    RESULT_MARKER_PATTERN = re.compile(r'^===== 分析結果 (P\d+) =====[ \t]*$', re.MULTILINE)
+
+    def __init__(self, preamble: str, token_budget: Optional[int] = None,
+                 max_participants: Optional[int] = None, estimator: Optional[TokenEstimator] = None):
+        self.preamble = preamble
+        self.token_budget = token_budget or config.BUNDLE_TOKEN_BUDGET
+        self.max_participants = max_participants or config.BUNDLE_MAX_PARTICIPANTS
+        self.estimator = estimator or TokenEstimator()
+        # 出力形式の説明は参加者数によらずほぼ一定のため、前置きと合わせて1回だけ見積もる
+        self.preamble_tokens = self.estimator.estimate(preamble) + self.estimator.estimate(
+            self._output_instructions(self.max_participants))
+
+        self.bundles = []
+        self.oversized = []  # 単独でも上限を超える参加者
+        self._current = []
+        self._current_tokens = 0
+
+    def _output_instructions(self, count: int) -> str:
+        """出力形式の指示文を作成"""
+        example = self.RESULT_MARKER.format(participant_id='P001')
+        return f"""
+## 出力形式
+以下の{count}人のプロフィールについて、1人ずつ分析結果を出力してください。
+各人の分析結果は、必ず次の形式の区切り行だけの行から始めてください（区切り行の参加者IDは各プロフィールの見出しと同じにしてください）:
+{example}
+"""
+
+    def add(self, name: str, block: str) -> None:
+        """参加者のプロフィールブロックを追加"""
+        tokens = self.estimator.estimate(block) + 16  # 見出し行の分
+        available = self.token_budget - self.preamble_tokens
+
+        if self._current and (self._current_tokens + tokens > available
+                              or len(self._current) >= self.max_participants):
+            self._close_bundle()
+
+        if tokens > available:
+            # 上限を超えるプロフィールも省略せず、単独のバンドルにする
+            self.oversized.append(name)
+
+        self._current.append((name, block, tokens))
+        self._current_tokens += tokens
+
+    def _close_bundle(self) -> None:
+        """作成中のバンドルを確定"""
+        if not self._current:
+            return
+
+        participants = []
+        blocks = []
+        for index, (name, block, _) in enumerate(self._current, 1):
+            participant_id = f"P{index:03d}"
+            participants.append({'id': participant_id, 'name': name})
+            blocks.append(f"### 参加者ID: {participant_id}\n{block}")
+
+        # 前置きの指示（「完了」の入力で分析開始）に合わせて末尾に「完了」を付ける
+        prompt = "\n\n".join([self.preamble, self._output_instructions(len(participants))] + blocks + ["完了"])
+        self.bundles.append({
+            'prompt': prompt,
+            'participants': participants,
+            'estimated_tokens': self.estimator.estimate(prompt)
+        })
+        self._current = []
+        self._current_tokens = 0
+
+    def finish(self) -> List[Dict[str, Any]]:
+        """全バンドルを確定して返す"""
+        self._close_bundle()
+        return self.bundles
+
+    @classmethod
+    def split_result(cls, result_text: str, participants: List[Dict[str, str]]) -> Dict[str, str]:
+        """バンドルの分析結果を参加者ごとに分割（参加者ID → 分析結果）
+
+        同じ名前の参加者が同じバンドルに含まれても上書きしないよう、名前ではなく
+        バンドル内の位置を表す参加者IDで分ける。
+        """
+        participant_ids = {participant['id'] for participant in participants}
+        matches = list(cls.RESULT_MARKER_PATTERN.finditer(result_text))
+
+        results = {}
+        for i, match in enumerate(matches):
+            participant_id = match.group(1)
+            if participant_id not in participant_ids:
+                continue
+            end = matches[i + 1].start() if i + 1 < len(matches) else len(result_text)
+            results[participant_id] = result_text[match.end():end].strip()
+        return results
+
+
+class BundleManager:
+    """バンドルファイルとマニフェストを管理するクラス"""
+
+    def __init__(self, bundle_dir: Optional[str] = None):
+        self.bundle_dir = bundle_dir or config.BUNDLE_DIR
+        self.manifest_path = os.path.join(self.bundle_dir, 'manifest.json')
+
+    @staticmethod
+    def hash_prompt(prompt: str) -> str:
+        """バンドルのプロンプトのハッシュ値を計算"""
+        return hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+
+    def save_bundles(self, bundles: List[Dict[str, Any]], token_budget: int) -> Dict[str, Any]:
+        """バンドルのプロンプトとマニフェストを保存
+
+        前回と同じ番号でもプロンプトが変わったバンドルの分析結果は、今回の参加者と
+        対応しないため削除する。プロンプトが変わらないバンドルの分析結果は残す。
+        """
+        FileUtils.ensure_directory(self.bundle_dir)
+
+        previous = (self.load_manifest() if os.path.exists(self.manifest_path) else None) or {}
+        previous_hashes = {entry['id']: entry.get('prompt_hash') for entry in previous.get('bundles', [])}
+
+        entries = []
+        for number, bundle in enumerate(bundles, 1):
+            bundle_id = f"bundle_{number:04d}"
+            prompt_file = os.path.join(self.bundle_dir, f"{bundle_id}_prompt.txt")
+            with open(prompt_file, 'w', encoding='utf-8') as f:
+                f.write(bundle['prompt'])
+
+            entries.append({
+                'id': bundle_id,
+                'prompt_file': prompt_file,
+                'prompt_hash': self.hash_prompt(bundle['prompt']),
+                'result_file': os.path.join(self.bundle_dir, f"{bundle_id}_result.txt"),
+                'estimated_tokens': bundle['estimated_tokens'],
+                'participants': bundle['participants']
+            })
+
+        # 前回の実行で作成した余分なバンドルのプロンプトと、対応しなくなった分析結果を削除
+        current_files = {os.path.basename(entry['prompt_file']) for entry in entries}
+        current_files.update(os.path.basename(entry['result_file']) for entry in entries
+                             if previous_hashes.get(entry['id']) == entry['prompt_hash'])
+        for filename in os.listdir(self.bundle_dir):
+            if (filename.startswith('bundle_') and filename.endswith(('_prompt.txt', '_result.txt'))
+                    and filename not in current_files):
+                os.remove(os.path.join(self.bundle_dir, filename))
+
+        manifest = {'token_budget': token_budget, 'bundles': entries}
+        FileUtils.safe_write_json(self.manifest_path, manifest)
+        return manifest
+
+    def load_manifest(self) -> Optional[Dict[str, Any]]:
+        """マニフェストを読み込み"""
+        return FileUtils.safe_read_json(self.manifest_path)
+
+    def split_results(self) -> Dict[str, int]:
+        """保存済みのバンドル分析結果を参加者ごとの *_analysis_result.txt に分割
+
+        同じ名前の参加者が複数いる場合、2人目以降は「名前_2」のように番号を付けて保存する。
+        """
+        stats = {'bundles': 0, 'participants': 0, 'missing': 0}
+        manifest = self.load_manifest()
+        if not manifest:
+            return stats
+
+        name_counts = {}
+        for entry in manifest.get('bundles', []):
+            # 結果ファイルの有無によらず、マニフェストの順で保存名を決める
+            filenames = {}
+            for participant in entry['participants']:
+                name = participant['name']
+                name_counts[name] = name_counts.get(name, 0) + 1
+                count = name_counts[name]
+                filenames[participant['id']] = name if count == 1 else f"{name}_{count}"
+
+            if not os.path.exists(entry['result_file']):
+                continue
+
+            with open(entry['result_file'], 'r', encoding='utf-8') as f:
+                result_text = f.read()
+
+            results = PromptBundler.split_result(result_text, entry['participants'])
+            for participant_id, text in results.items():
+                result_path = config.get_output_path(f"{filenames[participant_id]}_analysis_result.txt")
+                with open(result_path, 'w', encoding='utf-8') as f:
+                    f.write(text)
+
+            stats['bundles'] += 1
+            stats['participants'] += len(results)
+            stats['missing'] += len(entry['participants']) - len(results)
+
+        return stats
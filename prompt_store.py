@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Skill-Zero Analyzer - Prompt Store
+分析用プロンプトをハッシュ値で管理し、変更のあったものだけを書き込むストア
+"""
+
+import hashlib
+import os
+import time
+from typing import Dict, List, Any, Optional, Tuple
+from config import config
+from utils import FileUtils
+
+
+class PromptStore:
+    """内容アドレス方式のプロンプトストアクラス
+
+    プロンプトは「共通の前置き」「参加者ごとの本文」「共通の後書き」の3つの部品で構成する。
+    各部品は内容のハッシュ値をファイル名として objects/ に1回だけ保存し、
+    マニフェストに参加者ごとの部品のハッシュ値とプロンプト全体のハッシュ値を記録する。
+
+    split_static=False の場合は従来どおり参加者ごとに完全なプロンプトファイルを書き出し、
+    マニフェストのハッシュ値が変わらない参加者のファイルは書き直さない。
+    """
+
+    SEPARATOR = "\n\n"
+    MANIFEST_VERSION = 1
+
+    def __init__(self, store_dir: str, split_static: bool = False):
+        self.store_dir = store_dir
+        self.objects_dir = os.path.join(store_dir, 'objects')
+        self.manifest_path = os.path.join(store_dir, 'manifest.json')
+        self.split_static = split_static
+        self.manifest = self._load_manifest()
+        self.written = []    # 今回書き込んだ参加者
+        self.unchanged = []  # 内容が変わらず書き込みを省略した参加者
+        self._static_hashes = {}  # 共通部品の文字列 → ハッシュ値
+
+    def _load_manifest(self) -> Dict[str, Any]:
+        """マニフェストを読み込み（存在しない・形式が異なる場合は空）"""
+        manifest = None
+        if os.path.exists(self.manifest_path):
+            manifest = FileUtils.safe_read_json(self.manifest_path)
+        if not manifest or manifest.get('version') != self.MANIFEST_VERSION:
+            manifest = {'version': self.MANIFEST_VERSION, 'participants': {}}
+        return manifest
+
+    @staticmethod
+    def hash_text(text: str) -> str:
+        """テキストのハッシュ値を計算"""
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def _object_path(self, object_hash: str) -> str:
+        """部品ファイルのパスを取得"""
+        return os.path.join(self.objects_dir, f"{object_hash}.txt")
+
+    def _put_object(self, text: str, object_hash: str) -> None:
+        """部品を保存（同じ内容が保存済みなら何もしない）"""
+        path = self._object_path(object_hash)
+        if os.path.exists(path):
+            return
+
+        FileUtils.ensure_directory(self.objects_dir)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(temp_path, path)
+
+    def _static_hash(self, text: str) -> str:
+        """共通部品のハッシュ値（同じ文字列は1回だけ計算）"""
+        object_hash = self._static_hashes.get(text)
+        if object_hash is None:
+            object_hash = self.hash_text(text)
+            self._static_hashes[text] = object_hash
+        return object_hash
+
+    def save(self, name: str, prefix: str, body: str, suffix: str) -> Tuple[str, bool]:
+        """プロンプトを保存し、(保存先, 書き込んだか) を返す"""
+        key = str(name)
+        part_hashes = [self._static_hash(prefix), self.hash_text(body), self._static_hash(suffix)]
+        prompt_hash = self.hash_text('\n'.join(part_hashes))
+
+        previous = self.manifest['participants'].get(key)
+        if self.split_static:
+            for text, object_hash in zip((prefix, body, suffix), part_hashes):
+                self._put_object(text, object_hash)
+            filepath = self._object_path(part_hashes[1])
+            changed = previous is None or previous.get('prompt_hash') != prompt_hash
+        else:
+            filepath = config.get_output_path(f"{name}_analysis_prompt.txt")
+            changed = (previous is None or previous.get('prompt_hash') != prompt_hash
+                       or not os.path.exists(filepath))
+            if changed:
+                FileUtils.ensure_directory(os.path.dirname(filepath) or '.')
+                with open(filepath, 'w', encoding='utf-8') as f:
+                    f.write(self.SEPARATOR.join((prefix, body, suffix)))
+
+        if previous is not None and previous.get('file') != filepath:
+            # 保存形式を変えた場合は、以前の形式で書き出した完全なプロンプトファイルを削除
+            self._remove_prompt_file(previous.get('file', ''))
+
+        if changed or previous.get('file') != filepath:
+            # 保存形式だけが変わった場合は更新日時を引き継ぐ
+            self.manifest['participants'][key] = {
+                'prompt_hash': prompt_hash,
+                'parts': part_hashes,
+                'file': filepath,
+                'updated_at': time.strftime('%Y-%m-%d %H:%M:%S') if changed else previous.get('updated_at', '')
+            }
+
+        if changed:
+            self.written.append(key)
+        else:
+            self.unchanged.append(key)
+
+        return filepath, changed
+
+    def get_prompt_hash(self, name: str) -> Optional[str]:
+        """参加者のプロンプトのハッシュ値を取得"""
+        entry = self.manifest['participants'].get(str(name))
+        return entry['prompt_hash'] if entry else None
+
+    def load(self, name: str) -> Optional[str]:
+        """部品を組み立てて参加者の完全なプロンプトを取得"""
+        entry = self.manifest['participants'].get(str(name))
+        if entry is None:
+            return None
+
+        parts = []
+        for object_hash in entry['parts']:
+            path = self._object_path(object_hash)
+            if not os.path.exists(path):
+                # 部品に分割せずに保存した参加者は完全なファイルを読む
+                with open(entry['file'], 'r', encoding='utf-8') as f:
+                    return f.read()
+            with open(path, 'r', encoding='utf-8') as f:
+                parts.append(f.read())
+        return self.SEPARATOR.join(parts)
+
+    def save_manifest(self) -> bool:
+        """マニフェストを保存"""
+        return FileUtils.safe_write_json(self.manifest_path, self.manifest)
+
+    def remove_stale_entries(self) -> int:
+        """今回保存しなかった参加者（退会・除外など）をマニフェストとプロンプトファイルから削除"""
+        current = set(self.written) | set(self.unchanged)
+        stale = [key for key in self.manifest['participants'] if key not in current]
+        for key in stale:
+            entry = self.manifest['participants'].pop(key)
+            self._remove_prompt_file(entry.get('file', ''))
+        return len(stale)
+
+    def _remove_prompt_file(self, filepath: str) -> None:
+        """完全なプロンプトファイルを削除（部品ファイルは remove_unreferenced_objects で削除する）"""
+        if filepath and os.path.dirname(filepath) != self.objects_dir and os.path.exists(filepath):
+            os.remove(filepath)
+
+    def remove_unreferenced_objects(self) -> int:
+        """どの参加者からも参照されていない部品ファイルを削除"""
+        if not os.path.isdir(self.objects_dir):
+            return 0
+
+        referenced = {object_hash for entry in self.manifest['participants'].values()
+                      for object_hash in entry['parts']}
+        removed = 0
+        for filename in os.listdir(self.objects_dir):
+            object_hash, extension = os.path.splitext(filename)
+            if extension == '.txt' and object_hash not in referenced:
+                os.remove(os.path.join(self.objects_dir, filename))
+                removed += 1
+        return removed
+
+    def changed_participants(self) -> List[str]:
+        """今回プロンプトが変わった参加者の一覧"""
+        return list(self.written)
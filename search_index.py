@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Skill-Zero Analyzer - Search Index
+プロフィール情報とフォーム回答を文字 n-gram で検索する転置インデックス
+"""
+
+import argparse
+import bisect
+import math
+import re
+import unicodedata
+from array import array
+from collections import defaultdict, deque
+from functools import partial
+from itertools import repeat
+from typing import Dict, List, Any, Hashable, Iterable, Iterator, Optional, Set, Tuple
+from config import config
+from utils import Logger
+from models import Participant, Record
+
+
+# 検索対象の項目（入れ子の項目は . で区切る）
+SEARCH_FIELDS = (
+    'nickname',
+    'profile_info.bio', 'profile_info.location', 'profile_info.job', 'profile_info.family',
+    'profile_info.libecity_meeting', 'profile_info.challenges', 'profile_info.hobbies', 'profile_info.likes',
+    'profile_info.skills', 'profile_info.work_history', 'profile_info.strengths', 'profile_info.likes_list',
+    'profile_info.categories',
+    'form_data.experience', 'form_data.strengths', 'form_data.appreciation', 'form_data.not_bad_at',
+    'form_data.weaknesses'
+)
+
+# 参加者ごとの文字列で項目を区切る文字（検索語には含まれない）
+FIELD_SEPARATOR = '\x00'
+
+# 検索語の区切り（二重引用符で囲んだ部分は空白を含む1つの語）
+QUERY_TOKEN_PATTERN = re.compile(r'"([^"]*)"|(\S+)')
+
+# BM25 のパラメータ
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def normalize(text: str) -> str:
+    """検索用に正規化（全角英数・半角カナの統一と小文字化）"""
+    return unicodedata.normalize('NFKC', text).lower().replace(FIELD_SEPARATOR, '')
+
+
+def ngrams(text: str) -> Set[str]:
+    """文字の2-gramと3-gramの集合（1文字の文字列はその文字だけ）"""
+    if len(text) == 1:
+        return {text}
+    grams = {text[i:i + 2] for i in range(len(text) - 1)}
+    grams.update(text[i:i + 3] for i in range(len(text) - 2))
+    return grams
+
+
+def field_text(participant: Participant, field: str) -> Optional[str]:
+    """参加者の項目の値を検索用の文字列で取得（値がない場合はNone）"""
+    value = participant
+    for name in field.split('.'):
+        value = value.get(name) if isinstance(value, Record) else None
+    if isinstance(value, list):
+        value = '\n'.join(str(item) for item in value if isinstance(item, str))
+    if not isinstance(value, str) or not value:
+        return None
+    return normalize(value)
+
+
+def parse_query(query: str) -> List[List[str]]:
+    """検索式を OR で区切った AND 条件の並びに変換
+
+    空白区切りの語はすべてを含む（AND）、OR または | で区切った条件はいずれかを含む。
+    "..." で囲んだ語は空白を含めてそのまま探す。
+    例: 'Python 経理 OR "データ 分析"' → [['python', '経理'], ['データ 分析']]
+    """
+    groups = [[]]
+    for match in QUERY_TOKEN_PATTERN.finditer(query):
+        quoted, word = match.groups()
+        if quoted is None and word in ('OR', '|'):
+            if groups[-1]:
+                groups.append([])
+            continue
+        term = normalize(quoted if quoted is not None else word).strip()
+        if term and term not in groups[-1]:
+            groups[-1].append(term)
+    return [group for group in groups if group]
+
+
+class ParticipantIndex:
+    """参加者の転置インデックス
+
+    検索対象の項目を2-gram・3-gramに分割し、n-gram → 参加者番号の配列を持つ。
+    検索語のn-gramを含む参加者に絞り込んだうえで、項目を区切り文字でつないだ
+    参加者ごとの文字列に検索語が含まれるかを確認するため、検索結果に誤りは含まれない。
+    参加者は呼び出し側が決めるキー（add_all では読み込み順の位置）で区別し、名前は表示にだけ使う。
+    同じキーの参加者を追加すると置き換わる（古い番号は削除済みとして扱い、
+    削除済みが有効な件数を超えたら作り直す）。
+    """
+
+    def __init__(self):
+        # n-gram → 参加者番号の配列（昇順、検索時は get で参照して空の配列を作らない）
+        self.postings = defaultdict(partial(array, 'I'))
+        self.keys = []  # 参加者番号 → キー（削除済みはNone）
+        self.names = []  # 参加者番号 → 表示名
+        self.texts = []  # 参加者番号 → 項目をつないだ文字列（削除済みはNone）
+        self.field_ends = array('I')  # 参加者番号 × 項目数 → 文字列内での各項目の終了位置
+        self.doc_ids = {}  # キー → 参加者番号
+        self.total_length = 0
+        self.deleted = 0
+        self.weights = tuple(config.SEARCH_FIELD_WEIGHTS.get(field, 1.0) for field in SEARCH_FIELDS)
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+    def add(self, key: Hashable, participant: Participant) -> None:
+        """参加者を追加（同じキーの参加者がいる場合は置き換え）"""
+        if key in self.doc_ids:
+            self.remove(key)
+
+        self._add_texts(key, str(participant.name), [field_text(participant, field) or '' for field in SEARCH_FIELDS])
+
+    def _add_texts(self, key: Hashable, name: str, texts: List[str]) -> None:
+        """正規化済みの項目の文字列から参加者を追加"""
+        doc_id = len(self.names)
+        grams = set()
+        for text in texts:
+            grams.update(ngrams(text))
+        # 参加者番号を各n-gramの配列に追加する（件数が多いためループをC実装の map で回す）
+        deque(map(array.append, map(self.postings.__getitem__, grams), repeat(doc_id)), maxlen=0)
+
+        position = -len(FIELD_SEPARATOR)
+        for text in texts:
+            position += len(FIELD_SEPARATOR) + len(text)
+            self.field_ends.append(position)
+        text = FIELD_SEPARATOR.join(texts)
+        self.keys.append(key)
+        self.names.append(name)
+        self.texts.append(text)
+        self.doc_ids[key] = doc_id
+        self.total_length += len(text)
+
+    def add_all(self, participants: Iterable[Participant]) -> int:
+        """参加者をまとめて追加し、追加した件数を返す（キーは読み込み順の位置）"""
+        count = 0
+        for participant in participants:
+            self.add(count, participant)
+            count += 1
+        return count
+
+    def remove(self, key: Hashable) -> bool:
+        """参加者を削除（いない場合はFalse）"""
+        doc_id = self.doc_ids.pop(key, None)
+        if doc_id is None:
+            return False
+
+        self.total_length -= len(self.texts[doc_id])
+        self.keys[doc_id] = None
+        self.names[doc_id] = None
+        self.texts[doc_id] = None
+        self.deleted += 1
+        if self.deleted > len(self.doc_ids):
+            self._compact()
+        return True
+
+    def _compact(self) -> None:
+        """削除済みの参加者を除いて作り直す"""
+        # 辞書の順は参加者番号の順（置き換えた参加者は削除して末尾に追加し直すため）
+        live = [(key, self.names[doc_id], self.texts[doc_id]) for key, doc_id in self.doc_ids.items()]
+        self.__init__()
+        for key, name, text in live:
+            self._add_texts(key, name, text.split(FIELD_SEPARATOR))
+
+    def _candidates(self, term: str) -> Tuple[Set[int], int]:
+        """検索語のn-gramをすべて含む参加者番号と、検索語の文書頻度の推定値を返す
+
+        候補がn-gramの配列より十分少なくなった時点で絞り込みをやめる（残りは文字列の確認で除外される）。
+        1文字の検索語はその文字を含む2-gram（と1文字だけの項目）の配列を合わせたものを候補とする。
+        """
+        if len(term) == 1:
+            candidates = set(self.postings.get(term, ()))
+            for gram, posting in self.postings.items():
+                if len(gram) == 2 and term in gram:
+                    candidates.update(posting)
+            return candidates, len(candidates) * len(self.doc_ids) // len(self.names)
+
+        n = 3 if len(term) >= 3 else 2
+        postings = []
+        for gram in {term[i:i + n] for i in range(len(term) - n + 1)}:
+            posting = self.postings.get(gram)
+            if posting is None:
+                return set(), 0
+            postings.append(posting)
+        postings.sort(key=len)
+
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            if not candidates or len(candidates) * 8 < len(posting):
+                break
+            candidates.intersection_update(posting)
+        # 配列には削除済みの参加者も含まれるため、有効な参加者の割合を掛ける
+        return candidates, len(postings[0]) * len(self.doc_ids) // len(self.names)
+
+    def _occurrences(self, doc_id: int, term: str) -> Iterator[int]:
+        """参加者の文字列に検索語が現れるたびに、その項目の位置を返す"""
+        text = self.texts[doc_id]
+        low = doc_id * len(SEARCH_FIELDS)
+        high = low + len(SEARCH_FIELDS)
+        position = text.find(term)
+        while position >= 0:
+            yield bisect.bisect_left(self.field_ends, position + len(term), low, high) - low
+            position = text.find(term, position + 1)
+
+    def _idf(self, document_frequency: int) -> float:
+        """逆文書頻度（BM25）"""
+        total = len(self.doc_ids)
+        return math.log(1 + (total - document_frequency + 0.5) / (document_frequency + 0.5))
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """検索式に一致する参加者をスコアの高い順に返す（limit=0 の場合はすべて）
+
+        スコアは検索語ごとのBM25（項目の重みを掛けた出現回数と、全項目の文字数で正規化）の合計。
+        """
+        limit = config.SEARCH_RESULT_LIMIT if limit is None else limit
+        groups = parse_query(query)
+        if not groups or not self.doc_ids:
+            return []
+
+        average_length = self.total_length / len(self.doc_ids) or 1.0
+        width = len(SEARCH_FIELDS)
+        field_ends = self.field_ends
+        # 重みが1.0でない項目（全体の出現回数に、項目内の出現回数 × (重み - 1) を足す）
+        boosts = [(field, weight - 1.0) for field, weight in enumerate(self.weights) if weight != 1.0]
+        scores = {}
+        for group in groups:
+            # 候補の少ない語から絞り込み、残りの語は候補の文字列だけで確認する
+            estimates = sorted(((self._candidates(term), term) for term in group), key=lambda item: len(item[0][0]))
+            candidates = estimates[0][0][0]
+            terms = [(term, self._idf(document_frequency)) for (_, document_frequency), term in estimates]
+
+            for doc_id in candidates:
+                text = self.texts[doc_id]
+                if text is None:
+                    continue
+                base = doc_id * width
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * len(text) / average_length)
+                score = 0.0
+                for term, idf in terms:
+                    # 出現回数が0なら検索語を含まない（n-gramをすべて含んでいても検索語が続いているとは限らない）
+                    frequency = text.count(term)
+                    if not frequency:
+                        break
+                    for field, boost in boosts:
+                        start = field_ends[base + field - 1] + 1 if field else 0
+                        frequency += boost * text.count(term, start, field_ends[base + field])
+                    score += idf * frequency * (BM25_K1 + 1) / (frequency + norm)
+                else:
+                    scores[doc_id] = scores.get(doc_id, 0.0) + score
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        if limit:
+            ranked = ranked[:limit]
+
+        # 一致した項目は返す参加者についてだけ調べる
+        terms = {term for group in groups for term in group}
+        results = []
+        for doc_id, score in ranked:
+            fields = set()
+            for term in terms:
+                fields.update(self._occurrences(doc_id, term))
+            results.append({
+                'key': self.keys[doc_id],
+                'name': self.names[doc_id],
+                'score': round(score, 4),
+                'fields': [SEARCH_FIELDS[field] for field in sorted(fields)]
+            })
+        return results
+
+    def stats(self) -> Dict[str, int]:
+        """インデックスの統計"""
+        return {
+            'participants': len(self.doc_ids),
+            'deleted': self.deleted,
+            'ngrams': len(self.postings),
+            'postings': sum(len(posting) for posting in self.postings.values()),
+            'characters': self.total_length
+        }
+
+
+def main():
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description="Skill-Zero Analyzer - 参加者検索")
+    parser.add_argument('query', help='検索式（空白区切りはAND、OR で区切るといずれか、"..." は空白を含む語）')
+    parser.add_argument('--limit', type=int, default=config.SEARCH_RESULT_LIMIT, help="表示する件数")
+    args = parser.parse_args()
+
+    # 読み込みのログと検索結果が混ざらないよう、AI分析モジュールは必要になってから読み込む
+    from ai_analyzer import AIAnalyzer
+    analyzer = AIAnalyzer()
+    try:
+        if not analyzer.load_data():
+            raise SystemExit(1)
+        index = ParticipantIndex()
+        index.add_all(analyzer.iter_participants())
+    finally:
+        analyzer.close()
+
+    results = index.search(args.query, args.limit)
+    Logger.setup_logger(__name__).info(f"検索結果: {len(results)}件 / 参加者 {len(index)}人")
+    for result in results:
+        print(f"{result['score']:>8.3f}  {result['name']}  ({', '.join(result['fields'])})")
+
+
+if __name__ == "__main__":
+    main()
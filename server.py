@@ -0,0 +1,463 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Skill-Zero Analyzer - Server
+参加者1人分のプロンプトとHTMLレポートを要求に応じて返すローカルHTTPサーバー
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+from config import config
+from utils import Logger
+from ai_analyzer import AIAnalyzer
+from generate_analysis_results import compile_template, generate_html_result, parse_analysis_result, read_template
+from metrics import MetricsRegistry
+from search_index import ParticipantIndex
+
+
+def file_fingerprint(paths: List[str]) -> Tuple[Any, ...]:
+    """ファイルの更新日時とサイズの組（存在しないファイルはNone）"""
+    fingerprint = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            fingerprint.append((stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            fingerprint.append(None)
+    return tuple(fingerprint)
+
+
+class RenderCache:
+    """生成済みの出力を保持するLRUキャッシュ
+
+    出力ごとに元ファイルの状態（file_fingerprint）を持ち、取得時に元ファイルの
+    状態が変わっていれば無効とする。件数とバイト数の上限を超えた場合は
+    最も長く使われていない出力から削除する。出力の生成は別スレッドで行うため、操作はロックで保護する。
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, max_bytes: Optional[int] = None):
+        self.max_entries = max_entries or config.SERVER_CACHE_SIZE
+        self.max_bytes = max_bytes or config.SERVER_CACHE_MAX_BYTES
+        self.entries = OrderedDict()  # キー → (元ファイルの状態, 出力)
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def get(self, key: Tuple[str, str], fingerprint: Tuple[Any, ...]) -> Optional[bytes]:
+        """出力を取得（ない場合・元ファイルが変わった場合はNone）"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] != fingerprint:
+                self._remove(key)
+                self.invalidations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Tuple[str, str], fingerprint: Tuple[Any, ...], body: bytes) -> None:
+        """出力を保存（上限を超える大きさの出力は保存しない）"""
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+            if len(body) > self.max_bytes:
+                return
+
+            self.entries[key] = (fingerprint, body)
+            self.size += len(body)
+            while len(self.entries) > self.max_entries or self.size > self.max_bytes:
+                self._remove(next(iter(self.entries)))
+                self.evictions += 1
+
+    def _remove(self, key: Tuple[str, str]) -> None:
+        """出力を削除"""
+        _, body = self.entries.pop(key)
+        self.size -= len(body)
+
+    def stats(self) -> Dict[str, int]:
+        """キャッシュの統計"""
+        with self.lock:
+            return {
+                'entries': len(self.entries),
+                'bytes': self.size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations,
+                'evictions': self.evictions
+            }
+
+
+class ParticipantSource:
+    """処理済み参加者データの読み込み元（データファイルが更新されたら開き直す）
+
+    プロンプトの作成は専用の1スレッド（executor）で行う。参加者ストアの接続は作成したスレッドでしか
+    使えないため、読み込み元を開く・閉じる処理もこのスレッドで行う。検索インデックスは独自に
+    読み込み元を開いて別スレッドで作成し、作成後にロックを取って入れ替える。
+    """
+
+    def __init__(self):
+        self.logger = Logger.setup_logger(__name__)
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='participants')
+        self.analyzer = None
+        self.fingerprint = None
+        self.index = None
+        self.index_fingerprint = None
+        self.index_lock = threading.Lock()
+
+    @staticmethod
+    def source_files() -> List[str]:
+        """プロンプトの内容に影響するファイル"""
+        store_file = config.PARTICIPANT_STORE_FILE
+        # WALモードでは書き込みが -wal ファイルに入るため、本体と合わせて確認する
+        return [config.PARTICIPANT_SNAPSHOT_FILE, store_file, f"{store_file}-wal", config.PROCESSED_DATA_FILE,
+                config.get_data_path('prompts.md')]
+
+    def current_fingerprint(self) -> Tuple[Any, ...]:
+        """読み込み元のファイルの状態"""
+        return file_fingerprint(self.source_files())
+
+    @staticmethod
+    def _load() -> AIAnalyzer:
+        """処理済みデータを読み込んだ AIAnalyzer を作成"""
+        analyzer = AIAnalyzer()
+        if not analyzer.load_data():
+            raise RuntimeError("処理済みデータを読み込めません")
+        return analyzer
+
+    def _open(self, fingerprint: Tuple[Any, ...]) -> AIAnalyzer:
+        """データファイルが前回から変わっていれば開き直す（executor のスレッドで呼ぶ）"""
+        if self.analyzer is not None and fingerprint == self.fingerprint:
+            return self.analyzer
+
+        self._close_analyzer()
+        analyzer = self._load()
+        self.analyzer = analyzer
+        self.fingerprint = fingerprint
+        self.logger.info(f"処理済みデータを読み込みました: {analyzer.count_participants()}件")
+        return analyzer
+
+    def render_prompt(self, name: str, fingerprint: Tuple[Any, ...]) -> Optional[str]:
+        """参加者の分析用プロンプトを作成（参加者が見つからない場合はNone、executor のスレッドで呼ぶ）"""
+        analyzer = self._open(fingerprint)
+        participant = next(analyzer.iter_participants([name]), None)
+        if participant is None:
+            return None
+        return analyzer.prompt_generator.create_analysis_prompt(name, participant.profile(), participant.form())
+
+    def _index(self, fingerprint: Tuple[Any, ...]) -> ParticipantIndex:
+        """検索インデックスを取得（最初の検索時と、データファイルの更新後に作成し直す）
+
+        作成中に届いた検索はロックで待ち、同じインデックスを使う。
+        """
+        with self.index_lock:
+            if self.index is not None and fingerprint == self.index_fingerprint:
+                return self.index
+
+            analyzer = self._load()
+            try:
+                index = ParticipantIndex()
+                index.add_all(analyzer.iter_participants())
+            finally:
+                analyzer.close()
+            self.index = index
+            self.index_fingerprint = fingerprint
+            self.logger.info(f"検索インデックスを作成しました: {index.stats()}")
+            return index
+
+    def search(self, query: str, limit: int, fingerprint: Tuple[Any, ...]) -> List[Dict[str, Any]]:
+        """参加者を検索（作成済みのインデックスは読み取りだけのため、複数のスレッドから同時に検索できる）"""
+        return self._index(fingerprint).search(query, limit)
+
+    def _close_analyzer(self) -> None:
+        """プロンプト作成用の読み込み元を閉じる"""
+        if self.analyzer is not None:
+            self.analyzer.close()
+            self.analyzer = None
+            self.fingerprint = None
+
+    def close(self) -> None:
+        """読み込み元を閉じ、スレッドを終了"""
+        self.executor.submit(self._close_analyzer).result()
+        self.executor.shutdown()
+        with self.index_lock:
+            self.index = None
+            self.index_fingerprint = None
+
+
+class ReportServer:
+    """プロンプトとHTMLレポートを返すHTTPサーバー（asyncio）
+
+    GET /prompts/{名前}  分析用プロンプト（text/plain）
+    GET /reports/{名前}  HTMLレポート（{名前}_analysis_result.txt から生成）
+    GET /search?q=...    参加者の検索結果（JSON、limit で件数を指定）
+    GET /stats           エンドポイントごとの処理時間とキャッシュの統計（JSON）
+    GET /metrics         処理時間の統計（Prometheusのテキスト形式）
+    GET /healthz         死活確認
+
+    プロンプト・レポートの生成と検索（インデックスの作成を含む）はスレッドで実行し、
+    その間もイベントループは他の接続の要求を受け付ける。
+    """
+
+    STATUS_TEXT = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+                   500: 'Internal Server Error'}
+    MAX_HEADERS = 100
+
+    def __init__(self, host: Optional[str] = None, port: Optional[int] = None):
+        self.logger = Logger.setup_logger(__name__)
+        self.host = host or config.SERVER_HOST
+        self.port = config.SERVER_PORT if port is None else port
+        self.cache = RenderCache()
+        self.participants = ParticipantSource()
+        self.metrics = MetricsRegistry()
+        self.latencies = {}  # エンドポイント → 直近の処理時間（秒）
+        self.template = None
+        self.template_fingerprint = None
+        self.template_lock = threading.Lock()
+        self.server = None
+
+    @staticmethod
+    def _valid_name(name: str) -> bool:
+        """ファイル名の一部として使える参加者名か（パスの区切りや親ディレクトリを含まない）"""
+        return bool(name) and '/' not in name and '\\' not in name and not name.startswith('.') and '\0' not in name
+
+    def _template(self) -> Any:
+        """解析済みのHTMLテンプレート（テンプレートが更新されたら読み込み直す）"""
+        template_path = config.get_output_path('analysis_result_template.html')
+        fingerprint = file_fingerprint([template_path])
+        with self.template_lock:
+            if self.template is None or fingerprint != self.template_fingerprint:
+                self.template = compile_template(read_template(template_path))
+                self.template_fingerprint = fingerprint
+            return self.template
+
+    def render_prompt(self, name: str) -> Tuple[int, str, bytes]:
+        """分析用プロンプトを返す"""
+        fingerprint = self.participants.current_fingerprint()
+        body = self.cache.get(('prompt', name), fingerprint)
+        if body is None:
+            prompt = self.participants.render_prompt(name, fingerprint)
+            if prompt is None:
+                return 404, 'text/plain', f"参加者が見つかりません: {name}\n".encode('utf-8')
+            body = prompt.encode('utf-8')
+            self.cache.put(('prompt', name), fingerprint, body)
+        return 200, 'text/plain', body
+
+    def render_report(self, name: str) -> Tuple[int, str, bytes]:
+        """HTMLレポートを返す"""
+        result_file = config.get_output_path(f"{name}_analysis_result.txt")
+        template_path = config.get_output_path('analysis_result_template.html')
+        fingerprint = file_fingerprint([result_file, template_path])
+        if fingerprint[0] is None:
+            return 404, 'text/plain', f"分析結果が見つかりません: {name}\n".encode('utf-8')
+
+        body = self.cache.get(('report', name), fingerprint)
+        if body is None:
+            report_name, sections = parse_analysis_result(result_file)
+            body = generate_html_result(report_name, sections, self._template()).encode('utf-8')
+            self.cache.put(('report', name), fingerprint, body)
+        return 200, 'text/html', body
+
+    def search(self, query: str) -> Tuple[int, str, bytes]:
+        """参加者の検索結果を返す"""
+        parameters = parse_qs(query)
+        terms = parameters.get('q', [''])[0]
+        try:
+            limit = int(parameters.get('limit', [config.SEARCH_RESULT_LIMIT])[0])
+        except ValueError:
+            limit = -1
+        if not terms.strip() or limit < 0:
+            return 400, 'text/plain', "検索式（q）または件数（limit）が正しくありません\n".encode('utf-8')
+
+        results = self.participants.search(terms, limit, self.participants.current_fingerprint())
+        body = {'query': terms, 'count': len(results), 'results': results}
+        return 200, 'application/json', json.dumps(body, ensure_ascii=False, indent=2).encode('utf-8')
+
+    def stats(self) -> Dict[str, Any]:
+        """エンドポイントごとの処理時間とキャッシュの統計"""
+        snapshot = self.metrics.snapshot('server')
+        endpoints = {}
+        for endpoint, stage in snapshot['stages'].items():
+            recent = sorted(self.latencies.get(endpoint, ()))
+            percentiles = {}
+            for percentile in (50, 90, 99):
+                if recent:
+                    position = min(len(recent) - 1, int(len(recent) * percentile / 100))
+                    percentiles[f"p{percentile}_ms"] = round(recent[position] * 1000, 3)
+            endpoints[endpoint] = {
+                'requests': stage['calls'],
+                'mean_ms': round(stage['mean_seconds'] * 1000, 3),
+                'max_ms': round(stage['max_seconds'] * 1000, 3),
+                **percentiles
+            }
+        return {'uptime_seconds': snapshot['wall_seconds'], 'endpoints': endpoints, 'cache': self.cache.stats()}
+
+    async def route(self, method: str, target: str) -> Tuple[str, int, str, bytes]:
+        """要求を処理し、(エンドポイント名, ステータス, Content-Type, 本文) を返す
+
+        時間のかかる処理はスレッドで実行する（プロンプトは読み込み元の専用スレッド、それ以外は既定のスレッドプール）。
+        """
+        loop = asyncio.get_running_loop()
+        parts = urlsplit(target)
+        path = parts.path
+        if method not in ('GET', 'HEAD'):
+            return 'other', 405, 'text/plain', b"GET only\n"
+
+        if path == '/healthz':
+            return 'healthz', 200, 'text/plain', b"ok\n"
+        if path == '/stats':
+            body = json.dumps(self.stats(), ensure_ascii=False, indent=2).encode('utf-8')
+            return 'stats', 200, 'application/json', body
+        if path == '/metrics':
+            return 'metrics', 200, 'text/plain; version=0.0.4', \
+                self.metrics.to_prometheus(self.metrics.snapshot('server')).encode('utf-8')
+        if path == '/search':
+            try:
+                return ('search',) + await loop.run_in_executor(None, self.search, parts.query)
+            except Exception as e:
+                self.logger.error(f"search の処理エラー ({parts.query}): {e}")
+                return 'search', 500, 'text/plain', f"検索に失敗しました: {e}\n".encode('utf-8')
+
+        for prefix, endpoint, render, executor in (
+                ('/prompts/', 'prompts', self.render_prompt, self.participants.executor),
+                ('/reports/', 'reports', self.render_report, None)):
+            if path.startswith(prefix):
+                name = unquote(path[len(prefix):])
+                if not self._valid_name(name):
+                    return endpoint, 400, 'text/plain', "参加者名が正しくありません\n".encode('utf-8')
+                try:
+                    return (endpoint,) + await loop.run_in_executor(executor, render, name)
+                except Exception as e:
+                    self.logger.error(f"{endpoint} の生成エラー ({name}): {e}")
+                    return endpoint, 500, 'text/plain', f"生成に失敗しました: {e}\n".encode('utf-8')
+
+        return 'other', 404, 'text/plain', b"not found\n"
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Optional[Tuple[str, str, Dict[str, str]]]:
+        """要求行とヘッダーを読み込み（接続が閉じられた場合はNone）"""
+        line = await reader.readline()
+        if not line:
+            return None
+        parts = line.decode('latin-1').split()
+        if len(parts) != 3 or not parts[2].startswith('HTTP/'):
+            raise ValueError(f"要求行が正しくありません: {line[:80]!r}")
+        method, target, version = parts
+
+        headers = {'__version__': version}
+        for _ in range(self.MAX_HEADERS):
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        else:
+            raise ValueError("ヘッダーが多すぎます")
+
+        # GET以外の本文は読み捨てる
+        length = int(headers.get('content-length', 0) or 0)
+        if length:
+            await reader.readexactly(length)
+        return method, target, headers
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """1つの接続の要求を順に処理（HTTP/1.1 の keep-alive に対応）"""
+        try:
+            while True:
+                try:
+                    # 要求行だけでなくヘッダー・本文の読み込みも含めて待ち時間を制限する
+                    request = await asyncio.wait_for(self._read_request(reader), config.SERVER_KEEPALIVE_TIMEOUT)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except ValueError as e:
+                    self._write_response(writer, 400, 'text/plain', f"{e}\n".encode('utf-8'), False, False)
+                    break
+                if request is None:
+                    break
+
+                method, target, headers = request
+                connection = headers.get('connection', '').lower()
+                if headers['__version__'] == 'HTTP/1.1':
+                    keep_alive = connection != 'close'
+                else:
+                    keep_alive = connection == 'keep-alive'
+
+                started = time.perf_counter()
+                endpoint, status, content_type, body = await self.route(method, target)
+                elapsed = time.perf_counter() - started
+                self.metrics.observe(endpoint, elapsed)
+                self.latencies.setdefault(endpoint, deque(maxlen=config.SERVER_LATENCY_WINDOW)).append(elapsed)
+
+                self._write_response(writer, status, content_type, body, keep_alive, method == 'HEAD')
+                await writer.drain()
+                self.logger.debug(f"{method} {target} {status} {elapsed * 1000:.1f}ms")
+                if not keep_alive:
+                    break
+        except asyncio.CancelledError:
+            # サーバーの終了時に待機中の接続を閉じる
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    def _write_response(self, writer: asyncio.StreamWriter, status: int, content_type: str, body: bytes,
+                        keep_alive: bool, head_only: bool) -> None:
+        """応答を書き込み"""
+        if content_type.startswith('text/') and 'charset' not in content_type:
+            content_type += '; charset=utf-8'
+        header = (f"HTTP/1.1 {status} {self.STATUS_TEXT.get(status, '')}\r\n"
+                  f"Content-Type: {content_type}\r\n"
+                  f"Content-Length: {len(body)}\r\n"
+                  f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+                  f"Cache-Control: no-cache\r\n\r\n")
+        writer.write(header.encode('latin-1'))
+        if not head_only:
+            writer.write(body)
+
+    async def serve(self) -> None:
+        """サーバーを起動して停止されるまで要求を処理"""
+        self.server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.logger.info(f"http://{self.host}:{self.port}/ で待ち受けています（Ctrl+Cで終了）")
+        async with self.server:
+            await self.server.serve_forever()
+
+    def close(self) -> None:
+        """読み込み元を閉じる"""
+        self.participants.close()
+
+
+def main():
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description="Skill-Zero Analyzer - プロンプト・HTMLレポートのHTTPサーバー")
+    parser.add_argument('--host', default=config.SERVER_HOST, help="待ち受けるアドレス")
+    parser.add_argument('--port', type=int, default=config.SERVER_PORT, help="待ち受けるポート（0は空いているポート）")
+    args = parser.parse_args()
+
+    server = ReportServer(args.host, args.port)
+    try:
+        asyncio.run(server.serve())
+    except KeyboardInterrupt:
+        Logger.setup_logger(__name__).info("サーバーを終了します")
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
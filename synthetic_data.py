@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Skill-Zero Analyzer - Synthetic Data
+計測用のフォーム回答CSVと分析結果ファイルを生成するスクリプト
+"""
+
+import argparse
+import csv
+import os
+import random
+from typing import Dict, List, Any, Iterator, Optional
+from config import config
+from utils import FileUtils
+
+
+# 回答・プロフィールの語彙（実データの傾向に合わせた組み合わせ用）
+PREFECTURES = ['北海道', '宮城', '東京都', '神奈川', '埼玉', '千葉', '愛知', '大阪', '京都', '兵庫',
+               '広島', '愛媛', '福岡', '熊本', '沖縄']
+JOBS = ['カスタマーサポート', '事務職', '営業', 'システムエンジニア', '看護師', '保育士', '販売スタッフ',
+        '経理', '人事', 'Webデザイナー', '公務員', '介護職', '主婦', '学生', '製造業']
+ROLES = ['ヘルプデスク', '請求対応', '導入支援', '店舗運営', '採用担当', '品質管理', '資料作成', '問い合わせ対応']
+FAMILIES = ['一人暮らしです。', '彼女と二人暮らしです。', '夫と子ども2人の4人家族です。', '両親と同居しています。',
+            '妻と猫1匹と暮らしています。']
+HOBBIES = ['野球観戦', '音楽視聴', '散歩', '読書', 'キャンプ', '料理', 'ゲーム', '旅行', 'カフェ巡り', '写真']
+PLACES = ['函館', '京都', '沖縄', '軽井沢', '近所の公園', '海']
+MOVIES = ['marvelシリーズ', 'ジブリ作品', 'ハリー・ポッター', '邦画全般']
+QUALIFICATIONS = ['自動車免許（AT限定）', 'ITパスポート', '簿記３級', '簿記２級', 'FP３級', 'TOEIC 600点',
+                  '基本情報技術者', 'MOS（Excel）']
+STRENGTHS = ['業務の細分化・標準化', '資料を見やすくまとめること', '人の話を聞くこと', 'スケジュール管理',
+             'Excelでの集計', '初対面の人と話すこと', 'コツコツ続けること']
+APPRECIATIONS = ['説明が丁寧・わかりやすい', 'マニュアルを作ってくれて助かった', '相談に乗ってくれる',
+                 '段取りが良い', 'PCのトラブルを解決してくれた']
+NOT_BAD_AT = ['人から頼まれた作業', '細かいデータの確認', '飲み会の幹事', '単純作業の繰り返し', '電話対応']
+WEAKNESSES = ['口頭での説明', '人前で話すこと', '営業・売り込み', '朝早く起きること', '大雑把な作業']
+CHALLENGES = ['転職の準備・活動', '簿記２級の勉強', 'ブログの開設', '家計の見直し', 'プログラミング学習',
+              'フリマアプリでの不用品販売']
+
+# 自己紹介の段落（経歴抽出の対象になる行を含む）
+BIO_TEMPLATES = [
+    "こんにちは☀️\n{prefecture}在住の{age}代、{job}として{years}年勤務しています！",
+    "新卒で{role}の仕事に就職し、現在は{job}として働いています。",
+    "以前は{role}の会社に在籍していましたが、{years}年前に転職しました。",
+    "【好きなこと・強み】\n◾️{strength}\n周りから「{appreciation}」と言っていただけることが多いです✌️",
+    "人の役に立てたとき、感謝をしてもらえたときに、幸せを感じます＼(^^)／",
+    "【こんな風になりたい】\n得意を活かして、{challenge}から一歩を踏み出したいと考えています！",
+    "よろしくお願いしますm(_ _)m"
+]
+
+
+class SyntheticDataGenerator:
+    """計測用のデータを生成するクラス
+
+    同じ seed からは常に同じデータを生成する。フォームの再提出を想定して一部の行は
+    既存の参加者と同じニックネームにし、プロフィールデータが未入力の行も含める。
+    """
+
+    def __init__(self, seed: int = 0, duplicate_rate: float = 0.05, missing_profile_rate: float = 0.1):
+        self.random = random.Random(seed)
+        self.duplicate_rate = duplicate_rate
+        self.missing_profile_rate = missing_profile_rate
+
+    def nickname(self, index: int) -> str:
+        """参加者のニックネーム"""
+        return f"参加者{index:06d}"
+
+    def bio(self) -> str:
+        """自己紹介の本文"""
+        values = {
+            'prefecture': self.random.choice(PREFECTURES),
+            'age': self.random.choice([20, 30, 40, 50]),
+            'job': self.random.choice(JOBS),
+            'role': self.random.choice(ROLES),
+            'years': self.random.randint(1, 20),
+            'strength': self.random.choice(STRENGTHS),
+            'appreciation': self.random.choice(APPRECIATIONS),
+            'challenge': self.random.choice(CHALLENGES)
+        }
+        count = self.random.randint(3, len(BIO_TEMPLATES))
+        paragraphs = [BIO_TEMPLATES[0]] + self.random.sample(BIO_TEMPLATES[1:], count - 1)
+        return '\n\n'.join(paragraph.format(**values) for paragraph in paragraphs)
+
+    def profile_text(self, nickname: str) -> str:
+        """プロフィールページから貼り付けたテキスト（実データと同じ見出し構成）"""
+        unregistered = '未登録'
+        sections = [
+            (config.PROFILE_SECTIONS['bio'], self.bio()),
+            (config.PROFILE_SECTIONS['location'], self.random.choice(PREFECTURES)),
+            (config.PROFILE_SECTIONS['job'], f"{self.random.choice(JOBS)}\n{self.random.choice(ROLES)}"),
+            (config.PROFILE_SECTIONS['family'], self.random.choice(FAMILIES)),
+            (config.PROFILE_SECTIONS['libecity_meeting'], "YouTubeでリベ大の動画を見て、参加しようと思いました！"),
+            (config.PROFILE_SECTIONS['challenges'],
+             '\n'.join(f"◾️{item}" for item in self.random.sample(CHALLENGES, 2))),
+            (config.PROFILE_SECTIONS['hobbies'], '、'.join(self.random.sample(HOBBIES, 3))),
+            (config.PROFILE_SECTIONS['likes'],
+             f"好きな場所：{self.random.choice(PLACES)}\n好きな映画：{self.random.choice(MOVIES)}"),
+            ('イチオシのリベ大コンテンツ（動画・図解・ブログなど）', unregistered),
+            ('価値観マップのリンク', unregistered),
+            ('アルバム', unregistered),
+            ('その他、ご自由にどうぞ！', unregistered),
+            ('各種SNS・URL', unregistered),
+            ('スキル・ポートフォリオ', ''),
+            (config.PROFILE_SECTIONS['skills'],
+             "【持っている資格】\n" + '\n'.join(self.random.sample(QUALIFICATIONS, 3))),
+            ('ポートフォリオ', unregistered),
+            ('掲載中の関連サービス', '現在掲載できるものがありません')
+        ]
+
+        lines = [f"{nickname}さんのプロフィール"]
+        for header, content in sections:
+            lines.append(header)
+            if content:
+                lines.append(content)
+        return '\n'.join(lines)
+
+    def rows(self, count: int) -> Iterator[Dict[str, Any]]:
+        """フォーム回答の行（CSV列キー → 値）を順に生成"""
+        for index in range(count):
+            if index > 0 and self.random.random() < self.duplicate_rate:
+                participant_index = self.random.randrange(index)
+            else:
+                participant_index = index
+            nickname = self.nickname(participant_index)
+
+            has_profile = self.random.random() >= self.missing_profile_rate
+            yield {
+                'timestamp': f"2025/07/{1 + index % 28:02d} {index % 24:02d}:{index % 60:02d}:{index * 7 % 60:02d}",
+                'email': f"user{participant_index}@example.com" if index % 3 else '',
+                'experience': f"【仕事】{self.random.choice(JOBS)}〜{self.random.choice(ROLES)}",
+                'strengths': '、'.join(self.random.sample(STRENGTHS, 2)),
+                'appreciation': self.random.choice(APPRECIATIONS),
+                'not_bad_at': self.random.choice(NOT_BAD_AT),
+                'weaknesses': self.random.choice(WEAKNESSES),
+                'nickname': nickname,
+                'profile_url': f"https://libecity.com/user_profile/synthetic{participant_index:06d}",
+                'profile_data': self.profile_text(nickname) if has_profile else ''
+            }
+
+    def write_csv(self, path: str, count: int) -> int:
+        """フォーム回答CSVを書き出し、書き出した行数を返す（列名は Config.CSV_COLUMNS）"""
+        directory = os.path.dirname(path)
+        if directory:
+            FileUtils.ensure_directory(directory)
+
+        # 列の並びは実際のスプレッドシートに合わせる
+        keys = ['timestamp', 'email', 'experience', 'strengths', 'appreciation', 'not_bad_at', 'weaknesses',
+                'nickname', 'profile_url', 'profile_data']
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow([config.get_csv_column(key) for key in keys])
+            written = 0
+            for row in self.rows(count):
+                writer.writerow([row[key] for key in keys])
+                written += 1
+        return written
+
+    def analysis_result(self, nickname: str) -> str:
+        """分析結果ファイルの内容（プロンプトの出力例の形式）"""
+        proposals = []
+        for number in range(1, 4):
+            actions = '\n'.join(
+                f"・{self.random.choice(CHALLENGES)}に取り組む（期間：{k}か月、期待効果：**{self.random.choice(STRENGTHS)}の実績づくり**）"
+                for k in range(1, 5)
+            )
+            proposals.append(
+                f"【提案{number}】{self.random.choice(ROLES)}の経験を活かした{self.random.choice(JOBS)}向けサービス\n"
+                f"{nickname}さんの「{self.random.choice(STRENGTHS)}」を活かして、小さく始められる副業です。\n"
+                f"**収益目標**: 月額{self.random.randint(1, 10)}万円〜年額{self.random.randint(10, 120)}万円\n"
+                f"**初期投資**: 時間5時間/週、費用{self.random.randint(0, 5)}万円\n"
+                f"**収益化期間**: {self.random.randint(1, 12)}か月\n"
+                f"**必要なスキル・資格**: {self.random.choice(QUALIFICATIONS)}\n"
+                f"**差別化ポイント**: {self.random.choice(APPRECIATIONS)}という評価\n"
+                f"**リスク要因**: 時間の確保。週末にまとめて作業して対策\n"
+                f"具体的なアクション:\n{actions}"
+            )
+
+        return (
+            f"{nickname}さんへのアドバイス\n"
+            f"**現状の分析:**\n"
+            f"・**{self.random.choice(STRENGTHS)}**が得意で、{self.random.choice(APPRECIATIONS)}と評価されています。\n"
+            f"・{self.random.choice(WEAKNESSES)}には苦手意識があります。\n\n"
+            f"**得意を活かせる道と副業の可能性:**\n" + '\n\n'.join(proposals) + "\n\n"
+            f"**オフ会でのヒント:**\n"
+            f"・自己紹介で「{self.random.choice(STRENGTHS)}」の実績を伝える\n"
+            f"・**先輩メンバーの副業体験談**から始め方を聞く\n\n"
+            f"**リスク管理・注意点:**\n"
+            f"・本業に支障のない範囲で、週{self.random.randint(2, 10)}時間から始めましょう。\n"
+        )
+
+    def write_analysis_results(self, output_dir: str, count: int, names: Optional[List[str]] = None) -> int:
+        """*_analysis_result.txt を書き出し、書き出したファイル数を返す"""
+        FileUtils.ensure_directory(output_dir)
+        names = names or [self.nickname(index) for index in range(count)]
+        for nickname in names[:count]:
+            with open(os.path.join(output_dir, f"{nickname}_analysis_result.txt"), 'w', encoding='utf-8') as f:
+                f.write(self.analysis_result(nickname))
+        return min(count, len(names))
+
+
+def main():
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description="Skill-Zero Analyzer - 計測用データ生成")
+    parser.add_argument('--participants', type=int, default=1000, help="生成するフォーム回答の行数")
+    parser.add_argument('--csv', default='synthetic/form_answer.csv', help="フォーム回答CSVの出力先")
+    parser.add_argument('--results', type=int, default=0, help="生成する分析結果ファイル数")
+    parser.add_argument('--results-dir', default='synthetic/output', help="分析結果ファイルの出力先")
+    parser.add_argument('--seed', type=int, default=0, help="乱数のシード値")
+    args = parser.parse_args()
+
+    generator = SyntheticDataGenerator(args.seed)
+    rows = generator.write_csv(args.csv, args.participants)
+    print(f"フォーム回答CSVを生成しました: {args.csv} ({rows}行)")
+
+    if args.results:
+        files = generator.write_analysis_results(args.results_dir, args.results)
+        print(f"分析結果ファイルを生成しました: {args.results_dir} ({files}件)")
+
+
+if __name__ == "__main__":
+    main()
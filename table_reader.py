@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Skill-Zero Analyzer - Table Reader
+フォーム回答CSVの読み込み（標準ライブラリの csv と pandas を切り替え可能）
+"""
+
+import codecs
+import csv
+import hashlib
+import io
+import math
+import os
+from typing import TYPE_CHECKING, Dict, List, Any, Iterator, Optional, Union
+from config import config
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# pandas.read_csv が既定で欠損値（NaN）とみなす文字列
+NA_VALUES = frozenset([
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null'
+])
+
+CSV_BACKENDS = ('csv', 'pandas')
+
+
+class CsvTable:
+    """列単位で値を取り出せる表（pandas.DataFrame のうちデータ処理で使う部分だけを持つ）
+
+    欠損値は pandas と同じく float('nan') とする。pandas と違い、数値だけの列も
+    型を推定せず文字列のまま扱う。index は pandas と同じくCSV全体での行番号（0始まり）。
+    """
+
+    def __init__(self, columns: List[str], rows: List[List[Any]], start: int = 0):
+        self.columns = columns
+        self.rows = rows
+        self.index = range(start, start + len(rows))
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @property
+    def empty(self) -> bool:
+        """データ行がないか"""
+        return not self.rows or not self.columns
+
+    def column(self, name: str) -> List[Any]:
+        """列の値をリストで取得"""
+        position = self.columns.index(name)
+        return [row[position] for row in self.rows]
+
+
+Table = Union['pd.DataFrame', CsvTable]
+
+
+def _header(names: List[str]) -> List[str]:
+    """重複した列名に pandas と同じく .1, .2 … を付ける"""
+    counts = {}
+    columns = []
+    for name in names:
+        if name in counts:
+            counts[name] += 1
+            name = f"{name}.{counts[name]}"
+        else:
+            counts[name] = 0
+        columns.append(name)
+    return columns
+
+
+def _convert_row(row: List[str], width: int, line_number: int) -> List[Any]:
+    """1行分の値を変換（欠損値はNaN、足りない列はNaNで補う）"""
+    if len(row) > width:
+        raise ValueError(f"列数が多すぎます (行{line_number}): {len(row)}列（ヘッダーは{width}列）")
+    values = [math.nan if value in NA_VALUES else value for value in row]
+    if len(values) < width:
+        values.extend([math.nan] * (width - len(values)))
+    return values
+
+
+def _iter_rows(path: str) -> Iterator[Any]:
+    """ヘッダーとデータ行を順に返す（最初の要素がヘッダー、空行は読み飛ばす）"""
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+        columns = _header(header)
+        yield columns
+
+        for row in reader:
+            if not row:
+                continue
+            yield _convert_row(row, len(columns), reader.line_num)
+
+
+def read_csv_table(path: str) -> CsvTable:
+    """CSVファイル全体を読み込み"""
+    rows = _iter_rows(path)
+    columns = next(rows, None)
+    if columns is None:
+        raise ValueError(f"CSVファイルが空です: {path}")
+    return CsvTable(columns, list(rows))
+
+
+def iter_csv_tables(path: str, chunk_size: int) -> Iterator[CsvTable]:
+    """CSVファイルを chunk_size 行ずつ読み込み"""
+    rows = _iter_rows(path)
+    columns = next(rows, None)
+    if columns is None:
+        raise ValueError(f"CSVファイルが空です: {path}")
+
+    chunk = []
+    start = 0
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield CsvTable(columns, chunk, start)
+            start += len(chunk)
+            chunk = []
+    if chunk:
+        yield CsvTable(columns, chunk, start)
+
+
+class CsvTail:
+    """追記されていくCSVファイルから、前回読み込んだ位置より後の行だけを読み込むクラス
+
+    読み込み位置（バイト数）・行数・ヘッダーを持ち、最後の改行までの完全な行だけを読む。
+    引用符で囲まれた値の途中でデータが終わっている行は、続きが追記されてから読む。
+    読み込み位置の直前のデータのハッシュ値を持ち、ファイルが追記以外の方法で
+    書き換えられたかを is_appended_only() で判定できる。
+    """
+
+    CHECK_SIZE = 4096
+
+    def __init__(self, path: str, offset: int = 0, rows: int = 0, lines: int = 0,
+                 columns: Optional[List[str]] = None, check_hash: str = ''):
+        self.path = path
+        self.offset = offset
+        self.rows = rows
+        self.lines = lines
+        self.columns = columns
+        self.check_hash = check_hash
+
+    @classmethod
+    def from_state(cls, path: str, state: Dict[str, Any]) -> 'CsvTail':
+        """state() で保存した状態から再開"""
+        return cls(path, state['offset'], state['rows'], state['lines'], state['columns'], state['check_hash'])
+
+    def state(self) -> Dict[str, Any]:
+        """読み込み位置などの状態（JSONで保存できる辞書）"""
+        return {
+            'offset': self.offset,
+            'rows': self.rows,
+            'lines': self.lines,
+            'columns': self.columns,
+            'check_hash': self.check_hash
+        }
+
+    def _hash_before(self, f: Any, offset: int) -> str:
+        """offset の直前 CHECK_SIZE バイトのハッシュ値"""
+        start = max(0, offset - self.CHECK_SIZE)
+        f.seek(start)
+        return hashlib.sha256(f.read(offset - start)).hexdigest()
+
+    def is_appended_only(self) -> bool:
+        """前回の読み込み以降、ファイルが追記だけされているか（切り詰め・書き換えがないか）"""
+        if not os.path.exists(self.path) or os.path.getsize(self.path) < self.offset:
+            return False
+        with open(self.path, 'rb') as f:
+            return self._hash_before(f, self.offset) == self.check_hash
+
+    def read(self) -> CsvTable:
+        """前回の位置より後に追記された完全な行を読み込む（index はCSV全体での行番号）"""
+        if os.path.getsize(self.path) == self.offset:
+            return CsvTable(self.columns or [], [], self.rows)
+
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset)
+            data = f.read()
+            end = data.rfind(b'\n') + 1
+            bom = len(codecs.BOM_UTF8) if self.offset == 0 and data.startswith(codecs.BOM_UTF8) else 0
+
+            pending = []  # 読み込み済みで、まだ行として完成していない物理行のバイト数
+            exhausted = False
+
+            def feed() -> Iterator[str]:
+                nonlocal exhausted
+                for line in io.StringIO(data[bom:end].decode('utf-8'), newline=''):
+                    pending.append(len(line.encode('utf-8')))
+                    yield line
+                exhausted = True
+
+            consumed = bom
+            lines = self.lines
+            columns = self.columns
+            rows = []
+            for row in csv.reader(feed()):
+                if exhausted:
+                    # 引用符の途中でデータが終わっている（続きはまだ追記されていない）
+                    break
+                consumed += sum(pending)
+                lines += len(pending)
+                pending.clear()
+
+                if columns is None:
+                    columns = _header(row)
+                elif row:
+                    rows.append(_convert_row(row, len(columns), lines))
+
+            # 途中で例外が発生した場合は読み込み位置を進めない
+            table = CsvTable(columns or [], rows, self.rows)
+            self.columns = columns
+            self.lines = lines
+            self.offset += consumed
+            self.rows += len(rows)
+            self.check_hash = self._hash_before(f, self.offset)
+        return table
+
+
+def read_table(path: str, backend: Optional[str] = None) -> Table:
+    """CSVファイルを読み込み（backend が 'pandas' の場合だけ pandas を読み込む）"""
+    backend = backend or config.CSV_BACKEND
+    if backend == 'pandas':
+        import pandas as pd
+        return pd.read_csv(path)
+    return read_csv_table(path)
+
+
+def iter_tables(path: str, chunk_size: int, backend: Optional[str] = None) -> Iterator[Table]:
+    """CSVファイルをチャンク単位で読み込み"""
+    backend = backend or config.CSV_BACKEND
+    if backend == 'pandas':
+        import pandas as pd
+        return pd.read_csv(path, chunksize=chunk_size)
+    return iter_csv_tables(path, chunk_size)
+
+
+def column_values(table: Table, name: str) -> Optional[List[Any]]:
+    """列の値をリストで取得（列がない場合はNone）"""
+    if name not in table.columns:
+        return None
+    if isinstance(table, CsvTable):
+        return table.column(name)
+    return table[name].tolist()
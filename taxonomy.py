@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Skill-Zero Analyzer - Taxonomy
+スキル・職種・経歴の分類語彙（data/taxonomy.json）による参加者の分類
+"""
+
+import hashlib
+import json
+import os
+import unicodedata
+from typing import Dict, List, Any, Optional
+from config import config
+from utils import Logger, FileUtils
+from keyword_matcher import KeywordMatcher
+
+
+# 分類語彙ファイルがない場合の経歴の語（自己紹介のうち、これらを含む行を経歴とする）
+DEFAULT_WORK_TERMS = ['勤務', '転職', '就職', '仕事', '職歴', '経験', '働い', '務め', '在籍']
+
+# 分類語彙ファイルがない場合に分類の対象とするプロフィールのセクション
+DEFAULT_SECTIONS = ['bio', 'job', 'challenges', 'hobbies', 'skills']
+
+# 分類語彙ファイルのうち、分類名 → 語の一覧を持つ項目
+CATEGORY_GROUPS = ('skills', 'job_types')
+
+
+def normalize(text: str) -> str:
+    """分類用に正規化（全角英数・半角カナの統一と小文字化）"""
+    return unicodedata.normalize('NFKC', text).lower()
+
+
+class Taxonomy:
+    """分類語彙クラス
+
+    経歴の語（work_terms）と、スキル・職種の分類ごとの語をそれぞれ1つの
+    KeywordMatcher にまとめ、テキストを1回走査するだけで該当する分類を求める。
+    分類の対象はプロフィールのうち sections に指定したセクションだけとする。
+    経歴の語は自己紹介の行にそのまま照合し、分類の語は全角・半角と大文字・小文字を
+    区別せずに照合する。
+    """
+
+    def __init__(self, work_terms: List[str], categories: Dict[str, List[str]], sections: List[str]):
+        self.sections = list(sections)
+        self.work_terms = list(work_terms)
+        self.categories = {category: list(terms) for category, terms in categories.items()}
+        self.work_matcher = KeywordMatcher(self.work_terms)
+
+        # 同じ語が複数の分類に含まれる場合は、そのすべてに分類する
+        term_categories = {}
+        for rank, terms in enumerate(self.categories.values()):
+            for term in terms:
+                term_categories.setdefault(normalize(term), set()).add(rank)
+        self.category_names = list(self.categories)
+        self.category_matcher = KeywordMatcher(term_categories)
+        self.term_categories = [term_categories[term] for term in self.category_matcher.keywords]
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> 'Taxonomy':
+        """分類語彙ファイルを読み込み（ファイルがない場合は経歴の既定の語だけを使う）"""
+        path = path or config.TAXONOMY_FILE
+        if not os.path.exists(path):
+            Logger.setup_logger(__name__).warning(f"分類語彙ファイルがないため、経歴の既定の語だけを使います: {path}")
+            return cls(DEFAULT_WORK_TERMS, {}, DEFAULT_SECTIONS)
+
+        data = FileUtils.safe_read_json(path)
+        if data is None:
+            raise ValueError(f"分類語彙ファイルを読み込めません: {path}")
+        return cls.from_dict(data)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Taxonomy':
+        """分類語彙ファイルの内容から作成（分類名はグループをまたいで一意）"""
+        categories = {}
+        for group in CATEGORY_GROUPS:
+            for category, terms in data.get(group, {}).items():
+                if category in categories:
+                    raise ValueError(f"分類名が重複しています: {category}")
+                if not isinstance(terms, list) or not all(isinstance(term, str) and term for term in terms):
+                    raise ValueError(f"分類の語は空でない文字列のリストで指定してください: {category}")
+                categories[category] = terms
+        sections = data.get('sections', DEFAULT_SECTIONS)
+        unknown = [section for section in sections if section not in config.PROFILE_SECTIONS]
+        if unknown:
+            raise ValueError(f"分類の対象に不明なセクションがあります: {unknown}")
+        return cls(data.get('work_terms', DEFAULT_WORK_TERMS), categories, sections)
+
+    @property
+    def fingerprint(self) -> str:
+        """語彙の内容のハッシュ値（抽出キャッシュ・再処理の判定に使う）"""
+        content = json.dumps([self.work_terms, self.categories, self.sections], ensure_ascii=False)
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()[:16]
+
+    def is_work_line(self, line: str) -> bool:
+        """経歴の語を含む行か"""
+        return self.work_matcher.search(line)
+
+    def tag_profile(self, profile_info: Dict[str, Any]) -> List[str]:
+        """プロフィールの分類の対象セクションに含まれる語の分類"""
+        return self.tag('\n'.join(profile_info.get(section) or '' for section in self.sections))
+
+    def tag(self, text: str) -> List[str]:
+        """テキストに含まれる語の分類（分類語彙ファイルの順）"""
+        ranks = set()
+        for number in self.category_matcher.find(normalize(text)):
+            ranks.update(self.term_categories[number])
+        return [self.category_names[rank] for rank in sorted(ranks)]
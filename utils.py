@@ -5,35 +5,161 @@ Skill-Zero Analyzer - Utilities
 共通ユーティリティクラス
 """
 
+import atexit
 import os
 import json
 import logging
-from typing import Dict, List, Any, Optional
+import queue
+import time
+from functools import lru_cache
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, List, Any, Optional, Tuple, Union
+from urllib.parse import urlsplit
 from config import config
+from models import Record
+from keyword_matcher import KeywordMatcher
+
+
+class JsonFormatter(logging.Formatter):
+    """1行に1件のJSON形式でログを出力するフォーマッター"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage()
+        }
+        progress = getattr(record, 'progress', None)
+        if progress is not None:
+            entry['progress'] = progress
+        return json.dumps(entry, ensure_ascii=False)
 
 
 class Logger:
-    """ログ管理クラス"""
+    """ログ管理クラス
+
+    ロガーにはキューに積むだけのハンドラーを付け、書式化と出力は別スレッドの
+    リスナーでまとめて行う（処理中のループで出力待ちが発生しないようにする）。
+    """
+
+    _queue = None
+    _listener = None
 
     @staticmethod
-    def setup_logger(name: str) -> logging.Logger:
+    def _create_console_handler() -> logging.Handler:
+        """実際に出力するコンソールハンドラーを作成"""
+        console_handler = logging.StreamHandler()
+        console_handler.setLevel(getattr(logging, config.LOG_LEVEL))
+
+        # フォーマッター
+        if config.LOG_JSON:
+            console_handler.setFormatter(JsonFormatter())
+        else:
+            console_handler.setFormatter(logging.Formatter(config.LOG_FORMAT))
+
+        return console_handler
+
+    @classmethod
+    def _start_listener(cls) -> None:
+        """キューから取り出して出力するリスナーを開始"""
+        cls._listener = QueueListener(cls._queue, cls._create_console_handler(), respect_handler_level=True)
+        cls._listener.start()
+
+    @classmethod
+    def _create_handler(cls) -> logging.Handler:
+        """ロガーに付けるハンドラーを作成"""
+        if not config.LOG_ASYNC:
+            return cls._create_console_handler()
+
+        if cls._listener is None:
+            cls._queue = queue.SimpleQueue()
+            cls._start_listener()
+            atexit.register(cls.shutdown)
+        return QueueHandler(cls._queue)
+
+    @classmethod
+    def shutdown(cls) -> None:
+        """キューに残っているログを出力してリスナーを停止"""
+        if cls._listener is not None:
+            cls._listener.stop()
+            cls._listener = None
+
+    @classmethod
+    def _restart_after_fork(cls) -> None:
+        """fork した子プロセスでリスナーのスレッドを起動し直す"""
+        if cls._listener is not None:
+            cls._start_listener()
+
+    @classmethod
+    def setup_logger(cls, name: str) -> logging.Logger:
         """ロガーを設定"""
         logger = logging.getLogger(name)
 
         if not logger.handlers:
             logger.setLevel(getattr(logging, config.LOG_LEVEL))
+            logger.addHandler(cls._create_handler())
 
-            # コンソールハンドラー
-            console_handler = logging.StreamHandler()
-            console_handler.setLevel(getattr(logging, config.LOG_LEVEL))
+        return logger
 
-            # フォーマッター
-            formatter = logging.Formatter(config.LOG_FORMAT)
-            console_handler.setFormatter(formatter)
 
-            logger.addHandler(console_handler)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=Logger._restart_after_fork)
 
-        return logger
+
+class ProgressLogger:
+    """処理件数をまとめて定期的にログ出力するクラス
+
+    1件ごとに出力する代わりに、every 件ごと、または interval 秒ごとに
+    累計件数・内訳・処理速度を1行で出力する。内訳のキーは英字（failed など）で指定し、
+    ログのメッセージでは COUNTER_LABELS の表示名に置き換える（JSON形式のログにはキーのまま出力）。
+    """
+
+    COUNTER_LABELS = {'failed': '失敗'}
+
+    def __init__(self, logger: logging.Logger, label: str, total: Optional[int] = None,
+                 every: Optional[int] = None, interval: Optional[float] = None):
+        self.logger = logger
+        self.label = label
+        self.total = total
+        self.every = every or config.LOG_PROGRESS_EVERY
+        self.interval = interval or config.LOG_PROGRESS_INTERVAL
+        self.count = 0
+        self.counters = {}
+        self.started = time.monotonic()
+        self.last_logged = self.started
+        self.logged_count = 0
+
+    def update(self, count: int = 1, **counters: int) -> None:
+        """処理件数を加算（counters は内訳の件数）"""
+        self.count += count
+        for key, value in counters.items():
+            self.counters[key] = self.counters.get(key, 0) + value
+
+        if self.count - self.logged_count >= self.every or time.monotonic() - self.last_logged >= self.interval:
+            self._log()
+
+    def finish(self) -> None:
+        """最後に出力してから増えた分を出力"""
+        if self.count != self.logged_count:
+            self._log()
+
+    def _log(self) -> None:
+        """進捗を1行で出力"""
+        now = time.monotonic()
+        elapsed = now - self.started
+        rate = self.count / elapsed if elapsed > 0 else 0.0
+
+        progress = f"{self.count}/{self.total}件" if self.total else f"{self.count}件"
+        details = ' / '.join(f"{self.COUNTER_LABELS.get(key, key)} {value}件" for key, value in self.counters.items())
+        message = f"{self.label}: {progress}" + (f" ({details})" if details else '') + f" {rate:,.0f}件/秒"
+        self.logger.info(message, extra={'progress': {
+            'label': self.label, 'count': self.count, 'total': self.total,
+            'counters': dict(self.counters), 'elapsed': round(elapsed, 3), 'rate': round(rate, 1)
+        }})
+
+        self.last_logged = now
+        self.logged_count = self.count
 
 
 class FileUtils:
@@ -98,6 +224,12 @@ class DataUtils:
 
         return cleaned
 
+    @staticmethod
+    @lru_cache(maxsize=32)
+    def keyword_matcher(keywords: Tuple[str, ...]) -> KeywordMatcher:
+        """キーワードの照合器（同じキーワードの組では作成済みの照合器を使う）"""
+        return KeywordMatcher(keywords)
+
     @staticmethod
     def extract_list_from_text(text: str, keywords: List[str]) -> List[str]:
         """テキストからキーワードを含む行を抽出"""
@@ -106,14 +238,32 @@ class DataUtils:
 
         lines = text.split('\n')
         extracted = []
+        matcher = DataUtils.keyword_matcher(tuple(keywords))
 
         for line in lines:
             line = line.strip()
-            if any(keyword in line for keyword in keywords):
+            if matcher.search(line):
                 extracted.append(line)
 
         return extracted
 
+    @staticmethod
+    def normalize_profile_url(url: Any) -> Optional[str]:
+        """プロフィールURLを比較用に正規化（スキーム・クエリ・末尾のスラッシュを無視）"""
+        if not isinstance(url, str) or not url.strip():
+            return None
+
+        parts = urlsplit(url.strip())
+        return f"{parts.netloc.lower()}{parts.path.rstrip('/')}"
+
+    @staticmethod
+    def normalize_email(email: Any) -> Optional[str]:
+        """メールアドレスを比較用に正規化"""
+        if not isinstance(email, str) or not email.strip():
+            return None
+
+        return email.strip().lower()
+
     @staticmethod
     def merge_dicts(base: Dict[str, Any], update: Dict[str, Any]) -> Dict[str, Any]:
         """辞書を統合（updateの値を優先）"""
@@ -135,9 +285,9 @@ class ValidationUtils:
         return url.startswith(('http://', 'https://'))
 
     @staticmethod
-    def is_valid_profile_data(profile_info: Dict[str, Any]) -> bool:
+    def is_valid_profile_data(profile_info: Union[Dict[str, Any], Record]) -> bool:
         """プロフィールデータが有効かチェック"""
-        if not profile_info or not isinstance(profile_info, dict):
+        if not profile_info or not isinstance(profile_info, (dict, Record)):
             return False
 
         # 最低限の情報があるかチェック
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Skill-Zero Analyzer - Watcher
+フォーム回答CSVへの追記を監視し、追記された回答だけを処理するスクリプト
+"""
+
+import argparse
+import json
+import signal
+import time
+from typing import Dict, List, Any, Optional
+from config import config
+from utils import Logger
+from models import Participant
+from table_reader import CsvTail
+from data_processor import DataProcessor, DataMerger
+from participant_store import ParticipantStore
+from participant_snapshot import write_snapshot
+from ai_analyzer import AIAnalyzer
+from metrics import metrics, add_metrics_arguments, instrument
+
+
+class CsvWatcher:
+    """フォーム回答CSVへの追記を監視するクラス
+
+    前回処理したCSVの位置（バイト数と行数）を参加者ストアのメタデータに保存し、
+    それより後に追記された行だけを読み込む。追記された参加者は統合キーで
+    ストアの既存の参加者と統合し、影響を受けた参加者のプロンプトだけを作り直す。
+    CSVが追記以外の方法で書き換えられた場合や処理設定が変わった場合は全件を処理し直す。
+    """
+
+    STATE_KEY = 'watch_state'
+
+    def __init__(self, workers: Optional[int] = None, use_cache: Optional[bool] = None,
+                 generate_prompts: bool = True):
+        self.logger = Logger.setup_logger(__name__)
+        self.processor = DataProcessor(workers=workers, use_cache=use_cache, csv_backend='csv')
+        self.generate_prompts = generate_prompts
+        self.store = None
+        self.tail = None
+        self.key_index = {}  # 統合キー → ストア内のid
+        self.exported = True  # ストアの内容をJSON・スナップショットに書き出し済みか
+        self.last_export = time.monotonic()
+
+    def _settings(self) -> str:
+        """処理結果に影響する設定（変わった場合は全件を処理し直す）"""
+        settings = [config.CSV_FILE_PATH, config.MERGE_KEY, config.EXTRACTION_RULES_VERSION,
+                    config.PROFILE_SECTIONS, config.PROFILE_SECTION_MARKERS, config.CSV_COLUMNS,
+                    self.processor.text_extractor.taxonomy.fingerprint]
+        return json.dumps(settings, ensure_ascii=False)
+
+    def _state(self, processed_at: str) -> str:
+        """ストアに保存する監視状態"""
+        return json.dumps({
+            'settings': self._settings(),
+            'processed_at': processed_at,
+            'tail': self.tail.state()
+        }, ensure_ascii=False)
+
+    def _load_state(self) -> Optional[Dict[str, Any]]:
+        """ストアに保存された監視状態を読み込み（再開できない場合はNone）"""
+        raw = self.store.get_metadata(self.STATE_KEY)
+        if raw is None:
+            return None
+
+        state = json.loads(raw)
+        if state.get('settings') != self._settings():
+            self.logger.info("処理設定が変わったため全件を処理し直します")
+            return None
+        if state.get('processed_at') != self.store.get_processed_at():
+            self.logger.info("参加者ストアが監視モード以外で更新されたため全件を処理し直します")
+            return None
+        return state
+
+    def _build_key_index(self) -> None:
+        """ストアの参加者から統合キーの索引を作成"""
+        self.key_index = {}
+        for participant_id, data in self.store.iter_entries():
+            key = DataMerger.get_merge_key(Participant.from_dict(data), config.MERGE_KEY)
+            if key is not None:
+                self.key_index.setdefault(key, participant_id)
+
+    def start(self) -> bool:
+        """ストアを開き、前回の続きから再開（再開できない場合は全件を処理）"""
+        self.store = ParticipantStore(config.PARTICIPANT_STORE_FILE)
+        state = self._load_state()
+        if state is not None:
+            self.tail = CsvTail.from_state(config.CSV_FILE_PATH, state['tail'])
+            if self.tail.is_appended_only():
+                self._build_key_index()
+                self.logger.info(f"前回の続きから監視を再開します: {self.tail.rows}行処理済み / "
+                                 f"参加者 {self.store.count()}人")
+                return True
+            self.logger.info("CSVが追記以外の方法で書き換えられたため全件を処理し直します")
+        return self.rebuild()
+
+    def rebuild(self) -> bool:
+        """CSVの全行を処理し直してストアを置き換え"""
+        self.tail = CsvTail(config.CSV_FILE_PATH)
+        table = self.tail.read()
+        participants = DataMerger.merge_duplicate_participants(self.processor.build_participants(table))
+        # 保存に失敗した場合は監視状態を保存せず、次回も全件を処理する
+        if not self.processor.save_processed_data(participants):
+            return False
+
+        self._build_key_index()
+        self.store.set_metadata(self.STATE_KEY, self._state(self.store.get_processed_at()))
+        self.exported = True
+        self.logger.info(f"全件を処理しました: {len(table)}行 → 参加者 {len(participants)}人")
+        self._prepare_prompts(participants)
+        return True
+
+    def poll(self) -> int:
+        """追記された行を処理し、処理した行数を返す"""
+        if not self.tail.is_appended_only():
+            self.logger.warning("CSVが追記以外の方法で書き換えられたため全件を処理し直します")
+            self.rebuild()
+            return self.tail.rows
+
+        previous = self.tail.state()
+        table = self.tail.read()
+        if table.empty:
+            return 0
+
+        try:
+            with metrics.stage('watch_batch', records=len(table)):
+                affected = self._merge_into_store(self.processor.build_participants(table))
+        except Exception:
+            # ストアに保存できなかった行は次回もう一度読み込む
+            self.tail = CsvTail.from_state(config.CSV_FILE_PATH, previous)
+            raise
+        self._prepare_prompts(affected)
+        return len(table)
+
+    def _merge_into_store(self, participants: List[Participant]) -> List[Participant]:
+        """追記された参加者をストアの参加者と統合して保存し、影響を受けた参加者を返す"""
+        updated = {}  # 既存の参加者のid → 統合後の参加者
+        added = []
+        added_index = {}  # 統合キー → added内の位置
+
+        # DataMerger.merge_duplicate_participants と同じく、最初に現れた参加者の位置に統合する
+        for participant in participants:
+            key = DataMerger.get_merge_key(participant, config.MERGE_KEY)
+            if key is not None and key in self.key_index:
+                participant_id = self.key_index[key]
+                existing = updated.get(participant_id)
+                if existing is None:
+                    existing = Participant.from_dict(self.store.get(participant_id))
+                updated[participant_id] = DataMerger._merge_participant_data(existing, participant)
+            elif key is not None and key in added_index:
+                position = added_index[key]
+                added[position] = DataMerger._merge_participant_data(added[position], participant)
+            else:
+                if key is not None:
+                    added_index[key] = len(added)
+                added.append(participant)
+
+        entries = [(participant_id, participant.to_dict()) for participant_id, participant in updated.items()]
+        entries += [(None, participant.to_dict()) for participant in added]
+        processed_at = time.strftime('%Y-%m-%d %H:%M:%S')
+        ids = self.store.save_entries(entries, processed_at, {self.STATE_KEY: self._state(processed_at)})
+
+        for key, position in added_index.items():
+            self.key_index[key] = ids[len(updated) + position]
+        self.exported = False
+
+        self.logger.info(f"追記された回答を処理しました: {len(participants)}行 → "
+                         f"更新 {len(updated)}人 / 追加 {len(added)}人（累計 {self.tail.rows}行）")
+        return list(updated.values()) + added
+
+    def _prepare_prompts(self, participants: List[Participant]) -> None:
+        """参加者のプロンプトを作成（内容が変わらない参加者のファイルは書き直されない）"""
+        if not self.generate_prompts or not participants:
+            return
+        analyzer = AIAnalyzer()
+        analyzer.set_participants(participants)
+        analyzer.run_analysis()
+
+    def export(self) -> None:
+        """ストアの内容を互換用JSONとスナップショットに書き出し"""
+        if self.exported:
+            return
+        with metrics.stage('watch_export', records=self.store.count()):
+            if config.EXPORT_PROCESSED_JSON:
+                self.store.export_json(config.PROCESSED_DATA_FILE)
+                self.logger.info(f"処理済みデータを保存しました: {config.PROCESSED_DATA_FILE}")
+            if config.WRITE_PARTICIPANT_SNAPSHOT:
+                participants = (Participant.from_dict(data) for data in self.store.iter_participants())
+                write_snapshot(config.PARTICIPANT_SNAPSHOT_FILE, participants, self.store.get_processed_at(),
+                               self.store.get_generation())
+                self.logger.info(f"処理済みデータを保存しました: {config.PARTICIPANT_SNAPSHOT_FILE}")
+        self.exported = True
+        self.last_export = time.monotonic()
+
+    def run(self, interval: Optional[float] = None, once: bool = False) -> bool:
+        """CSVへの追記を監視（once=True の場合は追記分を1回だけ処理して終了）"""
+        interval = config.WATCH_POLL_INTERVAL if interval is None else interval
+        try:
+            self.logger.info("=== Skill-Zero Analyzer - Watcher ===")
+            if not self.start():
+                return False
+            if once:
+                self.poll()
+                return True
+
+            self.logger.info(f"{config.CSV_FILE_PATH} への追記を監視します（{interval}秒間隔、Ctrl+Cで終了）")
+            while True:
+                try:
+                    self.poll()
+                    if time.monotonic() - self.last_export >= config.WATCH_EXPORT_INTERVAL:
+                        self.export()
+                except Exception as e:
+                    self.logger.error(f"追記された回答の処理エラー: {e}")
+                time.sleep(interval)
+
+        except KeyboardInterrupt:
+            self.logger.info("監視を終了します")
+            return True
+        except Exception as e:
+            self.logger.error(f"監視エラー: {e}")
+            return False
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """JSON・スナップショットを書き出してストアと抽出処理を閉じる"""
+        if self.store is not None:
+            try:
+                self.export()
+            except Exception as e:
+                self.logger.error(f"処理済みデータの書き出しエラー: {e}")
+            self.store.close()
+            self.store = None
+        self.processor.close()
+
+
+def main():
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description="Skill-Zero Analyzer - Watcher")
+    parser.add_argument('--interval', type=float, default=config.WATCH_POLL_INTERVAL,
+                        help="CSVを確認する間隔（秒）")
+    parser.add_argument('--once', action='store_true',
+                        help="前回以降に追記された回答を1回だけ処理して終了")
+    parser.add_argument('--no-prompts', action='store_true',
+                        help="プロンプトを作成せず、参加者ストアの更新だけを行う")
+    parser.add_argument('--workers', type=int, default=config.EXTRACTION_WORKERS,
+                        help="プロフィール抽出の並列プロセス数")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="抽出キャッシュを使わずに抽出")
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+
+    # サービスとして停止された場合（SIGTERM）も Ctrl+C と同じく書き出してから終了する
+    def stop(signum, frame):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, stop)
+
+    watcher = CsvWatcher(workers=args.workers, use_cache=not args.no_cache, generate_prompts=not args.no_prompts)
+    with instrument('watcher', args.metrics, args.profile):
+        success = watcher.run(args.interval, args.once)
+    if not success:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()